@@ -0,0 +1,43 @@
+#!/usr/local/bin/python3
+"""
+Measure the cost of Policies.get_policy() while the export grows.
+The time per extraction must stay flat: only the requested policy is copied.
+"""
+
+import os
+import timeit
+import xml.etree.ElementTree as et
+
+from mcafee_epo_policies import Policies
+
+SAMPLE = os.path.join(os.path.dirname(__file__), '..', 'samples', 'es', 'tp', 'oas_policy.xml')
+TYPE_ID = 'EAM_General_Policies'
+TEMPLATE = 'OAS Test Policy'
+
+
+def build_export(count):
+    """
+    Build an export of count On-Access Scan policies from the sample policy.
+    """
+    policies = Policies()
+    policies.load_from_file(SAMPLE)
+    for index in range(count - 1):
+        policies.add_policy(policies.new_policy(TYPE_ID, 'Policy {:05}'.format(index), TEMPLATE))
+    return policies
+
+
+def main():
+    print('| {0:>9} | {1:>12} | {2:>16} |'.format('Policies', 'Export (KB)', 'get_policy (ms)'))
+    print('|----------:|-------------:|-----------------:|')
+    for count in (10, 100, 1000, 5000):
+        policies = build_export(count)
+        size = len(et.tostring(policies.root)) // 1024
+        names = policies.list_name()
+        number = 200
+        duration = timeit.timeit(
+            lambda: policies.get_policy(TYPE_ID, names[len(names) // 2]), number=number)
+        print('| {0:>9} | {1:>12} | {2:>16.3f} |'.format(count, size, duration / number * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+#!/usr/local/bin/python3
+"""
+Measure the startup cost of importing the package in a fresh interpreter.
+"""
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+REPEAT = 7
+
+STATEMENTS = [
+    'import mcafee_epo_policies',
+    'from mcafee_epo_policies import Policies',
+    'from mcafee_epo_policies import ESTPPolicyOnAccessScan',
+    'from mcafee_epo_policies import ESFWPolicyRules',
+    'import mcafee_epo_policies; mcafee_epo_policies.__version__',
+]
+
+TIMER = 'import time; start = time.perf_counter(); {}; print(time.perf_counter() - start)'
+
+
+def import_time(statement):
+    """
+    Returns the best time in seconds of a statement run in a new interpreter.
+    """
+    env = dict(os.environ, PYTHONPATH=ROOT, PYTHONDONTWRITEBYTECODE='')
+    times = []
+    for _ in range(REPEAT):
+        output = subprocess.run([sys.executable, '-c', TIMER.format(statement)], env=env,
+                                check=True, capture_output=True, text=True).stdout
+        times.append(float(output))
+    return min(times)
+
+
+def main():
+    print('| {0:<60} | {1:>9} |'.format('Statement', 'Time (ms)'))
+    print('|:-------------------------------------------------------------|----------:|')
+    for statement in STATEMENTS:
+        print('| {0:<60} | {1:>9.1f} |'.format(statement, import_time(statement) * 1000))
+
+
+if __name__ == '__main__':
+    main()
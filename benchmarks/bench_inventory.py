@@ -0,0 +1,51 @@
+#!/usr/local/bin/python3
+"""
+Compare a full load of an export with the header-only inventory scan.
+"""
+
+import os
+import tempfile
+import timeit
+
+from mcafee_epo_policies import Policies
+
+SAMPLE = os.path.join(os.path.dirname(__file__), '..', 'samples', 'es', 'tp', 'oas_policy.xml')
+TYPE_ID = 'EAM_General_Policies'
+TEMPLATE = 'OAS Test Policy'
+
+
+def build_export(file_path, count):
+    """
+    Save an export of count On-Access Scan policies built from the sample policy.
+    """
+    policies = Policies()
+    policies.load_from_file(SAMPLE)
+    for index in range(count - 1):
+        policies.add_policy(policies.new_policy(TYPE_ID, 'Policy {:05}'.format(index), TEMPLATE))
+    policies.save_to_file(file_path)
+
+
+def full_load(file_path):
+    policies = Policies()
+    policies.load_from_file(file_path)
+    return policies.list()
+
+
+def main():
+    print('| {0:>9} | {1:>10} | {2:>14} | {3:>14} | {4:>7} |'.format(
+        'Policies', 'Size (MB)', 'Full load (s)', 'Inventory (s)', 'Speedup'))
+    print('|----------:|-----------:|---------------:|---------------:|--------:|')
+    with tempfile.TemporaryDirectory() as directory:
+        for count in (100, 1000, 5000):
+            file_path = os.path.join(directory, 'export.xml')
+            build_export(file_path, count)
+            assert full_load(file_path) == Policies.inventory(file_path).list()
+            full = min(timeit.repeat(lambda: full_load(file_path), number=1, repeat=3))
+            scan = min(timeit.repeat(lambda: Policies.inventory(file_path).list(),
+                                     number=1, repeat=3))
+            print('| {0:>9} | {1:>10.1f} | {2:>14.3f} | {3:>14.3f} | {4:>6.0f}x |'.format(
+                count, os.path.getsize(file_path) / 1e6, full, scan, full / scan))
+
+
+if __name__ == '__main__':
+    main()
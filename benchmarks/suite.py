@@ -0,0 +1,315 @@
+#!/usr/local/bin/python3
+"""
+Benchmark suite of the package, run over synthetic exports of growing size.
+Each case reports the time of one call and the peak memory allocated during that
+call (tracemalloc), and is compared with a stored baseline:
+
+    python benchmarks/suite.py                    # compare with benchmarks/baseline.json
+    python benchmarks/suite.py --save-baseline    # record a new baseline
+    python benchmarks/suite.py --case oas_get oas_set --sizes 10 100
+
+The exit code is 1 when a case is slower or uses more memory than its baseline by more
+than the threshold. Timings depend on the machine: record the baseline on the machine
+which runs the comparison.
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import timeit
+import tracemalloc
+
+from mcafee_epo_policies import (Policies, SyntheticPolicies, ParseCache, ESTPPolicyOnAccessScan,
+                                 ESTPPolicyOnDemandScan, McAfeeAgentPolicyGeneral,
+                                 McAfeeAgentPolicyRepository, ESFWPolicyRules)
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+SIZES = (10, 100, 1000)
+SEED = 0
+
+
+def get_properties(policy):
+    """
+    Returns the names of the properties of a Policy whose value can be read and
+    written back unchanged.
+    """
+    names = []
+    for name in sorted(dir(type(policy))):
+        attr = getattr(type(policy), name)
+        if isinstance(attr, property) and attr.fset is not None:
+            try:
+                setattr(policy, name, getattr(policy, name))
+            except (TypeError, ValueError, AttributeError, KeyError, IndexError):
+                continue
+            names.append(name)
+    return names
+
+
+def get_one(policies_cls, policies, type_id):
+    """
+    Returns a Policy object of the first policy of a type.
+    """
+    name = [row['name'] for row in policies.list() if row['typeid'] == type_id][0]
+    return policies_cls(policies.get_policy(type_id, name))
+
+
+class Case():
+    """
+    A benchmark case: setup(size) builds the input once, run(state) is timed.
+    """
+
+    def __init__(self, name, description, setup, run):
+        self.name = name
+        self.description = description
+        self.setup = setup
+        self.run = run
+
+
+# Input builders, size is the number of policies or the number of items of a list
+
+def export_file(directory, size):
+    file_path = os.path.join(directory, 'export-{}.xml'.format(size))
+    if not os.path.exists(file_path):
+        SyntheticPolicies.generate(SEED, oas=size, ods=size // 4 + 1, fw=size // 50 + 1,
+                                   general=size // 4 + 1, repository=size // 4 + 1,
+                                   rules=5, depth=1).save_to_file(file_path)
+    return file_path
+
+
+def loaded_export(directory, size):
+    return Policies(file_path=export_file(directory, size))
+
+
+def load_cached(state):
+    file_path, cache = state
+    Policies.parse_cache = cache
+    try:
+        return Policies(file_path=file_path)
+    finally:
+        Policies.parse_cache = None
+
+
+def cached_export(directory, size):
+    state = export_file(directory, size), ParseCache(os.path.join(directory, 'cache'))
+    # The first load fills the cache
+    load_cached(state)
+    return state
+
+
+def json_lines_export(directory, size):
+    file_path = os.path.join(directory, 'export-{}.jsonl'.format(size))
+    if not os.path.exists(file_path):
+        loaded_export(directory, size).save_to_json_lines(file_path)
+    return file_path
+
+
+def load_json_lines(file_path):
+    policies = Policies()
+    policies.load_from_json_lines(file_path)
+    return policies
+
+
+def saved_export(directory, size):
+    return loaded_export(directory, size), directory
+
+
+def new_directory(directory):
+    # Each run saves to a new directory: overwriting the same files on each run would
+    # measure the file system rather than the package
+    return tempfile.mkdtemp(dir=directory)
+
+
+def accessors(policy_cls, **options):
+    def setup(directory, size):
+        policy = get_one(policy_cls, SyntheticPolicies.generate(SEED, extra_settings=size,
+                                                                **options),
+                         {ESTPPolicyOnAccessScan: 'EAM_General_Policies',
+                          ESTPPolicyOnDemandScan: 'EAM_OnDemandScan_Policies',
+                          McAfeeAgentPolicyGeneral: 'General'}[policy_cls])
+        return policy, get_properties(policy)
+    return setup
+
+
+def run_getters(state):
+    policy, names = state
+    for name in names:
+        getattr(policy, name)
+
+
+def run_setters(state):
+    policy, names = state
+    for name in names:
+        setattr(policy, name, getattr(policy, name))
+
+
+def list_policy(policy_cls, type_id, option, **options):
+    def setup(directory, size):
+        policies = SyntheticPolicies.generate(SEED, **dict(options, **{option: size}))
+        return get_one(policy_cls, policies, type_id)
+    return setup
+
+
+def round_trip(getter, setter):
+    def run(policy):
+        getattr(policy, setter)(getattr(policy, getter)())
+    return run
+
+
+def fw_policy(directory, size):
+    policies = SyntheticPolicies.generate(SEED, fw=1, rules=size, groups=2, depth=2,
+                                          aggregates=size // 4)
+    return policies.get_policy('FireCore_FW_Rules', 'FW 00001')
+
+
+def fw_load(policy_root):
+    policy = ESFWPolicyRules(policy_root)
+    policy.load_policy()
+    return policy
+
+
+def fw_sequences(policy_root):
+    return fw_load(policy_root).get_sequences()
+
+
+CASES = [
+    Case('load', 'Policies.load_from_file() of an export of N OAS policies (+ others)',
+         export_file, lambda file_path: Policies(file_path=file_path)),
+    Case('load_cached', 'Policies.load_from_file() of the same export, from a ParseCache',
+         cached_export, load_cached),
+    Case('load_jsonl', 'Policies.load_from_json_lines() of the same export',
+         json_lines_export, load_json_lines),
+    Case('get_policy', 'Policies.get_policy() in an export of N OAS policies',
+         loaded_export, lambda policies: policies.get_policy('EAM_General_Policies',
+                                                             'OAS {:05}'.format(1))),
+    Case('new_policy', 'Policies.new_policy() in an export of N OAS policies',
+         loaded_export, lambda policies: policies.new_policy('EAM_General_Policies', 'New',
+                                                             'OAS {:05}'.format(1))),
+    Case('save', 'Policies.save_to_file() of an export of N OAS policies (+ others)',
+         saved_export, lambda state: state[0].save_to_file(
+             os.path.join(new_directory(state[1]), 'export.xml'))),
+    Case('split', 'Policies.split_all() of an export of N OAS policies (+ others)',
+         saved_export, lambda state: state[0].split_all(new_directory(state[1]))),
+    Case('oas_get', 'ESTPPolicyOnAccessScan property getters, N extra settings per section',
+         accessors(ESTPPolicyOnAccessScan, oas=1), run_getters),
+    Case('oas_set', 'ESTPPolicyOnAccessScan property setters, N extra settings per section',
+         accessors(ESTPPolicyOnAccessScan, oas=1), run_setters),
+    Case('ods_get', 'ESTPPolicyOnDemandScan property getters, N extra settings per section',
+         accessors(ESTPPolicyOnDemandScan, ods=1), run_getters),
+    Case('ods_set', 'ESTPPolicyOnDemandScan property setters, N extra settings per section',
+         accessors(ESTPPolicyOnDemandScan, ods=1), run_setters),
+    Case('ma_get', 'McAfeeAgentPolicyGeneral property getters, N extra settings per section',
+         accessors(McAfeeAgentPolicyGeneral, general=1), run_getters),
+    Case('ma_set', 'McAfeeAgentPolicyGeneral property setters, N extra settings per section',
+         accessors(McAfeeAgentPolicyGeneral, general=1), run_setters),
+    Case('exclusions', 'OAS exclusion list get + set, N exclusions',
+         list_policy(ESTPPolicyOnAccessScan, 'EAM_General_Policies', 'exclusions', oas=1),
+         round_trip('get_exclusion_list', 'set_exclusion_list')),
+    Case('processes', 'OAS process list get + set, N processes',
+         list_policy(ESTPPolicyOnAccessScan, 'EAM_General_Policies', 'processes', oas=1),
+         round_trip('get_process_list', 'set_process_list')),
+    Case('locations', 'ODS scan location list get + set, N locations',
+         list_policy(ESTPPolicyOnDemandScan, 'EAM_OnDemandScan_Policies', 'locations', ods=1),
+         round_trip('get_fs_locations', 'set_fs_locations')),
+    Case('sites', 'Repository site list get + set, N sites',
+         list_policy(McAfeeAgentPolicyRepository, 'Repository', 'sites', repository=1),
+         round_trip('get_site_list', 'set_site_list')),
+    Case('fw_load', 'ESFWPolicyRules.load_policy(), N rules per group (2 levels of 2 groups)',
+         fw_policy, fw_load),
+    Case('fw_sequences', 'ESFWPolicyRules.load_policy() + get_sequences(), N rules per group',
+         fw_policy, fw_sequences),
+]
+
+
+def measure(case, state, repeat):
+    """
+    Returns the best time (seconds) of one call and the peak memory (bytes) allocated
+    during one call.
+    """
+    timer = timeit.Timer(lambda: case.run(state))
+    number, _ = timer.autorange()
+    duration = min(timer.repeat(repeat=repeat, number=number)) / number
+    gc.collect()
+    tracemalloc.start()
+    try:
+        case.run(state)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return duration, peak
+
+
+def compare(result, reference, threshold):
+    """
+    Returns the status of a result compared with its baseline.
+    """
+    if reference is None:
+        return 'new'
+    if result['time'] > reference['time'] * (1 + threshold):
+        return 'SLOWER'
+    if result['peak'] > reference['peak'] * (1 + threshold) + 4096:
+        return 'MEMORY'
+    return 'ok'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--case', nargs='+', help='Only run those cases.')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Allowed relative regression (default: 0.25).')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Number of timings of each case and size, the best one is kept.')
+    parser.add_argument('--list', action='store_true', help='List the cases.')
+    args = parser.parse_args()
+
+    if args.list:
+        for case in CASES:
+            print('{0:<14} {1}'.format(case.name, case.description))
+        return 0
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'rt') as baseline_file:
+            baseline = json.load(baseline_file)
+    results = {}
+    regressions = 0
+    print('| {0:<14} | {1:>6} | {2:>12} | {3:>10} | {4:>13} | {5:>12} | {6:<6} |'.format(
+        'Case', 'N', 'Time (ms)', 'Peak (KB)', 'Baseline (ms)', 'Baseline (KB)', 'Status'))
+    print('|:---------------|-------:|-------------:|-----------:|--------------:|'
+          '-------------:|:-------|')
+    with tempfile.TemporaryDirectory() as directory:
+        for case in CASES:
+            if args.case and case.name not in args.case:
+                continue
+            for size in args.sizes:
+                state = case.setup(directory, size)
+                duration, peak = measure(case, state, args.repeat)
+                del state
+                key = '{}:{}'.format(case.name, size)
+                results[key] = {'time': duration, 'peak': peak}
+                reference = baseline.get(key)
+                status = compare(results[key], reference, args.threshold)
+                regressions += status in ('SLOWER', 'MEMORY')
+                print('| {0:<14} | {1:>6} | {2:>12.3f} | {3:>10.1f} | {4:>13} | {5:>12} | '
+                      '{6:<6} |'.format(
+                          case.name, size, duration * 1000, peak / 1024,
+                          '{:.3f}'.format(reference['time'] * 1000) if reference else '-',
+                          '{:.1f}'.format(reference['peak'] / 1024) if reference else '-',
+                          status), flush=True)
+    if args.save_baseline:
+        baseline.update(results)
+        with open(args.baseline, 'wt') as baseline_file:
+            json.dump(baseline, baseline_file, indent=1, sort_keys=True)
+        print('\nBaseline saved to {}'.format(args.baseline))
+        return 0
+    if regressions:
+        print('\n{} regression(s) above {:.0%}'.format(regressions, args.threshold))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,17 +5,65 @@
 
 """ mcafee_epo_policies Class """
 
-import setuptools.version
-__version__ = setuptools.version.__version__
+import importlib
+
+# The other modules (store, matrix...) load optional dependencies: they are not
+# imported by "from mcafee_epo_policies import *"
 __all__ = ["constants", "policies", "ma", "es"]
 
-from .constants import State, Priority, Gti
-from .policies import Policies, Policy
-from .ma.mapolicies import McAfeeAgentPolicies
-from .ma.general import McAfeeAgentPolicyGeneral
-from .ma.repository import McAfeeAgentPolicyRepository, RepositoryList
-from .es.tp.estppolicies import ESTPPolicies 
-from .es.tp.onaccessscan import ESTPPolicyOnAccessScan, OASProcessList, OASExclusionList, OASURLList
-from .es.tp.ondemandscan import ESTPPolicyOnDemandScan, ODSLocationList, ODSExclusionList
-from .es.fw.esfwpolicies import ESFWPolicies
-from .es.fw.rules import ESFWPolicyRules
\ No newline at end of file
+# The classes are imported on first access (PEP 562) so that importing the package
+# doesn't load every product module: exported name -> module defining it.
+_EXPORTS = {
+    "State": ".constants",
+    "Priority": ".constants",
+    "Gti": ".constants",
+    "Policies": ".policies",
+    "Policy": ".policies",
+    "PolicyFileIndex": ".fileindex",
+    "PolicyInventory": ".inventory",
+    "ParseCache": ".parsecache",
+    "PolicyLoader": ".lazypolicy",
+    "MemoryBudget": ".lazypolicy",
+    "PolicyHashTree": ".hashtree",
+    "PolicyStore": ".store",
+    "SettingsMatrix": ".matrix",
+    "ComplianceBaseline": ".baseline",
+    "SyntheticPolicies": ".synthetic",
+    "McAfeeAgentPolicies": ".ma.mapolicies",
+    "McAfeeAgentPolicyGeneral": ".ma.general",
+    "McAfeeAgentPolicyRepository": ".ma.repository",
+    "RepositoryList": ".ma.repository",
+    "ESTPPolicies": ".es.tp.estppolicies",
+    "ESTPPolicyOnAccessScan": ".es.tp.onaccessscan",
+    "OASProcessList": ".es.tp.onaccessscan",
+    "OASExclusionList": ".es.tp.onaccessscan",
+    "OASURLList": ".es.tp.onaccessscan",
+    "ESTPPolicyOnDemandScan": ".es.tp.ondemandscan",
+    "ODSLocationList": ".es.tp.ondemandscan",
+    "ODSExclusionList": ".es.tp.ondemandscan",
+    "ESFWPolicies": ".es.fw.esfwpolicies",
+    "ESFWPolicyRules": ".es.fw.rules",
+}
+
+# Used when the package is not installed (no distribution metadata).
+VERSION = "0.0.0"
+
+def _get_version():
+    from importlib import metadata
+    try:
+        return metadata.version(__name__)
+    except metadata.PackageNotFoundError:
+        return VERSION
+
+def __getattr__(name):
+    if name == "__version__":
+        value = _get_version()
+    elif name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    else:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS) | {"__version__"})
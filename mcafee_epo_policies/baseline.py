@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+################################################################################
+# Copyright (c) 2019 Benjamin Marandel - All Rights Reserved.
+################################################################################
+
+"""
+This module defines one Class object: ComplianceBaseline.
+This class checks policies against a baseline: a list of declarative rules, each one
+a condition on the value of a Setting of a type of policy. The rules are compiled
+once into a plan grouped by type then by Section, so each policy is checked in one
+walk of its Sections, whatever the number of rules:
+
+    baseline = ComplianceBaseline([
+        {'name': 'OAS enabled', 'typeid': 'EAM_General_Policies',
+         'section': 'General', 'setting': 'bOASEnabled', 'op': '=', 'value': '1'},
+        {'name': 'GTI >= Medium', 'typeid': 'EAM_General_Policies',
+         'section': 'GTI', 'setting': 'GTISensitivityLevel', 'op': '>=', 'value': 3},
+        {'name': 'ODS CPU <= 50%', 'typeid': 'EAM_OnDemandScan_Policies',
+         'section': 'FS_Performance', 'setting': 'CPUPercentage', 'op': '<=', 'value': 50},
+        {'name': 'ASCI <= 60 min', 'typeid': 'General',
+         'section': 'Network', 'setting': 'CheckNetworkMessageInterval', 'op': '<=',
+         'value': 3600},
+    ])
+    for result in baseline.evaluate_file('export.xml', workers=4):
+        if not result['passed']:
+            print(result['name'], result['failures'])
+
+The rules use the raw Settings, not the getters of the Policy classes: the values are
+the ones stored in the export (for instance the ASCI in seconds).
+"""
+
+import json
+import mmap
+import operator
+from .policies import Policies, iterparse_policies, get_slice_size
+from .fileindex import PolicyFileIndex
+
+# Comparison of a value with the value of a rule. The numeric operators, and '=' or
+# '!=' with a number, compare the values as numbers.
+OPERATORS = {
+    '=': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    'in': lambda value, values: value in values,
+    'not in': lambda value, values: value not in values,
+}
+
+def _evaluate_slice(rules, file_path, ranges):
+    """
+    Check the policies of a slice of an export (the byte ranges of an export file)
+    against the rules of a baseline.
+    """
+    with open(file_path, 'rb') as export_file, \
+            mmap.mmap(export_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        xml_data = b'\n'.join(buffer[start:end] for start, end in ranges)
+    return list(ComplianceBaseline(rules).evaluate(Policies(xml_policies=xml_data)))
+
+class ComplianceBaseline():
+    """
+    ComplianceBaseline is a class object containing the rules of a baseline and their
+    plan: {typeid: {section: [(setting, test, rule index)]}}.
+    Each rule is a dict:
+        name: The label of the rule in the results (default: section/setting).
+        typeid: The type of the policies checked by the rule.
+        section, setting: The Setting checked.
+        op: The operator: '=', '!=', '<', '<=', '>', '>=', 'in' or 'not in'.
+        value: The value compared with the value of the Setting, a list of values for
+               'in' and 'not in'. A number (int or float) is compared as a number.
+        missing: 'fail' (default) or 'pass', the result when the Setting is missing.
+    """
+
+    def __init__(self, rules):
+        self.rules = [dict(rule) for rule in rules]
+        self.plan = self.compile(self.rules)
+
+    def __repr__(self):
+        return '<ComplianceBaseline of {} rules on {} types>'.format(
+            len(self.rules), len(self.plan))
+
+    @classmethod
+    def load(cls, file_path):
+        """
+        Returns the ComplianceBaseline of a JSON file: a list of rules, or a dict
+        whose 'rules' key holds the list.
+        """
+        with open(file_path, 'rt') as baseline_file:
+            data = json.load(baseline_file)
+        return cls(data['rules'] if isinstance(data, dict) else data)
+
+    def save(self, file_path):
+        """
+        Save the rules in a JSON file.
+        """
+        with open(file_path, 'wt') as baseline_file:
+            json.dump({'rules': self.rules}, baseline_file, indent=2)
+
+    @staticmethod
+    def compile(rules):
+        """
+        Returns the plan of a list of rules: {typeid: {section: [(setting, test,
+        rule index)]}}, test being a function of the value of the Setting returning
+        True if the rule is met.
+        """
+        plan = {}
+        for rule_index, rule in enumerate(rules):
+            for key in ('typeid', 'section', 'setting', 'op'):
+                if key not in rule:
+                    raise ValueError('Rule {} has no {}.'.format(rule_index, key))
+            if rule['op'] not in OPERATORS:
+                raise ValueError('Unknown operator {} in rule {}.'.format(rule['op'], rule_index))
+            if rule.get('missing', 'fail') not in ('fail', 'pass'):
+                raise ValueError('Missing must be "fail" or "pass" in rule {}.'.format(rule_index))
+            plan.setdefault(rule['typeid'], {}).setdefault(rule['section'], []).append(
+                (rule['setting'], ComplianceBaseline.__get_test(rule), rule_index))
+        return plan
+
+    @staticmethod
+    def __get_test(rule):
+        compare = OPERATORS[rule['op']]
+        expected = rule.get('value')
+        if rule['op'] in ('in', 'not in'):
+            if not isinstance(expected, (list, tuple, set, frozenset)):
+                raise ValueError('The value of operator {} must be a list.'.format(rule['op']))
+            expected = frozenset(str(value) for value in expected)
+            return lambda value: compare(value, expected)
+        numeric = isinstance(expected, (int, float)) and not isinstance(expected, bool)
+        if not numeric:
+            if rule['op'] not in ('=', '!='):
+                raise ValueError('The value of operator {} must be a number.'.format(rule['op']))
+            expected = str(expected)
+            return lambda value: compare(value, expected)
+
+        def test(value):
+            try:
+                return compare(float(value), expected)
+            except ValueError:
+                return False
+        return test
+
+    def get_types(self):
+        """
+        Returns the types of the policies checked by the baseline.
+        """
+        return list(self.plan)
+
+    def get_rule_name(self, rule_index):
+        """
+        Returns the label of a rule.
+        """
+        rule = self.rules[rule_index]
+        return rule.get('name') or '{}/{}'.format(rule['section'], rule['setting'])
+
+    def evaluate_policy(self, policy_obj, settings):
+        """
+        Check a policy object against the rules of its type, in one walk of the
+        Sections of its settings.
+
+        :param: policy_obj: The EPOPolicyObject Element.
+        :param: settings: The EPOPolicySettings Elements of the export: {name: Element}.
+        :return: The result dict {'server', 'typeid', 'name', 'passed', 'failures'},
+                 failures being a list of dicts {'rule', 'section', 'setting', 'value',
+                 'op', 'expected'} (value is None for a missing Setting), None if no
+                 rule checks the type of the policy.
+        """
+        type_id = policy_obj.get('typeid')
+        sections = self.plan.get(type_id)
+        if sections is None:
+            return None
+        # The value of each checked Setting: the first one wins when a Setting is
+        # found twice, like Policy.get_setting_value()
+        values = {}
+        for policy_ref in policy_obj.iterfind('PolicySettings'):
+            settings_obj = settings.get(policy_ref.text)
+            if settings_obj is None:
+                continue
+            for section_obj in settings_obj.iterfind('Section'):
+                section = section_obj.get('name')
+                if section not in sections:
+                    continue
+                for setting_obj in section_obj.iterfind('Setting'):
+                    values.setdefault((section, setting_obj.get('name')),
+                                      setting_obj.get('value'))
+        failures = []
+        for section, checks in sections.items():
+            for setting, test, rule_index in checks:
+                value = values.get((section, setting))
+                if value is None:
+                    if self.rules[rule_index].get('missing', 'fail') == 'pass':
+                        continue
+                elif test(value):
+                    continue
+                rule = self.rules[rule_index]
+                failures.append({'rule': self.get_rule_name(rule_index), 'section': section,
+                                 'setting': setting, 'value': value, 'op': rule['op'],
+                                 'expected': rule.get('value')})
+        return {'server': policy_obj.get('serverid'), 'typeid': type_id,
+                'name': policy_obj.get('name'), 'passed': not failures, 'failures': failures}
+
+    def evaluate(self, policies):
+        """
+        Check every policy of a Policies (or a Policy) against the baseline, in the
+        order of the export. The policies of a type without rules are skipped.
+
+        :param: policies: A Policies or a Policy object.
+        :return: A generator of results (see evaluate_policy).
+        """
+        if policies.root is not None:
+            yield from self.__evaluate_root(policies.root)
+
+    def __evaluate_root(self, root):
+        settings = {}
+        for settings_obj in root.iterfind('EPOPolicySettings'):
+            settings.setdefault(settings_obj.get('name'), settings_obj)
+        for policy_obj in root.iterfind('EPOPolicyObject'):
+            result = self.evaluate_policy(policy_obj, settings)
+            if result is not None:
+                yield result
+
+    def evaluate_file(self, file_path, workers=1):
+        """
+        Check every policy of an export file against the baseline, yielding the
+        results as the export is read. With one worker, the export is parsed
+        incrementally (see iterparse_policies) so it never has to fit in memory.
+        With several workers, the sidecar index of the file (see PolicyFileIndex)
+        cuts the policies of the checked types into slices, each one read, parsed
+        and checked by a pool of processes; the results are yielded slice by slice,
+        in the order of the export.
+
+        :param: file_path: The path of the export file, it may be compressed when
+                           workers is 1 (see open_export).
+        :param: workers: The number of worker processes, None for one per CPU.
+        :return: A generator of results (see evaluate_policy).
+        """
+        type_ids = set(self.plan)
+        if workers == 1:
+            for root in iterparse_policies(file_path, type_ids=type_ids):
+                yield from self.__evaluate_root(root)
+            return
+        from concurrent.futures import ProcessPoolExecutor
+        index = PolicyFileIndex.open(file_path)
+        keys = list(dict.fromkeys((row[0], row[1]) for row in index.data['policies']
+                                  if row[0] in type_ids))
+        size = get_slice_size(len(keys), workers)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_evaluate_slice, self.rules, file_path,
+                                       index.get_slice_ranges(keys[start:start + size]))
+                       for start in range(0, len(keys), size)]
+            for future in futures:
+                yield from future.result()
+
+    @staticmethod
+    def summarize(results):
+        """
+        Returns the summary of results: {'policies', 'passed', 'failed', 'rules':
+        {rule: number of failing policies}}.
+        """
+        summary = {'policies': 0, 'passed': 0, 'failed': 0, 'rules': {}}
+        for result in results:
+            summary['policies'] += 1
+            summary['passed' if result['passed'] else 'failed'] += 1
+            for failure in result['failures']:
+                summary['rules'][failure['rule']] = summary['rules'].get(failure['rule'], 0) + 1
+        return summary
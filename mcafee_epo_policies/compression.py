@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+################################################################################
+# Copyright (c) 2019 Benjamin Marandel - All Rights Reserved.
+################################################################################
+
+"""
+This module defines the functions opening the exports from ePolicy Orchestrator
+which are compressed (gzip, bzip2) or bundled in a zip archive. The compression is
+detected from the first bytes of the file, not from its name, and the content is
+decompressed while it is read: a compressed export is never held as a whole in memory.
+"""
+
+import bz2
+import gzip
+import zipfile
+import contextlib
+
+GZIP_MAGIC = b'\x1f\x8b'
+BZ2_MAGIC = b'BZh'
+# Local file header, or end of central directory of an empty archive
+ZIP_MAGIC = (b'PK\x03\x04', b'PK\x05\x06')
+
+def _is_path(source):
+    return not hasattr(source, 'read')
+
+def _read_magic(source):
+    """
+    Returns the first bytes of a file (path or file object opened in binary mode),
+    without moving the position of a file object. Returns b'' if they can't be read.
+    """
+    if _is_path(source):
+        with open(source, 'rb') as export_file:
+            return export_file.read(4)
+    if hasattr(source, 'peek'):
+        return source.peek(4)[:4]
+    if source.seekable():
+        position = source.tell()
+        magic = source.read(4)
+        source.seek(position)
+        return magic
+    return b''
+
+def detect_compression(source):
+    """
+    Returns the compression of a file: 'gzip', 'bz2', 'zip' or None.
+
+    :param: source: A file path or a file object opened in binary mode.
+    """
+    magic = _read_magic(source)
+    if magic.startswith(GZIP_MAGIC):
+        return 'gzip'
+    if magic.startswith(BZ2_MAGIC):
+        return 'bz2'
+    if magic.startswith(ZIP_MAGIC):
+        return 'zip'
+    return None
+
+def _get_members(archive):
+    return [info for info in archive.infolist() if not info.is_dir()]
+
+@contextlib.contextmanager
+def open_export(source):
+    """
+    Open an export, compressed or not, and returns a file object reading its XML
+    content. A zip archive must hold a single export (see iter_zip_members).
+    To be used in a with statement, a file object given as source is not closed.
+
+    :param: source: A file path or a file object opened in binary mode.
+    """
+    compression = detect_compression(source)
+    if compression is None:
+        if _is_path(source):
+            with open(source, 'rb') as export_file:
+                yield export_file
+        else:
+            yield source
+    elif compression == 'gzip':
+        if _is_path(source):
+            stream = gzip.GzipFile(source, 'rb')
+        else:
+            stream = gzip.GzipFile(fileobj=source, mode='rb')
+        with stream:
+            yield stream
+    elif compression == 'bz2':
+        with bz2.BZ2File(source, 'rb') as stream:
+            yield stream
+    else:
+        with zipfile.ZipFile(source) as archive:
+            members = _get_members(archive)
+            if len(members) != 1:
+                raise ValueError('The archive holds {} exports, use iter_zip_members().'.format(
+                    len(members)))
+            with archive.open(members[0]) as member, open_export(member) as stream:
+                yield stream
+
+def iter_zip_members(source):
+    """
+    Yield (member name, file object) for each export of a zip archive, in the order
+    of the archive. A member may itself be gzip or bzip2 compressed. The file object
+    is only valid until the next member is requested.
+
+    :param: source: A file path or a file object opened in binary mode.
+    """
+    with zipfile.ZipFile(source) as archive:
+        for info in _get_members(archive):
+            with archive.open(info) as member, open_export(member) as stream:
+                yield info.filename, stream
@@ -5,7 +5,22 @@
 
 """ ENS Firewall Policies Class """
 
+import importlib
+
 __all__ = ["esfwpolicies", "rules"]
 
-from .esfwpolicies import ESFWPolicies
-from .rules import ESFWPolicyRules
+# Imported on first access (PEP 562): exported name -> module defining it.
+_EXPORTS = {
+    "ESFWPolicies": ".esfwpolicies",
+    "ESFWPolicyRules": ".rules",
+}
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
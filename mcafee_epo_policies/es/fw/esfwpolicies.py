@@ -16,8 +16,11 @@ class ESFWPolicies(Policies):
     ESFWPolicies is a class object containing the policies returned by the ePO API.
     """
 
-    def __init__(self, xml_policies=None):
-        super(ESFWPolicies, self).__init__(xml_policies)
-        if xml_policies is not None:
+    FEATURE_ID = 'ENDP_FW_META_FW'
+
+    def __init__(self, xml_policies=None, file_path=None, type_ids=None):
+        super(ESFWPolicies, self).__init__(xml_policies, file_path, type_ids)
+        # The content loaded from xml_policies or file_path must come from the product
+        if not self.is_empty():
             if self.get_product() != 'ENDP_FW_META_FW':
                 raise ValueError('Wrong McAfee Product. Policies must come from "ENDP_FW_META_FW".')
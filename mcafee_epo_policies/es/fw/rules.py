@@ -7,8 +7,10 @@
 This module defines the class ESFWPolicyRules.
 """
 
-import xml.etree.ElementTree as et
 from ...policies import Policy
+from ...listcodec import ListCodec
+
+SEQUENCE = ListCodec('_RuleIDSequence', ['+RuleIDSequence#{}'])
 
 class ESFWPolicyRules(Policy):
     """
@@ -28,10 +30,20 @@ class ESFWPolicyRules(Policy):
     def __repr__(self):
         return 'ESTPPolicyOnAccessScan()'
 
+    def get_list_codecs(self, section, values):
+        """
+        Returns the ListCodecs of the lists stored in a Section: _Name is the count
+        and +Name#N the items of each list.
+        """
+        return [ListCodec(name, ['+{}#{{}}'.format(name[1:])])
+                for name in values if name.startswith('_')]
+
     def load_policy(self):
         policy_obj = self.root.find('EPOPolicyObject')
+        policy_sets = {policy_set.get('name'): policy_set
+                       for policy_set in self.root.iterfind('EPOPolicySettings')}
         for policy_ref in policy_obj.findall('PolicySettings'):
-            policy_set = self.root.find('./EPOPolicySettings[@name="{}"]'.format(policy_ref.text))
+            policy_set = policy_sets[policy_ref.text]
             set_type = int(policy_set.get('param_int'))
             if set_type == 100:
                 self.__load_sequence(policy_set)
@@ -47,20 +59,12 @@ class ESFWPolicyRules(Policy):
         # Enter in the sequence section
         section_obj = policy_settings.find('Section[@name="{}"]'.format(
                                            policy_settings.get('param_str')))
+        values = ListCodec.get_values(section_obj)
         # Determine the GUID of that sequence
-        setting_obj = section_obj.find('Setting[@name="{}"]'.format('RuleListID'))
         # If the sequence has no value, it's the root sequence
-        if setting_obj is not None:
-            seq_key = setting_obj.get('value')
-        else:
-            seq_key = 'root'
+        seq_key = values.get('RuleListID', 'root')
         # Build the sequence list with respect of the order
-        seq_list = list()
-        max_rows = int(section_obj.find('Setting[@name="{}"]'.format(
-                                        '_RuleIDSequence')).get('value'))
-        for row in range(max_rows):
-            seq_list.append(section_obj.find('Setting[@name="{}{}"]'.format(
-                                             '+RuleIDSequence#', row)).get('value'))
+        seq_list = [row[0] for row in SEQUENCE.decode(values)]
         # Add the sequence ID with all sub sequences to the main dict
         self.seq[seq_key] = seq_list
 
@@ -68,25 +72,10 @@ class ESFWPolicyRules(Policy):
         # Enter in the rule section
         section_obj = policy_settings.find('Section[@name="{}"]'.format(
                                            policy_settings.get('param_str')))
-        # Determine the GUID of that rule
-        rul_key = section_obj.find('Setting[@name="{}"]'.format('GUID')).get('value')
         # Build the rule with all properties
-        rul_props = dict()
-        prop_keys = section_obj.findall('Setting')
-        for prop in prop_keys:
-            prop_key = prop.get('name')
-            # If it's a simple property, get its value
-            if prop_key[0] != "+" and prop_key[0] != "_":
-                rul_props[prop_key] = prop.get('value')
-            # If it's a list, get all possible values
-            if prop_key[0] == "_":
-                prop_val = list()
-                max_rows = int(prop.get('value'))
-                for row in range(max_rows):
-                    setting_obj = section_obj.find('Setting[@name="+{}#{}"]'.format(
-                                                    prop_key[1:], row))
-                    prop_val.append(setting_obj.get('value'))
-                rul_props[prop_key[1:]] = prop_val
+        rul_props = self.__load_properties(section_obj)
+        # Determine the GUID of that rule
+        rul_key = rul_props['GUID']
         # Add the rule ID with all properties to the main dict
         self.rul[rul_key] = rul_props
 
@@ -94,27 +83,26 @@ class ESFWPolicyRules(Policy):
         # Enter in the aggregate section
         section_obj = policy_settings.find('Section[@name="{}"]'.format(
                                             policy_settings.get('param_str')))
-        # Determine the GUID of that aggregate
-        agg_key = section_obj.find('Setting[@name="{}"]'.format('GUID')).get('value')
         # Build the aggregate with all properties
-        agg_props = dict()
-        prop_keys = section_obj.findall('Setting')
-        for prop in prop_keys:
-            prop_key = prop.get('name')
+        agg_props = self.__load_properties(section_obj)
+        # Determine the GUID of that aggregate
+        agg_key = agg_props['GUID']
+        # Add the rule ID with all properties to the main dict
+        self.agg[agg_key] = agg_props
+
+    @staticmethod
+    def __load_properties(section_obj):
+        values = ListCodec.get_values(section_obj)
+        props = dict()
+        for prop_key, prop_value in values.items():
             # If it's a simple property, get its value
             if prop_key[0] != "+" and prop_key[0] != "_":
-                agg_props[prop_key] = prop.get('value')
-            # If it's a list, get all possible values
+                props[prop_key] = prop_value
+            # If it's a list (_Name is the count, +Name#N the items), get all possible values
             if prop_key[0] == "_":
-                prop_val = list()
-                max_rows = int(prop.get('value'))
-                for row in range(max_rows):
-                    setting_obj = section_obj.find('Setting[@name="+{}#{}"]'.format(
-                                                    prop_key[1:], row))
-                    prop_val.append(setting_obj.get('value'))
-                agg_props[prop_key[1:]] = prop_val
-        # Add the rule ID with all properties to the main dict
-        self.agg[agg_key] = agg_props
+                codec = ListCodec(prop_key, ['+{}#{{}}'.format(prop_key[1:])])
+                props[prop_key[1:]] = [row[0] for row in codec.decode(values)]
+        return props
 
     def print_info(self):
         """
@@ -5,8 +5,28 @@
 
 """ ENS Threat Prevention Policies Class """
 
+import importlib
+
 __all__ = ["estppolicies", "onaccessscan", "ondemandscan"]
 
-from .estppolicies import ESTPPolicies
-from .onaccessscan import ESTPPolicyOnAccessScan, OASProcessList, OASExclusionList, OASURLList
-from .ondemandscan import ESTPPolicyOnDemandScan, ODSLocationList, ODSExclusionList
\ No newline at end of file
+# Imported on first access (PEP 562): exported name -> module defining it.
+_EXPORTS = {
+    "ESTPPolicies": ".estppolicies",
+    "ESTPPolicyOnAccessScan": ".onaccessscan",
+    "OASProcessList": ".onaccessscan",
+    "OASExclusionList": ".onaccessscan",
+    "OASURLList": ".onaccessscan",
+    "ESTPPolicyOnDemandScan": ".ondemandscan",
+    "ODSLocationList": ".ondemandscan",
+    "ODSExclusionList": ".ondemandscan",
+}
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -7,6 +7,29 @@
 This module defines the class ExclusionList for On-Access and On-Demand policies.
 """
 
+from ...listcodec import ListCodec
+
+EXCLUSIONS = ListCodec('dwExclusionCount', ['ExcludedItem_{}'])
+
+def decode_exclusions(rows):
+    """
+    Returns the exclusions stored in the items of EXCLUSIONS: a list of 4 values per
+    exclusion (what, when, name and notes, see ExclusionList). The notes may hold '|'.
+    """
+    return [row[0].split('|', 3) for row in rows]
+
+def encode_exclusions(table):
+    """
+    Returns the items of EXCLUSIONS for a list of exclusions (see decode_exclusions).
+    """
+    rows = []
+    for row in table:
+        if len(row) != 4:
+            raise ValueError('An exclusion must have 4 values (what, when, name and notes): '
+                             '{}.'.format(row))
+        rows.append(['|'.join(row)])
+    return rows
+
 class ExclusionList:
     """
     The ExclusionList class can be used to edit the list of exclusion.
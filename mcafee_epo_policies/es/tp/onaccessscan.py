@@ -7,9 +7,12 @@
 This module defines the class ESTPPolicyOnAccessScan.
 """
 
-import xml.etree.ElementTree as et
 from ...policies import Policy
-from .exclusions import ExclusionList
+from ...listcodec import ListCodec
+from .exclusions import ExclusionList, EXCLUSIONS, decode_exclusions, encode_exclusions
+
+PROCESSES = ListCodec('dwApplicationCount', ['szApplicationItem_{}', 'TypeItem_{}'])
+EXCLUDED_URLS = ListCodec('dwScriptScanURLExclItemCount', ['ScriptScanExclusionURL_{}'])
 
 class ESTPPolicyOnAccessScan(Policy):
     """
@@ -17,6 +20,8 @@ class ESTPPolicyOnAccessScan(Policy):
     Threat Prevention policy: On-Access Scan.
     """
 
+    LIST_CODECS = (PROCESSES, EXCLUSIONS, EXCLUDED_URLS)
+
     def __init__(self, policy_from_estppolicies=None):
         super(ESTPPolicyOnAccessScan, self).__init__(policy_from_estppolicies)
         if policy_from_estppolicies is not None:
@@ -331,22 +336,10 @@ class ESTPPolicyOnAccessScan(Policy):
         (Standard settings will apply to all unlisted processes.)
         Return a ProcessList object.
         """
-        table = None
-        section_obj = self.root.find('./EPOPolicySettings/Section[@name="Application"]')
-        if section_obj is not None:
-            setting_obj = section_obj.find('Setting[@name="dwApplicationCount"]')
-            max_rows = int(setting_obj.get('value'))
-            table = list()
-            for row in range(max_rows):
-                row_value = list()
-                setting_obj = section_obj.find('Setting[@name="szApplicationItem_{}"]'.format(row))
-                row_value.append(setting_obj.get('value'))
-                setting_obj = section_obj.find('Setting[@name="TypeItem_{}"]'.format(row))
-                if setting_obj.get('value') == '0':
-                    row_value.append('Low Risk')
-                else:
-                    row_value.append('High Risk')
-                table.append(row_value)
+        table = self.get_list('Application', PROCESSES)
+        if table is not None:
+            table = [[process_name, 'Low Risk' if process_type == '0' else 'High Risk']
+                     for process_name, process_type in table]
         return table
 
     def set_process_list(self, table):
@@ -354,28 +347,15 @@ class ESTPPolicyOnAccessScan(Policy):
         Set the process list with a ProcessList object as input
         Return true or false.
         """
-        success = False
-        section_obj = self.root.find('./EPOPolicySettings/Section[@name="Application"]')
-        if section_obj is not None:
-            success = True
-            parent_obj = self.root.find('./EPOPolicySettings')
-            parent_obj.remove(section_obj)
-            section_obj = et.SubElement(parent_obj, 'Section', name='Application')
-            if len(table) > 0:
-                et.SubElement(section_obj, 'Setting',
-                              {"name":'dwApplicationCount', "value":str(len(table))})
-                for index, row in enumerate(table):
-                    et.SubElement(section_obj, 'Setting',
-                                  {"name":'szApplicationItem_{}'.format(index), "value":row[0]})
-                    if row[1] == 'Low Risk':
-                        et.SubElement(section_obj, 'Setting',
-                                      {"name":'TypeItem_x{}'.format(index), "value":'0'})
-                    elif row[1] == 'High Risk':
-                        et.SubElement(section_obj, 'Setting',
-                                      {"name":'TypeItem_x{}'.format(index), "value":'1'})
-                    else:
-                        raise ValueError('Risk level unknown: {}.'.format(row[1]))
-        return success
+        rows = list()
+        for row in table:
+            if row[1] == 'Low Risk':
+                rows.append([row[0], '0'])
+            elif row[1] == 'High Risk':
+                rows.append([row[0], '1'])
+            else:
+                raise ValueError('Risk level unknown: {}.'.format(row[1]))
+        return self.set_list('Application', PROCESSES, rows)
 
     process_list = property(get_process_list, set_process_list)
 
@@ -736,17 +716,11 @@ class ESTPPolicyOnAccessScan(Policy):
         Get exclusions list
         Return a list that can be used as ProcessList object.
         """
-        table = None
-        section_obj = self.root.find('./EPOPolicySettings/Section[@name="{}"]'.format(__section__))
-        if section_obj is not None:
-            setting_obj = section_obj.find('Setting[@name="dwExclusionCount"]')
-            max_rows = int(setting_obj.get('value'))
-            if max_rows > 0:
-                table = list()
-                for row in range(max_rows):
-                    setting_obj = section_obj.find('Setting[@name="ExcludedItem_{}"]'.format(row))
-                    row_values = setting_obj.get('value').split('|')
-                    table.append(row_values)
+        table = self.get_list(__section__, EXCLUSIONS)
+        if table:
+            table = decode_exclusions(table)
+        else:
+            table = None
         return table
 
     def set_exclusion_list(self, table, __section__='Default-Detection_Exclusions'):
@@ -754,24 +728,8 @@ class ESTPPolicyOnAccessScan(Policy):
         Set exclusions list
         Use a list or a ProcessList object as input
         """
-        success = False
-        section_obj = self.root.find('./EPOPolicySettings/Section[@name="{}"]'.format(__section__))
-        if section_obj is not None:
-            success = True
-            parent_obj = self.root.find('./EPOPolicySettings')
-            parent_obj.remove(section_obj)
-            section_obj = et.SubElement(parent_obj, 'Section', name=__section__)
-            if len(table) > 0:
-                et.SubElement(section_obj, 'Setting',
-                              {"name":'dwExclusionCount', "value":str(len(table))})
-                for index, row in enumerate(table):
-                    exclusion = row[0] + '|' + row[1] + '|' + row[2] + '|' + row[3]
-                    et.SubElement(section_obj, 'Setting',
-                                  {"name":'ExcludedItem_{}'.format(index), "value":exclusion})
-            else:
-                et.SubElement(section_obj, 'Setting',
-                              {"name":'dwExclusionCount', "value":'0'})
-        return success
+        rows = encode_exclusions(table)
+        return self.set_list(__section__, EXCLUSIONS, rows)
 
     exclusion_list = property(get_exclusion_list, set_exclusion_list)
 
@@ -1301,12 +1259,9 @@ class ESTPPolicyOnAccessScan(Policy):
         Get Excluded URLs
         Return a list or an URLList object
         """
-        excluded_urls = list()
-        max_rows = int(self.get_setting_value('ScriptScanURLExclItems',
-                                              'dwScriptScanURLExclItemCount'))
-        for row in range(max_rows):
-            excluded_urls.append(self.get_setting_value('ScriptScanURLExclItems',
-                                                        'ScriptScanExclusionURL_{}'.format(row)))
+        excluded_urls = self.get_list('ScriptScanURLExclItems', EXCLUDED_URLS)
+        if excluded_urls is not None:
+            excluded_urls = [row[0] for row in excluded_urls]
         return excluded_urls
 
     def set_script_scan_exclusions(self, excluded_urls):
@@ -1314,21 +1269,8 @@ class ESTPPolicyOnAccessScan(Policy):
         Set Excluded URLs
         Use URLList object as input
         """
-        success = False
-        section_obj = self.root.find('./EPOPolicySettings/Section[@name="ScriptScanURLExclItems"]')
-        if section_obj is not None:
-            success = True
-            parent_obj = self.root.find('./EPOPolicySettings')
-            parent_obj.remove(section_obj)
-            section_obj = et.SubElement(parent_obj, 'Section', name='ScriptScanURLExclItems')
-            et.SubElement(section_obj, 'Setting',
-                          {"name":'dwScriptScanURLExclItemCount', "value":str(len(excluded_urls))})
-            # Determine if there are some excluded urls
-            if len(excluded_urls) > 0:
-                for index, url in enumerate(excluded_urls):
-                    et.SubElement(section_obj, 'Setting',
-                                  {"name":'ScriptScanExclusionURL_{}'.format(index), "value":url})
-        return success
+        return self.set_list('ScriptScanURLExclItems', EXCLUDED_URLS,
+                             [[url] for url in excluded_urls])
 
     script_scan_exclusions = property(get_script_scan_exclusions, set_script_scan_exclusions)
 
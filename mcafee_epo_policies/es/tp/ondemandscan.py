@@ -7,9 +7,11 @@
 This module defines the class ESTPPolicyOnDemandScan.
 """
 
-import xml.etree.ElementTree as et
 from ...policies import Policy
-from .exclusions import ExclusionList
+from ...listcodec import ListCodec
+from .exclusions import ExclusionList, EXCLUSIONS, decode_exclusions, encode_exclusions
+
+LOCATIONS = ListCodec('dwScanItemCount', ['szScanItem{}'])
 
 class ESTPPolicyOnDemandScan(Policy):
     """
@@ -25,6 +27,8 @@ class ESTPPolicyOnDemandScan(Policy):
           location is defined by the object where the user has right-click.
     """
 
+    LIST_CODECS = (LOCATIONS, EXCLUSIONS)
+
     def __init__(self, policy_from_estppolicies=None):
         super(ESTPPolicyOnDemandScan, self).__init__(policy_from_estppolicies)
         if policy_from_estppolicies is not None:
@@ -183,17 +187,11 @@ class ESTPPolicyOnDemandScan(Policy):
         'SpecialRegistry':          'Registry'
         Note for 'File or folder' simply use the full path directly.
         """
-        table = None
-        section_obj = self.root.find('./EPOPolicySettings/Section[@name="{}_ScanOptions"]'.format(__section))
-        if section_obj is not None:
-            setting_obj = section_obj.find('Setting[@name="dwScanItemCount"]')
-            max_rows = int(setting_obj.get('value'))
-            if max_rows > 0:
-                table = list()
-                for row in range(max_rows):
-                    setting_obj = section_obj.find('Setting[@name="szScanItem{}"]'.format(row))
-                    row_value = setting_obj.get('value')
-                    table.append(row_value)
+        table = self.get_list(__section + '_ScanOptions', LOCATIONS)
+        if table:
+            table = [row[0] for row in table]
+        else:
+            table = None
         return table
 
     def set_fs_locations(self, table, __section='FS'):
@@ -217,31 +215,8 @@ class ESTPPolicyOnDemandScan(Policy):
         'SpecialRegistry':          'Registry'
         Note for 'File or folder' simply use the full path directly.
         """
-        success = False
-        section_obj = self.root.find('./EPOPolicySettings/Section[@name="{}_ScanOptions"]'.format(__section))
-        if section_obj is not None:
-            success = True
-            # Get how many row already exist and remove the setting object
-            setting_obj = section_obj.find('Setting[@name="dwScanItemCount"]')
-            max_rows = int(setting_obj.get('value'))
-            section_obj.remove(setting_obj)
-            # Is there some items to remove?
-            if max_rows > 0:
-                # For each row find the object and remove it
-                for i in range(max_rows):
-                    setting_obj = section_obj.find('Setting[@name="szScanItem{}"]'.format(i))
-                    section_obj.remove(setting_obj)
-            # Is there some items to insert?
-            if len(table) > 0:
-                et.SubElement(section_obj, 'Setting',
-                              {"name":'dwScanItemCount', "value":str(len(table))})
-                for index, location in enumerate(table):
-                    et.SubElement(section_obj, 'Setting',
-                                  {"name":'szScanItem{}'.format(index), "value":location})
-            else:
-                et.SubElement(section_obj, 'Setting',
-                              {"name":'dwScanItemCount', "value":'0'})
-        return success
+        return self.set_list(__section + '_ScanOptions', LOCATIONS,
+                             [[location] for location in table])
 
     fs_locations = property(get_fs_locations, set_fs_locations)
 
@@ -317,17 +292,11 @@ class ESTPPolicyOnDemandScan(Policy):
         Get exclusions list for Full Scan
         Return a list that can be used as ProcessList object.
         """
-        table = None
-        section_obj = self.root.find('./EPOPolicySettings/Section[@name="{}_Exclusions"]'.format(__section))
-        if section_obj is not None:
-            setting_obj = section_obj.find('Setting[@name="dwExclusionCount"]')
-            max_rows = int(setting_obj.get('value'))
-            if max_rows > 0:
-                table = list()
-                for row in range(max_rows):
-                    setting_obj = section_obj.find('Setting[@name="ExcludedItem_{}"]'.format(row))
-                    row_values = setting_obj.get('value').split('|')
-                    table.append(row_values)
+        table = self.get_list(__section + '_Exclusions', EXCLUSIONS)
+        if table:
+            table = decode_exclusions(table)
+        else:
+            table = None
         return table
 
     def set_fs_exclusion_list(self, table, __section='FS'):
@@ -335,24 +304,8 @@ class ESTPPolicyOnDemandScan(Policy):
         Set exclusions list for Full Scan
         Use a list or a ProcessList object as input
         """
-        success = False
-        section_obj = self.root.find('./EPOPolicySettings/Section[@name="{}_Exclusions"]'.format(__section))
-        if section_obj is not None:
-            success = True
-            parent_obj = self.root.find('./EPOPolicySettings')
-            parent_obj.remove(section_obj)
-            section_obj = et.SubElement(parent_obj, 'Section', name=__section + '_Exclusions')
-            if len(table) > 0:
-                et.SubElement(section_obj, 'Setting',
-                              {"name":'dwExclusionCount', "value":str(len(table))})
-                for index, row in enumerate(table):
-                    exclusion = row[0] + '|' + row[1] + '|' + row[2] + '|' + row[3]
-                    et.SubElement(section_obj, 'Setting',
-                                  {"name":'ExcludedItem_{}'.format(index), "value":exclusion})
-            else:
-                et.SubElement(section_obj, 'Setting',
-                              {"name":'dwExclusionCount', "value":'0'})
-        return success
+        rows = encode_exclusions(table)
+        return self.set_list(__section + '_Exclusions', EXCLUSIONS, rows)
 
     fs_exclusion_list = property(get_fs_exclusion_list, set_fs_exclusion_list)
 
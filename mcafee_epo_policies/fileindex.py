@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+################################################################################
+# Copyright (c) 2019 Benjamin Marandel - All Rights Reserved.
+################################################################################
+
+"""
+This module defines one Class object: PolicyFileIndex.
+This class records where each policy is located in an export file, so a single
+policy can be extracted without parsing the whole file. The index is saved in a
+sidecar file next to the export and is rebuilt when the export changes.
+"""
+
+import os
+import json
+import mmap
+import hashlib
+import xml.etree.ElementTree as et
+from . import scanner
+from .compression import detect_compression
+
+INDEX_VERSION = 3
+
+class PolicyFileIndex():
+    """
+    PolicyFileIndex is a class object containing the byte ranges of the EPOPolicyObject
+    and EPOPolicySettings elements of an export file.
+    """
+
+    def __init__(self, file_path, index_path=None):
+        self.file_path = file_path
+        self.index_path = index_path if index_path is not None else file_path + '.idx'
+        self.data = None
+        self.policies = {}
+
+    def __repr__(self):
+        return '<PolicyFileIndex for file {} which contains {} policies>'.format(
+            self.file_path, len(self.policies))
+
+    @classmethod
+    def open(cls, file_path, index_path=None, verify_hash=True):
+        """
+        Returns the index of an export file. The sidecar index is loaded if it is
+        still valid, other else it is built and saved.
+
+        :param: file_path: The path of the export file.
+        :param: index_path: The path of the sidecar index (default: file_path + '.idx').
+        :param: verify_hash: If True, an index whose export has the same size but a
+                             new modification time is kept when the SHA-256 of the
+                             export hasn't changed, instead of being rebuilt.
+        """
+        index = cls(file_path, index_path)
+        if not index.load(verify_hash):
+            index.build()
+            index.save()
+        return index
+
+    @staticmethod
+    def get_file_hash(file_path):
+        """
+        Returns the SHA-256 (hex) of a file.
+        """
+        file_hash = hashlib.sha256()
+        with open(file_path, 'rb') as export_file:
+            for chunk in iter(lambda: export_file.read(1024 * 1024), b''):
+                file_hash.update(chunk)
+        return file_hash.hexdigest()
+
+    def is_valid(self, verify_hash=False):
+        """
+        Returns True if the index matches the size and the modification time of the
+        export file. The content hash is only checked, if verify_hash is True, when the
+        size matches but the modification time doesn't (a file touched or copied).
+        """
+        if self.data is None:
+            return False
+        try:
+            file_stat = os.stat(self.file_path)
+        except OSError:
+            return False
+        if file_stat.st_size != self.data['size']:
+            return False
+        if file_stat.st_mtime_ns == self.data['mtime_ns']:
+            return True
+        return verify_hash and self.get_file_hash(self.file_path) == self.data['sha256']
+
+    def build(self):
+        """
+        Scan the export file and record the byte ranges of its elements.
+        The byte ranges are the ones of the file, so it can't be compressed.
+        """
+        compression = detect_compression(self.file_path)
+        if compression is not None:
+            raise ValueError('Can\'t index a {} compressed export: {}.'.format(
+                compression, self.file_path))
+        file_stat = os.stat(self.file_path)
+        with open(self.file_path, 'rb') as export_file, \
+                mmap.mmap(export_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            root_start, root_end = scanner.find_root(buffer)
+            header = None
+            policies = []
+            settings = {}
+            for tag, start, end, start_tag_end in scanner.iter_elements(
+                    buffer, start=root_start[1], end=root_end[0]):
+                if tag == 'EPOPolicyVerInfo':
+                    header = [start, end]
+                elif tag == 'EPOPolicySettings':
+                    name = scanner.parse_start_tag(buffer, start, start_tag_end)['name']
+                    settings.setdefault(name, [start, end])
+                else:
+                    policy_obj = et.fromstring(buffer[start:end])
+                    policies.append([policy_obj.get('typeid'),
+                                     policy_obj.get('name'),
+                                     start, end,
+                                     [ref.text for ref in policy_obj.findall('PolicySettings')],
+                                     policy_obj.get('featureid'),
+                                     dict(policy_obj.attrib)])
+        self.data = {'version': INDEX_VERSION,
+                     'size': file_stat.st_size,
+                     'mtime_ns': file_stat.st_mtime_ns,
+                     'sha256': self.get_file_hash(self.file_path),
+                     'root': [list(root_start), list(root_end)],
+                     'header': header,
+                     'policies': policies,
+                     'settings': settings}
+        self.__update_policies()
+
+    def load(self, verify_hash=True):
+        """
+        Load the sidecar index. Returns False if it is missing, unreadable or outdated.
+        """
+        try:
+            with open(self.index_path, 'rt') as index_file:
+                self.data = json.load(index_file)
+        except (OSError, ValueError):
+            self.data = None
+            return False
+        if self.data.get('version') != INDEX_VERSION or not self.is_valid(verify_hash):
+            self.data = None
+            return False
+        mtime_ns = os.stat(self.file_path).st_mtime_ns
+        if mtime_ns != self.data['mtime_ns']:
+            # Same content (see is_valid): the next load doesn't need to hash the file
+            self.data['mtime_ns'] = mtime_ns
+            self.save()
+        self.__update_policies()
+        return True
+
+    def save(self):
+        """
+        Save the sidecar index. Returns False if it cannot be written.
+        """
+        success = False
+        try:
+            with open(self.index_path, 'wt') as index_file:
+                json.dump(self.data, index_file)
+            success = True
+        except OSError:
+            pass
+        return success
+
+    def __update_policies(self):
+        # The first occurrence of a policy exported twice wins, like Policies.get_policy()
+        self.policies = {}
+        for row in self.data['policies']:
+            self.policies.setdefault((row[0], row[1]), row)
+
+    def contain(self, type_id, name):
+        """
+        Returns True if the export contains a policy (name) for a specific type (type_id).
+        """
+        return (type_id, name) in self.policies
+
+    def list(self):
+        """
+        Returns a table containing the list of policy name for each policy type.
+        """
+        return [{'typeid': type_id, 'name': name} for type_id, name in sorted(self.policies)]
+
+    def get_ranges(self, type_id, name):
+        """
+        Returns the list of (start, end) byte ranges needed to rebuild a policy:
+        the XML declaration, the root start tag, the header, the settings, the
+        policy object and the root end tag.
+        """
+        row = self.policies.get((type_id, name))
+        if row is None:
+            return None
+        return self.__get_row_ranges(row)
+
+    def __get_row_ranges(self, row):
+        root_start, root_end = self.data['root']
+        ranges = [(0, root_start[1])]
+        if self.data['header'] is not None:
+            ranges.append(tuple(self.data['header']))
+        for policy_ref in row[4]:
+            settings_range = self.data['settings'].get(policy_ref)
+            if settings_range is not None:
+                ranges.append(tuple(settings_range))
+        ranges.append((row[2], row[3]))
+        ranges.append(tuple(root_end))
+        return ranges
+
+    def get_slice_ranges(self, keys):
+        """
+        Returns the list of (start, end) byte ranges of an export containing only
+        some policies: the XML declaration, the root start tag, the header, the
+        settings referenced by those policies (once each), the policy objects and
+        the root end tag, in the order of the export file.
+
+        :param: keys: An iterable of (type_id, name) tuples.
+        """
+        root_start, root_end = self.data['root']
+        body = set()
+        for key in keys:
+            row = self.policies[key]
+            for policy_ref in row[4]:
+                settings_range = self.data['settings'].get(policy_ref)
+                if settings_range is not None:
+                    body.add(tuple(settings_range))
+            body.add((row[2], row[3]))
+        ranges = [(0, root_start[1])]
+        if self.data['header'] is not None:
+            ranges.append(tuple(self.data['header']))
+        ranges.extend(sorted(body))
+        ranges.append(tuple(root_end))
+        return ranges
+
+    def get_policy(self, type_id, name):
+        """
+        Returns a Policy content (root Element) of a policy (name) for a specific
+        type (type_id), parsing only the byte ranges of that policy.
+        """
+        if not self.is_valid():
+            self.build()
+            self.save()
+        ranges = self.get_ranges(type_id, name)
+        if ranges is None:
+            return None
+        with open(self.file_path, 'rb') as export_file, \
+                mmap.mmap(export_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return et.fromstring(b'\n'.join(buffer[start:end] for start, end in ranges))
+
+    def iter_policies(self, feature_id=None, type_ids=None):
+        """
+        Yield a Policy content (root Element) for each policy object of the export, in
+        the order of the file, parsing only the byte ranges of one policy at a time.
+        A policy exported twice is returned twice.
+
+        :param: feature_id: If set, only the policies of that product are returned.
+        :param: type_ids: If set, only the policies of those types are returned.
+        """
+        with open(self.file_path, 'rb') as export_file, \
+                mmap.mmap(export_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            for row in self.data['policies']:
+                if ((feature_id is None or row[5] == feature_id) and
+                        (type_ids is None or row[0] in type_ids)):
+                    yield et.fromstring(b'\n'.join(buffer[start:end] for start, end
+                                                   in self.__get_row_ranges(row)))
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+################################################################################
+# Copyright (c) 2019 Benjamin Marandel - All Rights Reserved.
+################################################################################
+
+"""
+This module defines one Class object: PolicyHashTree.
+This class records a snapshot of an export as a tree of hashes: the export, its
+types of policies, buckets of policies of each type, the policies, their
+EPOPolicySettings, their Sections and the values of their Settings.
+Two snapshots are compared from the top of the tree, only descending into the
+nodes whose hashes differ: the cost of the comparison depends on what changed,
+not on the size of the export. A snapshot is saved as JSON, so it can be compared
+later on without the export it was built from.
+"""
+
+import json
+import hashlib
+from .policies import get_settings_fingerprints, get_settings_keys, combine_fingerprints
+from .listcodec import ListCodec
+
+TREE_VERSION = 2
+
+# Number of hex digits of the hash of a policy name giving its bucket: the policies of
+# a type are spread over up to 256 buckets, so a change only rehashes one bucket
+BUCKET_DIGITS = 2
+
+def get_bucket(name):
+    """
+    Returns the bucket of a policy name within the policies of its type.
+    """
+    return hashlib.sha256(name.encode('utf8')).hexdigest()[:BUCKET_DIGITS]
+
+class PolicyHashTree():
+    """
+    PolicyHashTree is a class object containing the hashes of a snapshot of an export:
+        types: {typeid: [hash, {bucket: [hash, [(typeid, name)]]}]}
+        policies: {(typeid, name): [hash, [[block, settings name]]]}
+        settings: {settings name: [hash, {section: [hash, {setting: value}]}]}
+    The blocks of a policy are identified by get_settings_keys, so a settings block
+    whose generated name changed is compared with its previous version.
+    The hashes are the fingerprints of Policy (see Policy.get_fingerprint), so they
+    don't depend on the order of the elements.
+    """
+
+    def __init__(self, policies=None, settings=None):
+        self.policies = policies if policies is not None else {}
+        self.settings = settings if settings is not None else {}
+        # Policies of each type, spread over buckets by name
+        self.types = {}
+        for key in sorted(self.policies):
+            buckets = self.types.setdefault(key[0], [None, {}])[1]
+            buckets.setdefault(get_bucket(key[1]), [None, []])[1].append(key)
+        for type_node in self.types.values():
+            for bucket_node in type_node[1].values():
+                bucket_node[0] = self.__get_hash(bucket_node[1])
+            type_node[0] = hashlib.sha256(''.join(
+                '{}{}'.format(bucket, bucket_hash) for bucket, (bucket_hash, _)
+                in sorted(type_node[1].items())).encode()).hexdigest()
+        self.hash = hashlib.sha256(''.join(
+            type_hash for _, (type_hash, _) in sorted(self.types.items())).encode()).hexdigest()
+
+    def __repr__(self):
+        return '<PolicyHashTree {} which contains {} policies>'.format(
+            self.hash[:16], len(self.policies))
+
+    def __eq__(self, other):
+        return isinstance(other, PolicyHashTree) and self.hash == other.hash
+
+    def __get_hash(self, keys):
+        node_hash = hashlib.sha256()
+        for type_id, name in keys:
+            node_hash.update('{}\0{}\0{}\0'.format(
+                type_id, name, self.policies[(type_id, name)][0]).encode('utf8'))
+        return node_hash.hexdigest()
+
+    @classmethod
+    def build(cls, policies):
+        """
+        Returns the PolicyHashTree of a Policies, built in one walk of the export.
+
+        :param: policies: The Policies object.
+        """
+        settings = {}
+        settings_objs = {}
+        tree_policies = {}
+        if policies.root is None:
+            return cls()
+        for settings_obj in policies.root.findall('EPOPolicySettings'):
+            if settings_obj.get('name') in settings:
+                continue
+            settings_hash, section_hashes = get_settings_fingerprints(settings_obj)
+            sections = {}
+            for section_obj in settings_obj.findall('Section'):
+                section = section_obj.get('name')
+                # The first Section wins when a name is used twice, like Policy.get_section()
+                if section not in sections:
+                    sections[section] = [section_hashes[section],
+                                         ListCodec.get_values(section_obj)]
+            settings[settings_obj.get('name')] = [settings_hash, sections]
+            settings_objs[settings_obj.get('name')] = settings_obj
+        for policy_obj in policies.root.findall('EPOPolicyObject'):
+            refs = [policy_ref.text for policy_ref in policy_obj.findall('PolicySettings')
+                    if policy_ref.text in settings]
+            blocks = get_settings_keys(policy_obj.get('name'),
+                                       [settings_objs[ref] for ref in refs])
+            tree_policies.setdefault((policy_obj.get('typeid'), policy_obj.get('name')), [
+                combine_fingerprints(settings[ref][0] for ref in refs),
+                [[block, ref] for block, ref in zip(blocks, refs)]])
+        return cls(tree_policies, settings)
+    def save(self, file_path):
+        """
+        Save the PolicyHashTree in a JSON file.
+        """
+        with open(file_path, 'wt') as tree_file:
+            json.dump({'version': TREE_VERSION,
+                       'hash': self.hash,
+                       'policies': [[type_id, name, policy_hash, refs] for
+                                    (type_id, name), (policy_hash, refs) in self.policies.items()],
+                       'settings': self.settings}, tree_file)
+
+    @classmethod
+    def load(cls, file_path):
+        """
+        Returns a PolicyHashTree saved in a JSON file.
+        """
+        with open(file_path, 'rt') as tree_file:
+            data = json.load(tree_file)
+        if data.get('version') != TREE_VERSION:
+            raise ValueError('Unsupported version of hash tree: {}.'.format(data.get('version')))
+        return cls({(type_id, name): [policy_hash, refs]
+                    for type_id, name, policy_hash, refs in data['policies']},
+                   data['settings'])
+
+    def compare(self, other):
+        """
+        Returns the changes from the snapshot to another snapshot (the newer one).
+        Each change is a dict {'change': 'added', 'removed' or 'changed', 'typeid',
+        'name', 'settings', 'section', 'setting', 'old', 'new'}, the keys below the
+        level of the change being None: a removed policy only has its typeid and name,
+        a changed setting has all of them and its old and new values.
+        The settings blocks of a policy are matched by their key (see
+        get_settings_keys), which is the value of 'settings'.
+
+        :param: other: The PolicyHashTree to compare with.
+        :return: The list of the changes, sorted by type then policy.
+        """
+        changes = []
+        if self.hash == other.hash:
+            return changes
+
+        def add(change, key, settings=None, section=None, setting=None, old=None, new=None):
+            changes.append({'change': change, 'typeid': key[0], 'name': key[1],
+                            'settings': settings, 'section': section, 'setting': setting,
+                            'old': old, 'new': new})
+
+        for type_id in sorted(set(self.types) | set(other.types)):
+            type_hash, buckets = self.types.get(type_id, (None, {}))
+            other_hash, other_buckets = other.types.get(type_id, (None, {}))
+            if type_hash == other_hash:
+                continue
+            keys = []
+            other_keys = []
+            for bucket in set(buckets) | set(other_buckets):
+                bucket_hash, bucket_keys = buckets.get(bucket, (None, []))
+                other_bucket_hash, other_bucket_keys = other_buckets.get(bucket, (None, []))
+                if bucket_hash != other_bucket_hash:
+                    keys.extend(bucket_keys)
+                    other_keys.extend(other_bucket_keys)
+            for key in sorted(keys):
+                other_policy = other.policies.get(key)
+                if other_policy is None:
+                    add('removed', key)
+                elif other_policy[0] != self.policies[key][0]:
+                    self.__compare_settings(other, key, self.policies[key][1],
+                                            other_policy[1], add)
+            for key in sorted(other_keys):
+                if key not in self.policies:
+                    add('added', key)
+        return changes
+
+    def __compare_settings(self, other, key, blocks, other_blocks, add):
+        other_refs = dict(other_blocks)
+        for block, ref in blocks:
+            other_ref = other_refs.get(block)
+            if other_ref is None:
+                add('removed', key, block)
+                continue
+            settings_hash, sections = self.settings[ref]
+            other_hash, other_sections = other.settings[other_ref]
+            if settings_hash == other_hash:
+                continue
+            for section, (section_hash, values) in sections.items():
+                other_section = other_sections.get(section)
+                if other_section is None:
+                    add('removed', key, block, section)
+                elif other_section[0] != section_hash:
+                    other_values = other_section[1]
+                    for setting, value in values.items():
+                        if setting not in other_values:
+                            add('removed', key, block, section, setting, old=value)
+                        elif other_values[setting] != value:
+                            add('changed', key, block, section, setting, value,
+                                other_values[setting])
+                    for setting, value in other_values.items():
+                        if setting not in values:
+                            add('added', key, block, section, setting, new=value)
+            for section in other_sections:
+                if section not in sections:
+                    add('added', key, block, section)
+        refs = dict(blocks)
+        for block, _ in other_blocks:
+            if block not in refs:
+                add('added', key, block)
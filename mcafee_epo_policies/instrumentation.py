@@ -0,0 +1,343 @@
+# -*- coding: utf-8 -*-
+################################################################################
+# Copyright (c) 2019 Benjamin Marandel - All Rights Reserved.
+################################################################################
+
+"""
+This module defines one Class object: Instrumentation.
+An Instrumentation counts and times, while it is active:
+    - the lookups of elements in the XML tree, per accessor (the method of the
+      package called by the application, for instance ESTPPolicyOnAccessScan.get_gti_level),
+    - the lists decoded and encoded (see ListCodec), per Section,
+    - the XML parsed by load_from_file and set_xml_content,
+    - the XML serialized by get_xml_content, write_xml_content and save_to_file.
+
+The methods are only wrapped while at least one Instrumentation is active, the
+package runs its original code otherwise. For instance:
+
+    with instrumentation.measure() as stats:
+        policy.set_exclusion_list(table)
+    print(stats.snapshot())
+
+The measurement is global to the process (not thread-safe).
+"""
+
+import os
+import sys
+import time
+import inspect
+from .policies import XmlObject, Policies
+from .listcodec import ListCodec
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Methods doing the lookups of elements in the tree (find, findall and the indexes
+# built from them). They are wrapped on every class defining them, so an override
+# (for instance Policy.get_product) is measured as well as the method it replaces.
+LOOKUPS = [
+    'get_epo_version',
+    'get_epo_server',
+    'get_product',
+    'get_name',
+    'get_type',
+    'refresh_index',
+    '_get_policy_object',
+    '_get_policy_settings',
+    '_index_section',
+    '_get_setting',
+    'get_section',
+]
+
+_active = []
+_originals = {}
+_depth = {'parse': 0, 'serialize': 0}
+_section = [None]
+
+
+class Instrumentation():
+    """
+    Instrumentation is a class object collecting the measures of the package while it
+    is active: between start() and stop(), or within a with statement.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def __repr__(self):
+        return '<Instrumentation {}>'.format('active' if self in _active else 'inactive')
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self):
+        """
+        Start collecting the measures.
+        """
+        if self not in _active:
+            if not _active:
+                _install()
+            _active.append(self)
+
+    def stop(self):
+        """
+        Stop collecting the measures.
+        """
+        if self in _active:
+            _active.remove(self)
+            if not _active:
+                _uninstall()
+
+    def reset(self):
+        """
+        Clear the measures.
+        """
+        self.lookups = {}
+        self.lists = {}
+        self.io = {'parse': [0, 0, 0.0], 'serialize': [0, 0, 0.0]}
+
+    def snapshot(self):
+        """
+        Returns the measures as a dictionary:
+            lookups: {accessor: {lookup method: {'count', 'time'}}}
+            lists: {section: {'decoded', 'decoded_rows', 'decode_time',
+                              'encoded', 'encoded_rows', 'encode_time'}}
+            parse, serialize: {'count', 'bytes', 'time', 'bytes_per_sec'}
+        The times are in seconds.
+        """
+        snapshot = {
+            'lookups': {accessor: {method: {'count': count, 'time': duration}
+                                   for method, (count, duration) in methods.items()}
+                        for accessor, methods in self.lookups.items()},
+            'lists': {section: dict(values) for section, values in self.lists.items()},
+        }
+        for name, (count, size, duration) in self.io.items():
+            snapshot[name] = {'count': count, 'bytes': size, 'time': duration,
+                              'bytes_per_sec': size / duration if duration else None}
+        return snapshot
+
+
+def _get_accessor(default):
+    """
+    Returns the qualified name of the outermost method of the package in the call
+    stack of the caller, that is the method called by the application.
+    """
+    accessor = default
+    frame = sys._getframe(2)
+    while frame is not None and frame.f_code.co_filename.startswith(PACKAGE_DIR):
+        if frame.f_code.co_filename != __file__:
+            accessor = getattr(frame.f_code, 'co_qualname', frame.f_code.co_name)
+        frame = frame.f_back
+    return accessor
+
+
+def _wrap_lookup(cls, name, function):
+    method = '{}.{}'.format(cls.__name__, name)
+
+    def wrapper(*args, **kwargs):
+        accessor = _get_accessor(method)
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            duration = time.perf_counter() - start
+            for instrumentation in _active:
+                counter = instrumentation.lookups.setdefault(accessor, {}).setdefault(
+                    method, [0, 0.0])
+                counter[0] += 1
+                counter[1] += duration
+    return wrapper
+
+
+def _get_size(source):
+    """
+    Returns the size of a file (path or file object), None if unknown.
+    """
+    try:
+        if isinstance(source, (str, bytes, os.PathLike)):
+            return os.path.getsize(source)
+        return os.fstat(source.fileno()).st_size
+    except (OSError, AttributeError, ValueError):
+        return None
+
+
+def _get_data_size(xml_data):
+    """
+    Returns the size in bytes of XML content, a string being measured UTF-8 encoded.
+    """
+    if isinstance(xml_data, str):
+        return len(xml_data.encode('utf8'))
+    return len(xml_data)
+
+
+def _get_position(stream):
+    """
+    Returns the size of a buffer (bytearray) or the position of a file object, None
+    if unknown.
+    """
+    if isinstance(stream, bytearray):
+        return len(stream)
+    try:
+        return stream.tell()
+    except (OSError, AttributeError, ValueError):
+        return None
+
+
+def _wrap_io(category, function, get_size):
+    """
+    Wrap a method parsing or serializing XML. Only the outermost call is measured,
+    for instance save_to_file but not the get_xml_content it calls.
+    get_size receives the arguments of the call by name, however they were passed,
+    and the result.
+    """
+    signature = inspect.signature(function)
+
+    def wrapper(self, *args, **kwargs):
+        if _depth[category]:
+            return function(self, *args, **kwargs)
+        _depth[category] += 1
+        start = time.perf_counter()
+        try:
+            result = function(self, *args, **kwargs)
+        finally:
+            _depth[category] -= 1
+        duration = time.perf_counter() - start
+        size = get_size(signature.bind(self, *args, **kwargs).arguments, result) or 0
+        for instrumentation in _active:
+            counter = instrumentation.io[category]
+            counter[0] += 1
+            counter[1] += size
+            counter[2] += duration
+        return result
+    return wrapper
+
+
+def _record_list(section, operation, rows, duration):
+    for instrumentation in _active:
+        counter = instrumentation.lists.setdefault(section, {
+            'decoded': 0, 'decoded_rows': 0, 'decode_time': 0.0,
+            'encoded': 0, 'encoded_rows': 0, 'encode_time': 0.0})
+        counter[operation + 'd'] += 1
+        counter[operation + 'd_rows'] += rows
+        counter[operation + '_time'] += duration
+
+
+def _wrap_get_values(function):
+    def wrapper(section_obj):
+        # Remember the Section for the decode() which follows
+        _section[0] = section_obj.get('name')
+        return function(section_obj)
+    return staticmethod(wrapper)
+
+
+def _wrap_decode(function):
+    def wrapper(self, values):
+        start = time.perf_counter()
+        rows = function(self, values)
+        _record_list(_section[0] or self.count, 'decode', len(rows or []),
+                     time.perf_counter() - start)
+        return rows
+    return wrapper
+
+
+def _wrap_write(function):
+    def wrapper(self, section_obj, rows, *args, **kwargs):
+        start = time.perf_counter()
+        result = function(self, section_obj, rows, *args, **kwargs)
+        _record_list(section_obj.get('name'), 'encode', len(rows),
+                     time.perf_counter() - start)
+        return result
+    return wrapper
+
+
+def _get_classes(cls):
+    """
+    Returns a class and its subclasses loaded so far, parents first.
+    """
+    classes = [cls]
+    for subclass in cls.__subclasses__():
+        for child in _get_classes(subclass):
+            if child not in classes:
+                classes.append(child)
+    return classes
+
+
+def _install():
+    def replace(cls, name, wrapper):
+        _originals[(cls, name)] = cls.__dict__[name]
+        setattr(cls, name, wrapper)
+
+    for cls in _get_classes(XmlObject):
+        for name in LOOKUPS:
+            if name in cls.__dict__:
+                replace(cls, name, _wrap_lookup(cls, name, cls.__dict__[name]))
+    replace(XmlObject, 'load_from_file', _wrap_io(
+        'parse', XmlObject.load_from_file,
+        lambda arguments, result: _get_size(arguments['file_path'])))
+    replace(Policies, 'load_from_file', _wrap_io(
+        'parse', Policies.load_from_file,
+        lambda arguments, result: _get_size(arguments['file_path'])))
+    replace(XmlObject, 'set_xml_content', _wrap_io(
+        'parse', XmlObject.set_xml_content,
+        lambda arguments, result: _get_data_size(arguments['xml_data'])))
+    replace(XmlObject, 'get_xml_content', _wrap_io(
+        'serialize', XmlObject.get_xml_content, lambda arguments, result: len(result)))
+    replace(XmlObject, 'write_xml_content', _wrap_io(
+        'serialize', XmlObject.write_xml_content,
+        lambda arguments, result: _get_position(arguments['stream']) if result else 0))
+    replace(XmlObject, 'save_to_file', _wrap_io(
+        'serialize', XmlObject.save_to_file,
+        lambda arguments, result: _get_size(arguments['file_path']) if result else 0))
+    replace(ListCodec, 'get_values', _wrap_get_values(ListCodec.get_values))
+    replace(ListCodec, 'decode', _wrap_decode(ListCodec.decode))
+    replace(ListCodec, 'write', _wrap_write(ListCodec.write))
+
+
+def _uninstall():
+    for (cls, name), original in _originals.items():
+        setattr(cls, name, original)
+    _originals.clear()
+    _section[0] = None
+
+
+# The default Instrumentation used by the module functions
+_default = Instrumentation()
+
+def enable():
+    """
+    Start collecting the measures of the default Instrumentation.
+    """
+    _default.start()
+
+def disable():
+    """
+    Stop collecting the measures of the default Instrumentation.
+    """
+    _default.stop()
+
+def is_enabled():
+    """
+    Returns True if at least one Instrumentation is active.
+    """
+    return bool(_active)
+
+def reset():
+    """
+    Clear the measures of the default Instrumentation.
+    """
+    _default.reset()
+
+def snapshot():
+    """
+    Returns the measures of the default Instrumentation (see Instrumentation.snapshot).
+    """
+    return _default.snapshot()
+
+def measure():
+    """
+    Returns a new Instrumentation to be used in a with statement, to measure one job.
+    """
+    return Instrumentation()
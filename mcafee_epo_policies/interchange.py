@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+################################################################################
+# Copyright (c) 2019 Benjamin Marandel - All Rights Reserved.
+################################################################################
+
+"""
+This module defines the functions converting an export (or a policy) to and from
+JSON Lines, a compact interchange format which is loaded several times faster than
+the XML (see XmlObject.get_json_lines and XmlObject.set_json_lines).
+
+The first line holds the root element and the whitespace found between the elements,
+then each child of the root (EPOPolicyVerInfo, EPOPolicySettings, EPOPolicyObject) is
+written on its own line as a node: [tag, {attributes}, [children], text, tail]. The
+text and the tail are left out when they are the usual whitespace. The children of
+an element holding only plain Settings are written as a flat list of names and
+values: ["bOASEnabled", "1", "bScanBootSectors", "1"], and the children of an element
+holding only Sections of plain Settings (an EPOPolicySettings) as columns: {"names":
+[section names], "counts": [number of Settings], "values": [names and values of all
+the Settings]}, so that they are built a block at a time. Every attribute, text and
+child is kept in its order, so the XML content of a loaded tree is the XML content
+of the tree it was written from.
+"""
+
+import json
+import itertools
+import collections
+import xml.etree.ElementTree as et
+
+FORMAT = 'mcafee_epo_policies'
+# Changed each time the layout of the lines changes
+FORMAT_VERSION = 1
+# The attributes of a plain Setting, in their order
+SETTING_KEYS = ('name', 'value')
+# The attributes of a plain Section
+SECTION_KEYS = ('name',)
+
+_consume = collections.deque(maxlen=0).extend
+
+def _get_spacing(root):
+    """
+    Returns the usual (text, tail) of the elements: the text of the elements which
+    have children and the tail of every element, taken from the root.
+    """
+    return (root.text if len(root) else None, root[0].tail if len(root) else None)
+
+def _is_plain_setting(elem, tail):
+    return (elem.tag == 'Setting' and elem.text is None and elem.tail == tail and
+            not len(elem) and tuple(elem.attrib) == SETTING_KEYS)
+
+def _is_plain_section(elem, spacing):
+    return (elem.tag == 'Section' and elem.tail == spacing[1] and
+            elem.text == (spacing[0] if len(elem) else None) and
+            tuple(elem.attrib) == SECTION_KEYS and
+            all(_is_plain_setting(child, spacing[1]) for child in elem))
+
+def encode_element(elem, spacing):
+    """
+    Returns the node (JSON serializable list) of an element and of its children.
+
+    :param: spacing: The usual (text, tail) of the elements, which are left out.
+    """
+    text_default, tail_default = spacing
+    node = [elem.tag, elem.attrib]
+    if not len(elem):
+        node.append([])
+        text_default = None
+    elif all(_is_plain_setting(child, tail_default) for child in elem):
+        node.append([value for child in elem for value in child.attrib.values()])
+    elif all(_is_plain_section(child, spacing) for child in elem):
+        node.append({'names': [child.get('name') for child in elem],
+                     'counts': [len(child) for child in elem],
+                     'values': [value for child in elem for setting_obj in child
+                                for value in setting_obj.attrib.values()]})
+    else:
+        node.append([encode_element(child, spacing) for child in elem])
+    if elem.tail != tail_default:
+        node.extend((elem.text, elem.tail))
+    elif elem.text != text_default:
+        node.append(elem.text)
+    return node
+
+def _decode_settings(values, spacing):
+    # Built and linked with map() (see parsecache.decode_tree), the attributes are set
+    # without being copied by the Element constructor
+    settings = list(map(et.Element, itertools.repeat('Setting', len(values) // 2)))
+    values = iter(values)
+    _consume(map(setattr, settings, itertools.repeat('attrib'),
+                 [{'name': name, 'value': value} for name, value in zip(values, values)]))
+    _consume(map(setattr, settings, itertools.repeat('tail'), itertools.repeat(spacing[1])))
+    return settings
+
+def _decode_sections(columns, spacing):
+    settings = _decode_settings(columns['values'], spacing)
+    counts = columns['counts']
+    sections = list(map(et.Element, itertools.repeat('Section', len(counts))))
+    _consume(map(setattr, sections, itertools.repeat('attrib'),
+                 [{'name': name} for name in columns['names']]))
+    _consume(map(setattr, sections, itertools.repeat('text'),
+                 [spacing[0] if count else None for count in counts]))
+    _consume(map(setattr, sections, itertools.repeat('tail'), itertools.repeat(spacing[1])))
+    start = 0
+    for section_obj, count in zip(sections, counts):
+        section_obj.extend(settings[start:start + count])
+        start += count
+    return sections
+
+def decode_element(node, spacing):
+    """
+    Returns the element of a node written by encode_element.
+    """
+    elem = et.Element(node[0], node[1])
+    children = node[2]
+    if isinstance(children, dict):
+        elem.extend(_decode_sections(children, spacing))
+    elif children and isinstance(children[0], str):
+        elem.extend(_decode_settings(children, spacing))
+    elif children:
+        elem.extend([decode_element(child, spacing) for child in children])
+    if len(node) > 3:
+        elem.text = node[3]
+    elif len(elem):
+        elem.text = spacing[0]
+    elem.tail = node[4] if len(node) > 4 else spacing[1]
+    return elem
+
+def write_json_lines(root, stream):
+    """
+    Write a tree as JSON Lines into a stream (a file object opened in text mode).
+
+    :param: root: The root Element of the tree.
+    """
+    spacing = _get_spacing(root)
+    stream.write(json.dumps({'format': FORMAT, 'version': FORMAT_VERSION, 'tag': root.tag,
+                             'attrib': root.attrib, 'text': root.text, 'tail': root.tail,
+                             'spacing': spacing}, ensure_ascii=False, separators=(',', ':')))
+    stream.write('\n')
+    for child in root:
+        stream.write(json.dumps(encode_element(child, spacing), ensure_ascii=False,
+                                separators=(',', ':')))
+        stream.write('\n')
+
+def read_json_lines(lines):
+    """
+    Returns the root Element of a tree written by write_json_lines.
+
+    :param: lines: An iterable of the lines (str or bytes), for instance a file object.
+    """
+    lines = iter(lines)
+    try:
+        header = json.loads(next(lines))
+    except StopIteration:
+        raise ValueError('No JSON Lines content.')
+    if not isinstance(header, dict) or header.get('format') != FORMAT:
+        raise ValueError('Not a JSON Lines export of policies.')
+    if header.get('version') != FORMAT_VERSION:
+        raise ValueError('Unsupported version of JSON Lines: {}.'.format(header.get('version')))
+    spacing = tuple(header['spacing'])
+    root = et.Element(header['tag'], header['attrib'])
+    root.text = header['text']
+    root.tail = header['tail']
+    root.extend([decode_element(json.loads(line), spacing) for line in lines
+                 if not line.isspace()])
+    return root
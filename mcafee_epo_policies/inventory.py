@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+################################################################################
+# Copyright (c) 2019 Benjamin Marandel - All Rights Reserved.
+################################################################################
+
+"""
+This module defines one Class object: PolicyInventory.
+This class lists the policies of an export from ePolicy Orchestrator by reading
+only the start tags of the EPOPolicyObject elements. The EPOPolicySettings elements
+are skipped without being parsed.
+"""
+
+import mmap
+from . import scanner
+from .compression import open_export, detect_compression
+
+# Size of the chunks read from a compressed export
+SCAN_CHUNK_SIZE = 1024 * 1024
+
+class PolicyInventory():
+    """
+    PolicyInventory is a class object containing the attributes (name, typeid,
+    featureid, serverid...) of each policy of an export.
+    """
+
+    def __init__(self, file_path=None, xml_policies=None, feature_id=None):
+        self.entries = []
+        if file_path is not None:
+            self.scan_file(file_path, feature_id)
+        elif xml_policies is not None:
+            self.scan(xml_policies, feature_id)
+
+    def __repr__(self):
+        return '<PolicyInventory which contains {} policies>'.format(len(self.entries))
+
+    def scan(self, buffer, feature_id=None):
+        """
+        Collect the attributes of the policy objects found in buffer (bytes or memory map).
+
+        :param: buffer: The content of the export.
+        :param: feature_id: If set, only the policies of that product are kept.
+        """
+        entries = []
+        self.__collect(entries, buffer, len(buffer), feature_id)
+        self.entries = entries
+
+    @staticmethod
+    def __collect(entries, buffer, end, feature_id):
+        for start, start_tag_end in scanner.iter_start_tags(buffer, b'EPOPolicyObject', 0, end):
+            attrib = scanner.parse_start_tag(buffer, start, start_tag_end)
+            if feature_id is None or attrib.get('featureid') == feature_id:
+                entries.append(attrib)
+
+    def scan_stream(self, stream, feature_id=None, chunk_size=SCAN_CHUNK_SIZE):
+        """
+        Collect the attributes of the policy objects read from a file object, chunk
+        by chunk: only one chunk of the export is held in memory at a time.
+
+        :param: stream: A file object opened in binary mode.
+        :param: feature_id: If set, only the policies of that product are kept.
+        :param: chunk_size: The number of bytes read at a time.
+        """
+        entries = []
+        pending = b''
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                self.__collect(entries, pending, len(pending), feature_id)
+                break
+            buffer = pending + chunk if pending else chunk
+            # A start tag never contains '<', so the ones starting before the last '<'
+            # are complete: the rest is scanned with the next chunk
+            end = buffer.rfind(b'<')
+            if end < 0:
+                pending = b''
+                continue
+            self.__collect(entries, buffer, end, feature_id)
+            pending = buffer[end:]
+        self.entries = entries
+
+    def scan_file(self, file_path, feature_id=None):
+        """
+        Collect the attributes of the policy objects of an export file.
+
+        :param: file_path: The path of the export file. A compressed export (see
+                           open_export) is decompressed and scanned chunk by chunk
+                           (see scan_stream).
+        :param: feature_id: If set, only the policies of that product are kept.
+        """
+        if detect_compression(file_path) is not None:
+            with open_export(file_path) as stream:
+                self.scan_stream(stream, feature_id)
+            return
+        with open(file_path, 'rb') as export_file, \
+                mmap.mmap(export_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            self.scan(buffer, feature_id)
+
+    def contain(self, type_id, name):
+        """
+        Returns True if the inventory contains a policy (name) for a specific type (type_id).
+        """
+        return any(entry.get('typeid') == type_id and entry.get('name') == name
+                   for entry in self.entries)
+
+    def list_name(self):
+        """
+        Returns a list of policy name found in the inventory.
+        """
+        return sorted(set(entry['name'] for entry in self.entries))
+
+    def list_type(self):
+        """
+        Returns a list of policy type found in the inventory.
+        """
+        return sorted(set(entry['typeid'] for entry in self.entries))
+
+    def list(self):
+        """
+        Returns a table containing the list of policy name for each policy type found
+        in the inventory.
+        """
+        distinct_policies = set((entry['typeid'], entry['name']) for entry in self.entries)
+        return [{'typeid': type_id, 'name': name} for type_id, name in sorted(distinct_policies)]
+
+    def list_servers(self):
+        """
+        Returns a list of ePO server found in the inventory.
+        """
+        return sorted(set(entry.get('serverid', '') for entry in self.entries))
+
+    def list_products(self):
+        """
+        Returns a list of product (featureid) found in the inventory.
+        """
+        return sorted(set(entry.get('featureid', '') for entry in self.entries))
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+################################################################################
+# Copyright (c) 2019 Benjamin Marandel - All Rights Reserved.
+################################################################################
+
+"""
+This module defines two Class objects: PolicyLoader and MemoryBudget.
+A Policy created from a PolicyLoader instead of a root Element is a lazy Policy: it
+only holds the attributes of its policy object (name, type, server, product) and the
+way to load its content, which is loaded the first time it is used. Its content is
+released again, and loaded back when needed, if the MemoryBudget of the loader is
+exceeded:
+
+    budget = MemoryBudget(64 * 1024 * 1024)
+    for policy in Policies.lazy_from_file('export.xml', budget=budget):
+        if policy.get_name().startswith('Servers'):
+            print(policy.get_setting_value('General', 'bOASEnabled'))
+
+See Policies.get_lazy_policies and Policies.lazy_from_file.
+"""
+
+import weakref
+import collections
+
+# Estimated memory (bytes) used by one parsed element: the Element, its attributes
+# and its strings
+ELEMENT_SIZE = 400
+
+def get_tree_size(root):
+    """
+    Returns the estimated memory (bytes) used by a parsed tree.
+    """
+    return sum(1 for _ in root.iter()) * ELEMENT_SIZE
+
+class PolicyLoader():
+    """
+    PolicyLoader is a class object containing what a lazy Policy holds until it is
+    loaded:
+        attrib: The attributes of the EPOPolicyObject element.
+        load: The function (without arguments) returning the content of the Policy
+              (root Element).
+        budget: The MemoryBudget of the content, None to never release it.
+    """
+
+    def __init__(self, attrib, load, budget=None):
+        self.attrib = attrib
+        self.load = load
+        self.budget = budget
+
+    def __repr__(self):
+        return '<PolicyLoader for policy {} of type {}>'.format(
+            self.attrib.get('name'), self.attrib.get('typeid'))
+
+class MemoryBudget():
+    """
+    MemoryBudget is a class object containing the lazy Policy objects whose content
+    is loaded, with its estimated size (see get_tree_size), from the least to the
+    most recently used. When the size of the loaded contents exceeds max_size, the
+    least recently used ones are released (see Policy.release). The content of a
+    Policy which has been changed is never released.
+    """
+
+    def __init__(self, max_size):
+        """
+        :param: max_size: The maximum size (bytes) of the loaded contents.
+        """
+        self.max_size = max_size
+        self.size = 0
+        self.releases = 0
+        # id(policy) -> [weak reference to the policy, size of its content]
+        self.__loaded = collections.OrderedDict()
+
+    def __repr__(self):
+        return '<MemoryBudget of {} bytes: {} policies loaded ({} bytes)>'.format(
+            self.max_size, len(self.__loaded), self.size)
+
+    def __len__(self):
+        return len(self.__loaded)
+
+    def add(self, policy, size):
+        """
+        Record the content of a Policy which has just been loaded, then release the
+        least recently used contents above the maximum size.
+        """
+        key = id(policy)
+        self.discard(policy)
+        self.__loaded[key] = [weakref.ref(policy, lambda _: self.__forget(key)), size]
+        self.size += size
+        for other_key in list(self.__loaded):
+            if self.size <= self.max_size:
+                break
+            if other_key != key:
+                other_policy = self.__loaded[other_key][0]()
+                if other_policy is not None and other_policy.release():
+                    self.releases += 1
+
+    def touch(self, policy):
+        """
+        Mark the content of a Policy as the most recently used.
+        """
+        if id(policy) in self.__loaded:
+            self.__loaded.move_to_end(id(policy))
+
+    def discard(self, policy):
+        """
+        Forget the content of a Policy, which has been released or replaced.
+        """
+        self.__forget(id(policy))
+
+    def __forget(self, key):
+        entry = self.__loaded.pop(key, None)
+        if entry is not None:
+            self.size -= entry[1]
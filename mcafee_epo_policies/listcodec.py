@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+################################################################################
+# Copyright (c) 2019 Benjamin Marandel - All Rights Reserved.
+################################################################################
+
+"""
+This module defines one Class object: ListCodec.
+Many policies store a list in a Section as one Setting holding the number of items
+and one Setting per item and column, for instance:
+    dwExclusionCount, ExcludedItem_0, ExcludedItem_1...
+    dwApplicationCount, szApplicationItem_0, TypeItem_0, szApplicationItem_1, TypeItem_1...
+    _RemotePort, +RemotePort#0, +RemotePort#1...
+A ListCodec reads such a list and rebuilds it with a single pass over the Section.
+"""
+
+import re
+import xml.etree.ElementTree as et
+
+class ListCodec():
+    """
+    ListCodec describes a list stored in a Section.
+
+    :param: count: The name of the Setting holding the number of items.
+    :param: columns: The name of the Setting of each column, '{}' being replaced by
+                     the index of the item (for instance 'ExcludedItem_{}').
+    :param: first: The index of the first item (default 0).
+    """
+
+    def __init__(self, count, columns, first=0):
+        self.count = count
+        self.columns = list(columns)
+        self.first = first
+        self.__pattern = None
+
+    def __repr__(self):
+        return '<ListCodec {} with columns {}>'.format(self.count, ', '.join(self.columns))
+
+    @staticmethod
+    def get_values(section_obj):
+        """
+        Returns a dictionary of the values of all the Setting elements of a Section.
+        The first Setting wins when a name is used twice.
+        """
+        values = {}
+        for setting_obj in section_obj.iterfind('Setting'):
+            values.setdefault(setting_obj.get('name'), setting_obj.get('value'))
+        return values
+
+    def decode(self, values):
+        """
+        Returns the list of items (one list of column values per item) from the
+        dictionary returned by get_values, or None if the count Setting doesn't exist.
+        A missing item Setting is returned as None.
+        """
+        max_rows = values.get(self.count)
+        if max_rows is None:
+            return None
+        columns = self.columns
+        return [[values.get(column.format(row)) for column in columns]
+                for row in range(self.first, self.first + int(max_rows))]
+
+    def read(self, section_obj):
+        """
+        Returns the list of items stored in a Section, or None if the count Setting
+        doesn't exist.
+        """
+        return self.decode(self.get_values(section_obj))
+
+    def owns(self, name):
+        """
+        Returns True if a Setting name is the count or an item of the list.
+        """
+        if self.__pattern is None:
+            item_patterns = []
+            for column in self.columns:
+                prefix, suffix = column.split('{}')
+                item_patterns.append(re.escape(prefix) + r'\d+' + re.escape(suffix))
+            self.__pattern = re.compile('|'.join([re.escape(self.count)] + item_patterns))
+        return self.__pattern.fullmatch(name) is not None
+
+    def write(self, section_obj, rows, empty_count=True):
+        """
+        Replace the list stored in a Section by rows (one list of column values per
+        item). The other settings of the Section are kept in place and the list is
+        added after them.
+
+        :param: section_obj: The Section element.
+        :param: rows: The list of items, each one with a value per column.
+        :param: empty_count: If False, no count Setting is written for an empty list.
+        """
+        for values in rows:
+            if len(values) != len(self.columns):
+                raise ValueError('Each item of {} must have {} values.'.format(
+                    self.count, len(self.columns)))
+        section_obj[:] = [setting_obj for setting_obj in section_obj
+                          if not self.owns(setting_obj.get('name', ''))]
+        settings = []
+        if rows or empty_count:
+            settings.append(et.Element('Setting', {"name": self.count, "value": str(len(rows))}))
+        for row, values in enumerate(rows, self.first):
+            for column, value in zip(self.columns, values):
+                settings.append(et.Element('Setting', {"name": column.format(row), "value": value}))
+        section_obj.extend(settings)
@@ -5,8 +5,24 @@
 
 """ McAfee Agent Policies Class """
 
+import importlib
+
 __all__ = ["mapolicies", "general", "repository"]
 
-from .mapolicies import McAfeeAgentPolicies
-from .general import McAfeeAgentPolicyGeneral
-from .repository import McAfeeAgentPolicyRepository, RepositoryList
\ No newline at end of file
+# Imported on first access (PEP 562): exported name -> module defining it.
+_EXPORTS = {
+    "McAfeeAgentPolicies": ".mapolicies",
+    "McAfeeAgentPolicyGeneral": ".general",
+    "McAfeeAgentPolicyRepository": ".repository",
+    "RepositoryList": ".repository",
+}
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -7,14 +7,23 @@
 This module defines the class McAfeeAgentPolicyGeneral.
 """
 
-import xml.etree.ElementTree as et
 from ..policies import Policy
+from ..listcodec import ListCodec
+
+RELAY_SERVERS = ListCodec('RelayServerCount', ['relayselect_{}', 'relayip_{}', 'relayport_{}'],
+                          first=1)
+# Keys of the table of the Repository branch to use
+BRANCH_SELECTION_KEYS = ['BranchType', 'OneClickEnabled', 'SoftwareID']
+# Keys of the tables (see get_table_value) stored in the Sections
+TABLE_KEYS = {'BranchSelection': BRANCH_SELECTION_KEYS}
 
 class McAfeeAgentPolicyGeneral(Policy):
     """
     The McAfeeAgentPolicyGeneral class can be used to edit the McAfee Agent policy: General.
     """
 
+    LIST_CODECS = (RELAY_SERVERS,)
+
     def __init__(self, policy_from_mcafeeagentpolicies):
         super(McAfeeAgentPolicyGeneral, self).__init__(policy_from_mcafeeagentpolicies)
         if self.get_type() != 'General':
@@ -25,45 +34,47 @@ class McAfeeAgentPolicyGeneral(Policy):
         epo = self.get_epo_server()
         return '<McAfeeAgentPolicyGeneral for policy {} from server {}.>'.format(name, epo)
 
+    def get_list_codecs(self, section, values):
+        """
+        Returns the ListCodecs of the lists stored in a Section, including the table
+        of the Section (see get_table_value) if its keys are known (see TABLE_KEYS).
+        """
+        codecs = super(McAfeeAgentPolicyGeneral, self).get_list_codecs(section, values)
+        if 'NumberOfItems' in values and section in TABLE_KEYS:
+            codecs.append(self.__get_table_codec(TABLE_KEYS[section]))
+        return codecs
+
+    @staticmethod
+    def __get_table_codec(keys):
+        return ListCodec('NumberOfItems', [key + '_{}' for key in keys])
+
     def get_table_value(self, section, keys):
         """
         Get a table (list of list) of a specific section in the XML content
         """
-        table = None
-        section_obj = self.root.find('./EPOPolicySettings/Section[@name="{}"]'.format(section))
-        if section_obj is not None:
-            setting_obj = section_obj.find('Setting[@name="NumberOfItems"]')
-            max_rows = int(setting_obj.get('value'))
-            max_cols = len(keys)
-            table = []
-            for row in range(max_rows):
-                row_value = {}
-                for col in range(max_cols):
-                    setting_obj = section_obj.find('Setting[@name="{}_{}"]'.format(keys[col], row))
-                    row_value[keys[col]] = setting_obj.get('value')
-                table.append(row_value)
+        table = self.get_list(section, self.__get_table_codec(keys))
+        if table is not None:
+            table = [dict(zip(keys, row)) for row in table]
         return table
 
-    def set_table_value(self, section, table):
-        """
-        Set a table (list of list) of a specific section in the XML content
-        """
-        success = False
-        section_obj = self.root.find('./EPOPolicySettings/Section[@name="{}"]'.format(section))
-        if section_obj is not None:
-            success = True
-            max_rows = len(table)
-            keys = table[0].keys()
-            parent_obj = self.root.find('./EPOPolicySettings')
-            parent_obj.remove(section_obj)
-            section_obj = et.SubElement(parent_obj, 'Section', name=section)
-            et.SubElement(section_obj, 'Setting', {"name":'NumberOfItems', "value":str(max_rows)})
-            for row in range(max_rows):
-                for key in keys:
-                    et.SubElement(section_obj,
-                                  'Setting',
-                                  {"name":'{}_{}'.format(key, row), "value":table[row][key]})
-        return success
+    def set_table_value(self, section, table, keys=None):
+        """
+        Set a table (list of list) of a specific section in the XML content.
+        The items of the previous table are removed, for its keys and the known keys
+        of the Section (see TABLE_KEYS): the other settings of the Section are kept.
+
+        :param: keys: The keys of the table, default: the keys of its first row.
+        """
+        section_obj = self.get_section(section)
+        if section_obj is None:
+            return False
+        if keys is None:
+            keys = list(table[0].keys()) if table else []
+        known_keys = [key for key in TABLE_KEYS.get(section, []) if key not in keys]
+        if known_keys:
+            self.__get_table_codec(known_keys).write(section_obj, [], empty_count=False)
+        return self.set_list(section, self.__get_table_codec(keys),
+                             [[row[key] for key in keys] for row in table])
 
     # ------------------------------ GENERAL TAB ------------------------------
     # General options:
@@ -550,53 +561,17 @@ class McAfeeAgentPolicyGeneral(Policy):
         """
         Get the Relay Server list
         """
-        table = None
-        section = 'RelayService'
-        keys = ['relayselect', 'relayip', 'relayport']
-        section_obj = self.root.find('./EPOPolicySettings/Section[@name="{}"]'.format(section))
-        if section_obj is not None:
-            setting_obj = section_obj.find('Setting[@name="RelayServerCount"]')
-            max_rows = int(setting_obj.get('value'))
-            max_cols = len(keys)
-            table = []
-            for row in range(1, max_rows+1):
-                row_value = {}
-                for col in range(max_cols):
-                    setting_obj = section_obj.find('Setting[@name="{}_{}"]'.format(keys[col], row))
-                    row_value[keys[col]] = setting_obj.get('value')
-                table.append(row_value)
+        table = self.get_list('RelayService', RELAY_SERVERS)
+        if table is not None:
+            table = [dict(zip(['relayselect', 'relayip', 'relayport'], row)) for row in table]
         return table
 
     def set_relay_server_list(self, table):
         """
         Set the Relay Server list
         """
-        success = False
-        section = 'RelayService'
-        section_obj = self.root.find('./EPOPolicySettings/Section[@name="{}"]'.format(section))
-        if section_obj is not None:
-            success = True
-            max_rows = len(table)
-            keys = table[0].keys()
-            # Remove existing entries
-            for setting_obj in section_obj.findall('Setting'):
-                if ('relayip' in setting_obj.attrib['name'] or
-                        'relayselect' in setting_obj.attrib['name'] or
-                        'relayport' in setting_obj.attrib['name']):
-                    section_obj.remove(setting_obj)
-            setting_obj = section_obj.find('Setting[@name="RelayServerCount"]')
-            if setting_obj is not None:
-                section_obj.remove(setting_obj)
-            # Create Tag with Value with the current table
-            et.SubElement(section_obj,
-                          'Setting',
-                          {"name":'RelayServerCount', "value":str(max_rows)})
-            for row in range(max_rows):
-                for key in keys:
-                    et.SubElement(section_obj,
-                                  'Setting',
-                                  {"name":'{}_{}'.format(key, row+1), "value":table[row][key]})
-        return success
+        rows = [[row['relayselect'], row['relayip'], row['relayport']] for row in table]
+        return self.set_list('RelayService', RELAY_SERVERS, rows)
 
     relay_server_list = property(get_relay_server_list, set_relay_server_list)
 
@@ -955,14 +930,13 @@ class McAfeeAgentPolicyGeneral(Policy):
         """
         Get  Update type and Repository branch to use
         """
-        keys = ['BranchType', 'OneClickEnabled', 'SoftwareID']
-        return self.get_table_value('BranchSelection', keys)
+        return self.get_table_value('BranchSelection', BRANCH_SELECTION_KEYS)
 
     def set_upd_branch_selection(self, table):
         """
         Set  Update type and Repository branch to use
         """
-        return self.set_table_value('BranchSelection', table)
+        return self.set_table_value('BranchSelection', table, BRANCH_SELECTION_KEYS)
 
     upd_branch_selection = property(get_upd_branch_selection, set_upd_branch_selection)
 
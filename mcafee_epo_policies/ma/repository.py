@@ -7,14 +7,19 @@
 This module defines the class McAfeeAgentPolicyRepository and RepositoryList.
 """
 
-import xml.etree.ElementTree as et
 from ..policies import Policy
+from ..listcodec import ListCodec
+
+DISABLED_SITES = ListCodec('DisabledSiteNum', ['DisabledSites_{}'])
+SITES = ListCodec('SitelistOrderNum', ['SitelistOrder_{}'])
 
 class McAfeeAgentPolicyRepository(Policy):
     """
     The McAfeeAgentPolicyRepository class can be used to edit the McAfee Agent policy: Repository.
     """
 
+    LIST_CODECS = (SITES, DISABLED_SITES)
+
     def __init__(self, policy_from_mcafeeagentpolicies):
         super(McAfeeAgentPolicyRepository, self).__init__(policy_from_mcafeeagentpolicies)
         if self.get_type() != 'Repository':
@@ -30,28 +35,14 @@ class McAfeeAgentPolicyRepository(Policy):
         Get a table (list of list) of sites within the Repository policy
         """
         table = None
-        section_obj = self.root.find('./EPOPolicySettings/Section[@name="InetManager"]')
+        section_obj = self.get_section('InetManager')
         if section_obj is not None:
+            values = ListCodec.get_values(section_obj)
             # If there are some disabled sites, build a list of
-            disabled_sites = []
-            setting_obj = section_obj.find('Setting[@name="DisabledSiteNum"]')
-            if setting_obj is not None:
-                max_rows = int(setting_obj.get('value'))
-                for row in range(max_rows):
-                    setting_obj = section_obj.find('Setting[@name="DisabledSites_{}"]'.format(row))
-                    disabled_sites.append(setting_obj.get('value'))
-            setting_obj = section_obj.find('Setting[@name="SitelistOrderNum"]')
-            max_rows = int(setting_obj.get('value'))
+            disabled_sites = set(row[0] for row in DISABLED_SITES.decode(values) or [])
             table = []
-            for row in range(max_rows):
-                row_value = []
-                setting_obj = section_obj.find('Setting[@name="SitelistOrder_{}"]'.format(row))
-                row_value.append(setting_obj.get('value'))
-                if row_value[0] in disabled_sites:
-                    row_value.append('Disabled')
-                else:
-                    row_value.append('Enabled')
-                table.append(row_value)
+            for row in SITES.decode(values) or []:
+                table.append([row[0], 'Disabled' if row[0] in disabled_sites else 'Enabled'])
         return table
 
     def set_site_list(self, table):
@@ -59,32 +50,14 @@ class McAfeeAgentPolicyRepository(Policy):
         Set a table (list of list) of sites within the Repository policy
         """
         success = False
-        section_obj = self.root.find('./EPOPolicySettings/Section[@name="InetManager"]')
-        if section_obj is not None:
+        if self.get_section('InetManager') is not None:
             success = True
-            parent_obj = self.root.find('./EPOPolicySettings')
-            parent_obj.remove(section_obj)
-            section_obj = et.SubElement(parent_obj, 'Section', name='InetManager')
             # Determine if there are some disabled sites
-            disabled_sites = [row[0] for row in table if row[1] == 'Disabled']
-            if disabled_sites:
-                et.SubElement(section_obj,
-                              'Setting',
-                              {"name":'DisabledSiteNum', "value":str(len(disabled_sites))})
-                for index, site in enumerate(disabled_sites):
-                    et.SubElement(section_obj,
-                                  'Setting',
-                                  {"name":'DisabledSites_{}'.format(index), "value":site})
+            disabled_sites = [[row[0]] for row in table if row[1] == 'Disabled']
+            self.set_list('InetManager', DISABLED_SITES, disabled_sites, empty_count=False)
             # Add all sites
-            sites = [row[0] for row in table]
-            if sites:
-                et.SubElement(section_obj,
-                              'Setting',
-                              {"name":'SitelistOrderNum', "value":str(len(sites))})
-                for index, site in enumerate(sites):
-                    et.SubElement(section_obj,
-                                  'Setting',
-                                  {"name":'SitelistOrder_{}'.format(index), "value":site})
+            self.set_list('InetManager', SITES, [[row[0]] for row in table], empty_count=False)
+            self._invalidate_section('InetManager')
         return success
 
 class RepositoryList():
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+################################################################################
+# Copyright (c) 2019 Benjamin Marandel - All Rights Reserved.
+################################################################################
+
+"""
+This module defines one Class object: SettingsMatrix.
+This class holds the values of Settings across many policies as a matrix: one row per
+policy, one column per (section, setting). Each column is dictionary-encoded: the
+matrix holds, for each policy, the index of its value in the list of the distinct
+values of the column, or -1 if the policy doesn't have that Setting. A condition is
+evaluated once per distinct value, then applied to all the policies at once:
+
+    matrix = SettingsMatrix.build(policies, type_id='EAM_General_Policies')
+    low_gti = matrix.match('GTI', 'GTISensitivityLevel', lambda value: int(value) < 3)
+    print(matrix.get_names(low_gti))
+    print(matrix.count('Alerting', 'bShowAlerts'))
+
+The class requires NumPy, which is not a dependency of the package: pip install numpy.
+"""
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class SettingsMatrix():
+    """
+    SettingsMatrix is a class object containing the values of Settings of policies:
+        rows: [(server, typeid, name)], one per policy
+        columns: [(section, setting)]
+        values: [[value]], the distinct values of each column
+        codes: NumPy int32 array (rows x columns), the index of the value of each
+               policy in the values of the column, -1 if the Setting is missing
+        missing: NumPy bool array (rows x columns), True if the Setting is missing
+    """
+
+    def __init__(self, rows, columns, values, codes):
+        if numpy is None:
+            raise ImportError('SettingsMatrix requires NumPy: pip install numpy')
+        self.rows = rows
+        self.columns = columns
+        self.values = values
+        self.codes = codes
+        self.missing = codes < 0
+        self.__column_index = {column: index for index, column in enumerate(columns)}
+
+    def __repr__(self):
+        return '<SettingsMatrix of {} policies and {} settings>'.format(
+            len(self.rows), len(self.columns))
+
+    @property
+    def shape(self):
+        """
+        The number of rows (policies) and of columns (settings).
+        """
+        return self.codes.shape
+
+    @classmethod
+    def build(cls, policies, type_id=None, columns=None):
+        """
+        Returns the SettingsMatrix of the policies of one or several Policies. The
+        settings blocks are read once, however many policies share them.
+
+        :param: policies: A Policies object or a list of Policies objects.
+        :param: type_id: If set, only the policies of that type are kept.
+        :param: columns: If set, the (section, setting) columns to keep, other else
+                         every Setting found, in the order they are found.
+        :return: A SettingsMatrix.
+        """
+        if numpy is None:
+            raise ImportError('SettingsMatrix requires NumPy: pip install numpy')
+        if not isinstance(policies, (list, tuple)):
+            policies = [policies]
+        fixed = columns is not None
+        columns = list(columns) if fixed else []
+        column_index = {column: index for index, column in enumerate(columns)}
+        rows = []
+        row_values = []
+        for policies_obj in policies:
+            if policies_obj.root is None:
+                continue
+            settings = {}
+            for settings_obj in policies_obj.root.iterfind('EPOPolicySettings'):
+                settings.setdefault(settings_obj.get('name'), settings_obj)
+            block_values = {}
+            for policy_obj in policies_obj.root.iterfind('EPOPolicyObject'):
+                if type_id is not None and policy_obj.get('typeid') != type_id:
+                    continue
+                values = {}
+                for policy_ref in policy_obj.iterfind('PolicySettings'):
+                    if policy_ref.text not in settings:
+                        continue
+                    if policy_ref.text not in block_values:
+                        block_values[policy_ref.text] = cls.__get_block_values(
+                            settings[policy_ref.text])
+                    for key, value in block_values[policy_ref.text].items():
+                        values.setdefault(key, value)
+                rows.append((policy_obj.get('serverid'), policy_obj.get('typeid'),
+                             policy_obj.get('name')))
+                row_values.append(values)
+                if not fixed:
+                    for key in values:
+                        if key not in column_index:
+                            column_index[key] = len(columns)
+                            columns.append(key)
+        dictionaries = [{} for _ in columns]
+        column_codes = [[-1] * len(rows) for _ in columns]
+        for row, values in enumerate(row_values):
+            for key, value in values.items():
+                column = column_index.get(key)
+                if column is not None:
+                    dictionary = dictionaries[column]
+                    column_codes[column][row] = dictionary.setdefault(value, len(dictionary))
+        # Built column by column: each column is contiguous in memory
+        codes = numpy.array(column_codes, dtype=numpy.int32).reshape(len(columns), len(rows)).T
+        return cls(rows, columns, [list(dictionary) for dictionary in dictionaries], codes)
+
+    @staticmethod
+    def __get_block_values(settings_obj):
+        # The first Setting wins when a name is used twice, like Policy.get_setting_value()
+        values = {}
+        for section_obj in settings_obj.iterfind('Section'):
+            section = section_obj.get('name')
+            for setting_obj in section_obj.iterfind('Setting'):
+                values.setdefault((section, setting_obj.get('name')), setting_obj.get('value'))
+        return values
+
+    def get_column(self, section, setting):
+        """
+        Returns the index of the column of a Setting.
+        """
+        column = self.__column_index.get((section, setting))
+        if column is None:
+            raise ValueError('No column for setting {} of section {}.'.format(setting, section))
+        return column
+
+    def get_values(self, section, setting):
+        """
+        Returns the value of a Setting for each policy, None if it is missing.
+        """
+        column = self.get_column(section, setting)
+        lookup = numpy.array(self.values[column] + [None], dtype=object)
+        return lookup[self.codes[:, column]].tolist()
+
+    def match(self, section, setting, condition):
+        """
+        Returns the mask (NumPy bool array) of the policies whose value of a Setting
+        matches a condition. The condition is only evaluated once per distinct value,
+        the policies missing the Setting never match.
+
+        :param: condition: A value, a set of values or a function of the value
+                           returning True or False.
+        """
+        column = self.get_column(section, setting)
+        if callable(condition):
+            test = condition
+        elif isinstance(condition, (set, frozenset, list, tuple)):
+            test = set(condition).__contains__
+        else:
+            test = lambda value: value == condition
+        # The extra last item is used by the missing values (code -1)
+        lookup = numpy.array([bool(test(value)) for value in self.values[column]] + [False])
+        return lookup[self.codes[:, column]]
+
+    def is_missing(self, section, setting):
+        """
+        Returns the mask (NumPy bool array) of the policies missing a Setting.
+        """
+        return self.missing[:, self.get_column(section, setting)]
+
+    def count(self, section, setting, mask=None):
+        """
+        Returns the number of policies for each value of a Setting: {value: count}.
+
+        :param: mask: If set, only the policies of the mask are counted.
+        """
+        column = self.get_column(section, setting)
+        selected = ~self.missing[:, column]
+        if mask is not None:
+            selected &= mask
+        counts = numpy.bincount(self.codes[selected, column], minlength=len(self.values[column]))
+        return {value: int(count) for value, count in zip(self.values[column], counts) if count}
+
+    def group_by(self, section, setting, mask=None):
+        """
+        Returns the rows of the policies grouped by value of a Setting:
+        {value: [(server, typeid, name)]}. The policies missing the Setting are not returned.
+
+        :param: mask: If set, only the policies of the mask are grouped.
+        """
+        column = self.get_column(section, setting)
+        selected = ~self.missing[:, column]
+        if mask is not None:
+            selected &= mask
+        indexes = numpy.flatnonzero(selected)
+        codes = self.codes[indexes, column]
+        order = numpy.argsort(codes, kind='stable')
+        indexes = indexes[order]
+        codes = codes[order]
+        bounds = numpy.flatnonzero(numpy.diff(codes)) + 1
+        groups = {}
+        for group in numpy.split(numpy.arange(len(indexes)), bounds):
+            if len(group):
+                groups[self.values[column][codes[group[0]]]] = [
+                    self.rows[index] for index in indexes[group].tolist()]
+        return groups
+
+    def get_rows(self, mask=None):
+        """
+        Returns the rows (server, typeid, name) of the policies of a mask.
+        """
+        if mask is None:
+            return list(self.rows)
+        return [self.rows[index] for index in numpy.flatnonzero(mask).tolist()]
+
+    def get_names(self, mask=None):
+        """
+        Returns the names of the policies of a mask.
+        """
+        return [name for _, _, name in self.get_rows(mask)]
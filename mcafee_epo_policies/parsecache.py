@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+################################################################################
+# Copyright (c) 2019 Benjamin Marandel - All Rights Reserved.
+################################################################################
+
+"""
+This module defines one Class object: ParseCache.
+This class keeps, in a directory, the parsed XML tree of the export files which are
+loaded, so an export loaded again is rebuilt from its cache entry instead of being
+parsed. The entries are keyed by the SHA-256 of the content of the file, not by its
+path, and the least recently used entries are removed when the cache grows above
+its maximum size.
+
+The cache is enabled for every class (or for one class) by setting its parse_cache
+attribute:
+
+    Policies.parse_cache = ParseCache('/var/cache/epo')
+    policies = ESTPPolicies(file_path='export.xml')
+"""
+
+import os
+import sys
+import array
+import marshal
+import hashlib
+import itertools
+import collections
+import xml.etree.ElementTree as et
+from .fileindex import PolicyFileIndex
+
+# Changed each time the layout of the entries changes: the entries written by
+# another version of the package (or of Python, for marshal) are ignored
+CACHE_VERSION = 1
+STAMP = 'mcafee_epo_policies parse cache {} {} {}\n'.format(
+    CACHE_VERSION, marshal.version, sys.implementation.cache_tag).encode()
+ENTRY_SUFFIX = '.tree'
+
+def encode_tree(root):
+    """
+    Returns the bytes of an Element tree: the tags, attributes, texts and tails of the
+    elements (in document order) and the index of the parent of each element. The
+    strings are stored once however many elements use them.
+    """
+    strings = {}
+    tags = []
+    attribs = []
+    texts = []
+    tails = []
+    parents = array.array('I')
+    stack = [(root, 0)]
+    while stack:
+        elem, parent = stack.pop()
+        index = len(tags)
+        tags.append(strings.setdefault(elem.tag, elem.tag))
+        attribs.append({strings.setdefault(key, key): strings.setdefault(value, value)
+                        for key, value in elem.attrib.items()})
+        texts.append(strings.setdefault(elem.text, elem.text))
+        tails.append(strings.setdefault(elem.tail, elem.tail))
+        parents.append(parent)
+        stack.extend((child, index) for child in reversed(elem))
+    return marshal.dumps((tags, attribs, texts, tails, parents[1:].tobytes()))
+
+def decode_tree(data):
+    """
+    Returns the root Element of a tree encoded by encode_tree. The elements are
+    built and linked with map() so that no Python code runs per element.
+    """
+    tags, attribs, texts, tails, parent_data = marshal.loads(data)
+    parents = array.array('I')
+    parents.frombytes(parent_data)
+    elems = list(map(et.Element, tags))
+    consume = collections.deque(maxlen=0).extend
+    consume(map(setattr, elems, itertools.repeat('attrib'), attribs))
+    consume(map(setattr, elems, itertools.repeat('text'), texts))
+    consume(map(setattr, elems, itertools.repeat('tail'), tails))
+    consume(map(et.Element.append, map(elems.__getitem__, parents),
+                itertools.islice(elems, 1, None)))
+    return elems[0]
+
+class ParseCache():
+    """
+    ParseCache is a class object containing the parsed trees of export files,
+    saved in a directory and bounded in size.
+    """
+
+    def __init__(self, directory, max_size=256 * 1024 * 1024):
+        """
+        :param: directory: The directory of the cache entries, created if missing.
+        :param: max_size: The maximum size (bytes) of the entries.
+        """
+        self.directory = directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def __repr__(self):
+        return '<ParseCache in {} ({} hits, {} misses)>'.format(
+            self.directory, self.hits, self.misses)
+
+    @staticmethod
+    def get_key(file_path, variant=()):
+        """
+        Returns the key of the entry of a file: the SHA-256 (hex) of its content and
+        of the variant, which identifies how the tree was loaded (for instance the
+        product or the types of the policies which were kept).
+        """
+        key = hashlib.sha256(PolicyFileIndex.get_file_hash(file_path).encode())
+        key.update(repr(variant).encode())
+        return key.hexdigest()
+
+    def get_path(self, key):
+        """
+        Returns the path of the entry of a key.
+        """
+        return os.path.join(self.directory, key + ENTRY_SUFFIX)
+
+    def get(self, key):
+        """
+        Returns the root Element of the entry of a key, None if there is no valid entry.
+        """
+        entry_path = self.get_path(key)
+        try:
+            with open(entry_path, 'rb') as entry_file:
+                stamp = entry_file.readline()
+                data = entry_file.read() if stamp == STAMP else None
+        except OSError:
+            return None
+        if data is None:
+            self.__remove(entry_path)
+            return None
+        try:
+            root = decode_tree(data)
+        except (ValueError, EOFError, TypeError, IndexError):
+            self.__remove(entry_path)
+            return None
+        # The modification time of an entry is the time it was last used
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+        return root
+
+    def put(self, key, root):
+        """
+        Save the tree of a root Element as the entry of a key, then remove the least
+        recently used entries above the maximum size. Returns False if it cannot be
+        written.
+        """
+        data = STAMP + encode_tree(root)
+        if len(data) > self.max_size:
+            return False
+        entry_path = self.get_path(key)
+        temp_path = '{}.{}{}.tmp'.format(entry_path, os.getpid(), os.urandom(4).hex())
+        try:
+            with open(temp_path, 'xb') as entry_file:
+                entry_file.write(data)
+            os.replace(temp_path, entry_path)
+        except OSError:
+            self.__remove(temp_path)
+            return False
+        self.evict()
+        return True
+
+    def load(self, file_path, parse, variant=()):
+        """
+        Returns the root Element of a file from its entry. If there is none, the file
+        is parsed and its tree saved.
+
+        :param: file_path: The path of the file.
+        :param: parse: The function parsing the file, called with file_path.
+        :param: variant: Identifies how parse loads the file (see get_key).
+        """
+        key = self.get_key(file_path, variant)
+        root = self.get(key)
+        if root is not None:
+            self.hits += 1
+            return root
+        self.misses += 1
+        root = parse(file_path)
+        if root is not None:
+            self.put(key, root)
+        return root
+
+    def __list_entries(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(ENTRY_SUFFIX):
+                try:
+                    entry_stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((entry_stat.st_mtime_ns, entry_stat.st_size, entry.path))
+        return entries
+
+    @staticmethod
+    def __remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def get_size(self):
+        """
+        Returns the size (bytes) of the entries.
+        """
+        return sum(size for _, size, _ in self.__list_entries())
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache fits its maximum size.
+        """
+        entries = sorted(self.__list_entries())
+        size = sum(entry_size for _, entry_size, _ in entries)
+        for _, entry_size, entry_path in entries:
+            if size <= self.max_size:
+                break
+            self.__remove(entry_path)
+            size -= entry_size
+
+    def clear(self):
+        """
+        Remove every entry.
+        """
+        for _, _, entry_path in self.__list_entries():
+            self.__remove(entry_path)
@@ -9,17 +9,270 @@ Those classes will be used as the base Class object to create other modules for
 product policy managed by ePolicy Orchestrator.
 """
 
+import io
+import os
 import uuid
 import copy
+import gzip
+import mmap
+import hashlib
+import functools
+import collections
+import urllib.parse
 import xml.etree.ElementTree as et
+from .fileindex import PolicyFileIndex
+from .inventory import PolicyInventory
+from .compression import open_export, iter_zip_members, detect_compression
+from .policydiff import diff_values
+from .interchange import write_json_lines, read_json_lines
+from .lazypolicy import PolicyLoader, get_tree_size
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows: the split workers aren't capped (see _init_split_worker)
+    resource = None
+
+# Size of the buffer of the compressed output of save_to_file
+WRITE_BUFFER_SIZE = 64 * 1024
+
+# Number of slices of policies per worker process when an export is split in parallel
+SPLIT_SLICES_PER_WORKER = 4
+
+# Number of slices submitted ahead per worker process: the other slices are only
+# serialized once the pool is ready for them
+SPLIT_PENDING_PER_WORKER = 2
+
+def iterparse_policies(source, feature_id=None, type_ids=None):
+    """
+    Parse an export incrementally and yield, for each policy object, a new root
+    Element holding the EPOPolicyVerInfo header, the policy settings and the policy
+    object, like Policies.get_policy(). Each policy gets its own copy of the settings
+    it shares with other policies.
+    An uncompressed export file is scanned first for the byte ranges of its elements
+    (see PolicyFileIndex.iter_policies) and only the ranges of one policy are parsed
+    at a time, so a single policy is held in memory. Other sources are read once: the
+    policy objects are released as soon as they are consumed, but any later policy
+    may reference a settings block so the selected settings are kept until the end
+    of the export. The memory is then bounded by the settings of the policies selected
+    by feature_id and type_ids, which is the whole export when there is no filter.
+
+    :param: source: A file path or a file object opened in binary mode, the export
+                    may be compressed (see open_export).
+    :param: feature_id: If set, only the policies of that product are kept.
+    :param: type_ids: If set, only the policies of those types are kept.
+    :return: A generator of root Elements.
+    """
+    def is_selected(elem):
+        return ((feature_id is None or elem.get('featureid') == feature_id) and
+                (type_ids is None or elem.get('typeid') in type_ids))
+
+    def build_policy(policy_obj):
+        policy = et.Element(root.tag, root.attrib)
+        policy.text = root.text
+        if header is not None:
+            policy.append(copy.deepcopy(header))
+        for policy_ref in policy_obj.findall('PolicySettings'):
+            settings_obj = pending.get(policy_ref.text)
+            if settings_obj is not None:
+                policy.append(copy.deepcopy(settings_obj))
+        policy.append(policy_obj)
+        return policy
+
+    if type_ids is not None and isinstance(type_ids, str):
+        type_ids = [type_ids]
+    if not hasattr(source, 'read') and detect_compression(source) is None:
+        # The index is only kept in memory, no sidecar file is written
+        index = PolicyFileIndex(source)
+        index.build()
+        yield from index.iter_policies(feature_id, type_ids)
+        return
+    root = None
+    header = None
+    pending = {}
+    waiting = []
+    depth = 0
+    with open_export(source) as stream:
+        for event, elem in et.iterparse(stream, events=('start', 'end')):
+            if event == 'start':
+                if root is None:
+                    root = elem
+                depth += 1
+                continue
+            depth -= 1
+            if depth != 1:
+                continue
+            # Only the children of the root element are handled and none are kept in the tree
+            root.remove(elem)
+            if elem.tag == 'EPOPolicyVerInfo':
+                header = elem
+            elif elem.tag == 'EPOPolicySettings' and is_selected(elem):
+                pending.setdefault(elem.get('name'), elem)
+            elif elem.tag == 'EPOPolicyObject' and is_selected(elem):
+                if all(ref.text in pending for ref in elem.findall('PolicySettings')):
+                    yield build_policy(elem)
+                else:
+                    # Settings exported after their policy object
+                    waiting.append(elem)
+            else:
+                elem.clear()
+    for policy_obj in waiting:
+        yield build_policy(policy_obj)
+
+def get_section_fingerprint(section_obj):
+    """
+    Returns the fingerprint (SHA-256, hex) of a Section element: a hash of its name and
+    of its (setting, value) pairs sorted by name, so the order of the Setting elements
+    and of their attributes doesn't change it.
+    """
+    values = [section_obj.get('name', '')]
+    for name, value in sorted((setting_obj.get('name', ''), setting_obj.get('value', ''))
+                              for setting_obj in section_obj.findall('Setting')):
+        values.append(name)
+        values.append(value)
+    # No separator can be mistaken for content: XML doesn't allow NUL characters
+    return hashlib.sha256('\0'.join(values).encode('utf8')).hexdigest()
+
+def get_settings_fingerprints(settings_obj):
+    """
+    Returns the fingerprint of an EPOPolicySettings element and the fingerprints of its
+    Sections, walking the element once: (fingerprint, {section: fingerprint}).
+    The fingerprint is a hash of the sorted fingerprints of its Sections, the name of
+    the EPOPolicySettings (a generated "::Settings (UUID)" name for instance) is ignored.
+    When several Sections have the same name, the first one is returned, like get_section().
+    """
+    sections = {}
+    fingerprints = []
+    for section_obj in settings_obj.findall('Section'):
+        fingerprint = get_section_fingerprint(section_obj)
+        sections.setdefault(section_obj.get('name'), fingerprint)
+        fingerprints.append(fingerprint)
+    return combine_fingerprints(fingerprints), sections
+
+def get_settings_keys(policy_name, settings_objs):
+    """
+    Returns a key for each EPOPolicySettings element of a policy, identifying the
+    settings block whatever the name of the policy: the name of the block without the
+    policy name ("Rule:<GUID>", "Sequence:null"...). A generated "::Settings (UUID)"
+    name changes each time the policy is saved, such a block is identified by its
+    position among the generated ones instead ("::Settings#0", "::Settings#1"...).
+
+    :param: policy_name: The name of the policy owning the blocks.
+    :param: settings_objs: The EPOPolicySettings elements, in the order of the policy.
+    :return: The list of keys, in the order of settings_objs.
+    """
+    prefix = policy_name + ':'
+    keys = []
+    generated = 0
+    for settings_obj in settings_objs:
+        name = settings_obj.get('name', '')
+        if '::Settings (' in name:
+            keys.append('::Settings#{}'.format(generated))
+            generated += 1
+        else:
+            keys.append(name[len(prefix):] if name.startswith(prefix) else name)
+    return keys
+
+def combine_fingerprints(fingerprints):
+    """
+    Returns the fingerprint of a set of fingerprints, whatever their order.
+    """
+    return hashlib.sha256('\0'.join(sorted(fingerprints)).encode('ascii')).hexdigest()
+
+def get_slice_size(count, workers):
+    """
+    Returns the number of policies per slice when count policies are shared among a
+    pool of worker processes: a few slices per worker (see SPLIT_SLICES_PER_WORKER)
+    so that the pool stays busy until the end.
+
+    :param: count: The number of policies.
+    :param: workers: The number of worker processes, None for one per CPU.
+    """
+    return max(1, -(-count // ((workers or os.cpu_count() or 1) * SPLIT_SLICES_PER_WORKER)))
+
+def _init_split_worker(max_memory):
+    """
+    Initializer of the split worker processes: caps their address space, where the
+    platform supports it (not on Windows).
+    """
+    if max_memory is not None and resource is not None:
+        _, hard_limit = resource.getrlimit(resource.RLIMIT_AS)
+        if hard_limit != resource.RLIM_INFINITY:
+            max_memory = min(max_memory, hard_limit)
+        resource.setrlimit(resource.RLIMIT_AS, (max_memory, hard_limit))
+
+def _split_slice(directory, xml_data=None, file_path=None, ranges=None):
+    """
+    Split a slice of an export (an export holding only some of the policies) into
+    policy files. The slice is either its XML content or byte ranges of an export file.
+    """
+    if xml_data is None:
+        with open(file_path, 'rb') as export_file, \
+                mmap.mmap(export_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            xml_data = b'\n'.join(buffer[start:end] for start, end in ranges)
+    return Policies(xml_policies=xml_data).split_all(directory)
+
+def _run_split(directory, slices, workers, max_worker_memory):
+    """
+    Split the slices of an export in a pool of processes, returns the saved file paths
+    in the order of the slices. The slices (an iterable) are consumed as the pool
+    progresses: a few slices per worker are submitted ahead (see SPLIT_PENDING_PER_WORKER).
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    split_slice = functools.partial(_split_slice, directory)
+    max_pending = (workers or os.cpu_count() or 1) * SPLIT_PENDING_PER_WORKER
+    file_paths = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_split_worker,
+                             initargs=(max_worker_memory,)) as executor:
+        futures = collections.deque()
+        for kwargs in slices:
+            futures.append(executor.submit(split_slice, **kwargs))
+            if len(futures) >= max_pending:
+                file_paths.extend(futures.popleft().result())
+        while futures:
+            file_paths.extend(futures.popleft().result())
+    return file_paths
+
+class _BytearrayWriter():
+    """
+    File-like object appending the data written to a bytearray.
+    """
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+
+    def write(self, data):
+        self.buffer.extend(data)
+        return len(data)
 
 class XmlObject():
     """
     XmlObject is a common class object for Policies and Policy.
     """
 
+    # ParseCache used by load_from_file, None to always parse the files
+    parse_cache = None
+
     def __init__(self):
-        self.root = None
+        self._root = None
+
+    @property
+    def root(self):
+        """
+        The root Element of the XML content.
+        """
+        return self._root
+
+    @root.setter
+    def root(self, value):
+        self._root = value
+        self._reset_index()
+
+    def _reset_index(self):
+        """
+        Called each time the XML content is replaced. Subclasses override it to
+        drop or rebuild the lookup structures built over the previous content.
+        """
 
     def is_empty(self):
         """
@@ -47,22 +300,120 @@ class XmlObject():
         """
         return self.get_xml_content().decode()
 
+    def get_json_lines(self):
+        """
+        Returns the current content as JSON Lines (string), a compact interchange
+        format loaded several times faster than the XML content (see interchange).
+        """
+        stream = io.StringIO()
+        write_json_lines(self.root, stream)
+        return stream.getvalue()
+
+    def set_json_lines(self, json_data):
+        """
+        Set the data of the XML object from JSON Lines (string or binary) returned by
+        get_json_lines. The XML content is the one the JSON Lines were made from.
+        """
+        self.root = read_json_lines(json_data.splitlines())
+
+    def save_to_json_lines(self, file_path):
+        """
+        Save the current content in a JSON Lines file (see get_json_lines).
+
+        :return: True or False.
+        """
+        success = False
+        if self.root is not None:
+            with open(file_path, 'wt', encoding='utf8') as json_file:
+                write_json_lines(self.root, json_file)
+            success = True
+        return success
+
+    def load_from_json_lines(self, file_path):
+        """
+        Load the content of a JSON Lines file saved by save_to_json_lines.
+        """
+        with open(file_path, 'rb') as json_file:
+            self.root = read_json_lines(json_file)
+
     def load_from_file(self, file_path):
         """
         Load a Policy from a previously export policy file from an ePO server.
+        The file may be gzip or bzip2 compressed, or a zip archive holding a single
+        export: it is decompressed while it is parsed.
+        If parse_cache is set, a file loaded before is rebuilt from the cache instead
+        of being parsed.
+        """
+        self.root = self._load_root(file_path, self._parse_file)
+
+    @staticmethod
+    def _parse_file(file_path):
+        with open_export(file_path) as stream:
+            return et.parse(stream).getroot()
+
+    def _load_root(self, file_path, parse, *variant):
+        """
+        Returns the root Element of a file, from parse_cache if it is set.
+        The variant identifies how parse loads the file.
         """
-        tree = et.parse(file_path)
-        self.root = tree.getroot()
+        if self.parse_cache is None or hasattr(file_path, 'read'):
+            return parse(file_path)
+        return self.parse_cache.load(file_path, parse, variant)
 
-    def save_to_file(self, file_path):
+    def write_xml_content(self, stream):
+        """
+        Write the current XML content, UTF-8 encoded, into a caller-provided buffer: a
+        file object opened in binary mode, an io.BytesIO or a bytearray. The content is
+        serialized in chunks, it is never held as a whole in memory.
+
+        :param: stream: The buffer where to write the content.
+        :return: True or False.
+        """
+        success = False
+        if self.root is not None:
+            if isinstance(stream, bytearray):
+                stream = _BytearrayWriter(stream)
+            et.ElementTree(self.root).write(stream, encoding='utf8', xml_declaration=True,
+                                            method='xml')
+            success = True
+        return success
+
+    def save_to_file(self, file_path, compression=None, atomic=False):
         """
         Save the current Policy in an XML file. This file can be imported into an ePO server.
+        The content is serialized directly into the file (see write_xml_content).
+
+        :param: file_path: The path of the file.
+        :param: compression: None or 'gzip' to save a gzip compressed file.
+        :param: atomic: If True, the content is written into a temporary file renamed
+                        to file_path once complete, so file_path is never left partially
+                        written.
+        :return: True or False.
         """
+        if compression not in (None, 'gzip'):
+            raise ValueError('Unknown compression: {}.'.format(compression))
         success = False
         if self.root is not None:
-            xml_file = open(file_path, 'bw')
-            xml_file.write(self.get_xml_content())
-            xml_file.close()
+            if atomic:
+                target_path = '{}.{}{}.tmp'.format(file_path, os.getpid(), os.urandom(4).hex())
+            else:
+                target_path = file_path
+            try:
+                with open(target_path, 'xb' if atomic else 'wb') as xml_file:
+                    if compression == 'gzip':
+                        # The name stored in the gzip header is the final one, the time is
+                        # left empty so that the same content always gives the same file
+                        with gzip.GzipFile(file_path, 'wb', 6, xml_file, mtime=0) as gzip_file, \
+                                io.BufferedWriter(gzip_file, WRITE_BUFFER_SIZE) as stream:
+                            self.write_xml_content(stream)
+                    else:
+                        self.write_xml_content(xml_file)
+                if atomic:
+                    os.replace(target_path, file_path)
+            except BaseException:
+                if atomic and os.path.exists(target_path):
+                    os.remove(target_path)
+                raise
             success = True
         return success
 
@@ -96,10 +447,188 @@ class Policies(XmlObject):
     Policies is a class object containing the policies returned by the ePO API.
     """
 
-    def __init__(self, xml_policies=None):
+    # Product (featureid) of the policies handled by the class, None for any product
+    FEATURE_ID = None
+
+    def __init__(self, xml_policies=None, file_path=None, type_ids=None):
         super(Policies, self).__init__()
         if xml_policies is not None:
             self.set_xml_content(xml_policies)
+        elif file_path is not None:
+            self.load_from_file(file_path, type_ids)
+
+    def load_from_file(self, file_path, type_ids=None):
+        """
+        Load the policies from a previously export file from an ePO server.
+        If type_ids is set or the class is bound to a product (FEATURE_ID), the file is
+        parsed incrementally (see iterparse_policies) and the policies of the other
+        types or of the other products are never kept in memory.
+
+        :param: file_path: The path of the export file, it may be compressed (see
+                           XmlObject.load_from_file).
+        :param: type_ids: If set, only the policies of those types are loaded.
+        """
+        if type_ids is None and self.FEATURE_ID is None:
+            super(Policies, self).load_from_file(file_path)
+            return
+        if isinstance(type_ids, str):
+            type_ids = [type_ids]
+        self.root = self._load_root(
+            file_path, functools.partial(self._iterparse_file, self.FEATURE_ID, type_ids),
+            self.FEATURE_ID, sorted(type_ids) if type_ids is not None else None)
+
+    @staticmethod
+    def _iterparse_file(feature_id, type_ids, file_path):
+        root = None
+        added = set()
+        for policy in iterparse_policies(file_path, feature_id, type_ids):
+            if root is None:
+                root = et.Element(policy.tag, policy.attrib)
+                root.text = policy.text
+            for child in policy:
+                if child.tag == 'EPOPolicyVerInfo':
+                    # The header is only needed once
+                    if len(root):
+                        continue
+                elif child.tag == 'EPOPolicySettings':
+                    # Settings shared by several policies are only needed once
+                    if child.get('name') in added:
+                        continue
+                    added.add(child.get('name'))
+                root.append(child)
+        return root
+
+    @staticmethod
+    def get_policy_from_file(file_path, type_id, name):
+        """
+        Returns a Policy content of a policy (name) for a specific type (type_id)
+        directly from an export file. Only that policy is parsed, using the sidecar
+        index of the file (see PolicyFileIndex) which is built on first use.
+        """
+        return PolicyFileIndex.open(file_path).get_policy(type_id, name)
+
+    @classmethod
+    def inventory(cls, file_path):
+        """
+        Returns a PolicyInventory of an export file: the attributes of each policy
+        object, read without parsing the settings. Its list(), list_name() and
+        list_type() methods return the same results as the ones of Policies.
+        """
+        return PolicyInventory(file_path, feature_id=cls.FEATURE_ID)
+
+    @classmethod
+    def iter_from_file(cls, file_path, type_ids=None):
+        """
+        Parse an export file incrementally and yield a Policy for each policy found.
+        Only one policy is kept in memory at a time.
+
+        :param: file_path: The path of the export file.
+        :param: type_ids: If set, only the policies of those types are returned.
+        :return: A generator of Policy objects.
+        """
+        for policy in iterparse_policies(file_path, cls.FEATURE_ID, type_ids):
+            yield Policy(policy)
+
+    @classmethod
+    def iter_zip(cls, file_path, type_ids=None):
+        """
+        Load each export bundled in a zip archive and yield (member name, Policies).
+        Only one export is kept in memory at a time.
+
+        :param: file_path: The path of the zip archive.
+        :param: type_ids: If set, only the policies of those types are loaded.
+        :return: A generator of (str, Policies) tuples.
+        """
+        for name, stream in iter_zip_members(file_path):
+            yield name, cls(file_path=stream, type_ids=type_ids)
+
+    def _reset_index(self):
+        self._policy_header = None
+        self._policy_index = {}
+        self._settings_index = {}
+        self._index_shape = None
+        if self.root is not None:
+            self.refresh_index()
+
+    def refresh_index(self):
+        """
+        Rebuild the index of EPOPolicyObject and EPOPolicySettings elements.
+        The index is maintained by the methods of Policies, and the elements appended,
+        inserted first or removed directly in the tree are detected, as well as the policy
+        objects renamed in place (checked when a lookup misses and by the list methods).
+        This method only needs to be called after other direct changes of the tree, for
+        instance an element replaced in the middle of the export.
+        """
+        policy_header = None
+        policy_index = {}
+        settings_index = {}
+        for child in self.root:
+            if child.tag == 'EPOPolicyVerInfo':
+                policy_header = child
+            elif child.tag == 'EPOPolicyObject':
+                policy_index.setdefault((child.get('typeid'), child.get('name')), child)
+            elif child.tag == 'EPOPolicySettings':
+                settings_index.setdefault(child.get('name'), child)
+        self._policy_header = policy_header
+        self._policy_index = policy_index
+        self._settings_index = settings_index
+        self._index_shape = self.__get_shape()
+
+    def __get_shape(self):
+        # The number of children and the first and last ones: it changes when an element
+        # is appended or inserted first, even if another one has been removed
+        root = self.root
+        return (len(root), id(root[0]), id(root[-1])) if len(root) else (0, None, None)
+
+    def _check_index(self):
+        # Elements added or removed directly in the tree invalidate the index
+        if self.root is not None and self.__get_shape() != self._index_shape:
+            self.refresh_index()
+
+    def __check_names(self):
+        # Policy objects renamed in place keep their old key in the index
+        for (type_id, name), policy_obj in self._policy_index.items():
+            if policy_obj.get('typeid') != type_id or policy_obj.get('name') != name:
+                self.refresh_index()
+                return True
+        return False
+
+    def _get_policy_object(self, type_id, name):
+        self._check_index()
+        policy_obj = self._policy_index.get((type_id, name))
+        if policy_obj is None:
+            # The policy may be one renamed in place: the index is only checked on a miss
+            if self.__check_names():
+                policy_obj = self._policy_index.get((type_id, name))
+        elif policy_obj.get('typeid') != type_id or policy_obj.get('name') != name:
+            # The policy object has been renamed in place
+            self.refresh_index()
+            policy_obj = self._policy_index.get((type_id, name))
+        return policy_obj
+
+    def _get_policy_settings(self, policy_obj):
+        settings = []
+        for policy_ref in policy_obj.findall('PolicySettings'):
+            settings_obj = self._settings_index.get(policy_ref.text)
+            if settings_obj is not None:
+                settings.append(settings_obj)
+        return settings
+
+    def _build_policy(self, policy_obj, header=None):
+        """
+        Returns a new root Element holding the EPOPolicyVerInfo header, the policy
+        object and the settings it references, without copying the rest of the export.
+        """
+        policy = et.Element(self.root.tag, self.root.attrib)
+        policy.text = self.root.text
+        if header is None and self._policy_header is not None:
+            header = copy.deepcopy(self._policy_header)
+        if header is not None:
+            policy.append(header)
+        for settings_obj in self._get_policy_settings(policy_obj):
+            policy.append(copy.deepcopy(settings_obj))
+        policy.append(copy.deepcopy(policy_obj))
+        return policy
 
     def contain(self, type_id, name):
         """
@@ -110,51 +639,90 @@ class Policies(XmlObject):
         :param: name: The name of the policy.
         :return: True or False.
         """
-        policy_obj = self.root.find('./EPOPolicyObject[@name="{}"]'.format(name) +
-                                    '[@typeid="{}"]'.format(type_id))
-        return policy_obj is not None
+        return self._get_policy_object(type_id, name) is not None
 
     def list_name(self):
         """
         Returns a list of policy name found in Policies.
         """
-        distinct_names = list(set(policy_obj.attrib['name']
-                                  for policy_obj in self.root.findall('EPOPolicyObject')))
-        sorted_names = sorted(distinct_names)
-        return sorted_names
+        self._check_index()
+        self.__check_names()
+        return sorted(set(name for _, name in self._policy_index))
 
     def list_type(self):
         """
         Returns a list of policy type found in Policies.
         """
-        distinct_types = list(set(policy_obj.attrib['typeid']
-                                  for policy_obj in self.root.findall('EPOPolicyObject')))
-        sorted_types = sorted(distinct_types)
-        return sorted_types
+        self._check_index()
+        self.__check_names()
+        return sorted(set(type_id for type_id, _ in self._policy_index))
 
     def list(self):
         """
         Returns a table containing the list of policy name for each policy type found in Policies.
         """
-        full_list = [{'typeid': policy_obj.attrib['typeid'], 'name': policy_obj.attrib['name']}
-                     for policy_obj in self.root.findall('EPOPolicyObject')]
-        sorted_list = sorted(full_list, key=lambda x: (x['typeid'], x['name']))
-        return sorted_list
+        self._check_index()
+        self.__check_names()
+        return [{'typeid': type_id, 'name': name}
+                for type_id, name in sorted(self._policy_index)]
+
+    def add_policy(self, policy):
+        """
+        Add a Policy (as returned by get_policy or new_policy) to the current Policies.
+        An existing policy with the same name and type is replaced.
+
+        :param: policy: The Policy object or its root Element.
+        :return: True or False.
+        """
+        policy_root = policy.root if isinstance(policy, XmlObject) else policy
+        if self.root is None or policy_root is None:
+            return False
+        policy_obj = policy_root.find('EPOPolicyObject')
+        if policy_obj is None:
+            return False
+        self.remove_policy(policy_obj.get('typeid'), policy_obj.get('name'))
+        for settings_obj in policy_root.findall('EPOPolicySettings'):
+            previous_obj = self._settings_index.get(settings_obj.get('name'))
+            if previous_obj is not None:
+                self.root.remove(previous_obj)
+            self.root.append(settings_obj)
+            self._settings_index[settings_obj.get('name')] = settings_obj
+        self.root.append(policy_obj)
+        self._policy_index[(policy_obj.get('typeid'), policy_obj.get('name'))] = policy_obj
+        self._index_shape = self.__get_shape()
+        return True
+
+    def remove_policy(self, type_id, name):
+        """
+        Remove a policy (name) for a specific type (type_id) and its settings from
+        the current Policies.
+
+        :param: type_id: The type of the policy.
+        :param: name: The name of the policy.
+        :return: True or False.
+        """
+        policy_obj = self._get_policy_object(type_id, name)
+        if policy_obj is None:
+            return False
+        self.root.remove(policy_obj)
+        del self._policy_index[(type_id, name)]
+        # The settings shared with other policies are kept
+        shared = set(policy_ref.text for policy_ref in
+                     self.root.iterfind('EPOPolicyObject/PolicySettings'))
+        for settings_obj in self._get_policy_settings(policy_obj):
+            if settings_obj.get('name') not in shared:
+                self.root.remove(settings_obj)
+                del self._settings_index[settings_obj.get('name')]
+        self._index_shape = self.__get_shape()
+        return True
 
     def get_policy(self, type_id, name):
         """
         Returns a Policy content of a policy (name) for a specific type (type_id).
         """
-        if self.contain(type_id, name):
-            policy = copy.deepcopy(self.root)
-            for policy_obj in policy.findall('EPOPolicyObject'):
-                if (policy_obj.attrib['typeid'] == type_id) and (policy_obj.attrib['name'] == name):
-                    policy_ref = policy_obj.find('PolicySettings').text
-                else:
-                    policy.remove(policy_obj)
-            for policy_obj in policy.findall('EPOPolicySettings'):
-                if policy_obj.attrib['name'] != policy_ref:
-                    policy.remove(policy_obj)
+        policy_obj = self._get_policy_object(type_id, name)
+        if policy_obj is not None:
+            policy = self._build_policy(policy_obj)
         else:
             policy = None
         return policy
@@ -166,37 +734,431 @@ class Policies(XmlObject):
         """
         policy = self.get_policy(type_id, template)
         if policy is not None:
-            policy_ref = '{}::Settings ({})'.format(name, str(uuid.uuid4()).upper())
-            policy_obj = policy.find('EPOPolicySettings')
-            policy_obj.set('name', policy_ref)
+            # Every settings block gets a new name so the new policy never shares
+            # its settings with the template once added back to the Policies.
+            new_refs = {}
+            for policy_obj in policy.findall('EPOPolicySettings'):
+                policy_ref = policy_obj.get('name')
+                if policy_ref.startswith(template + ':') and '::Settings (' not in policy_ref:
+                    new_ref = name + policy_ref[len(template):]
+                else:
+                    new_ref = '{}::Settings ({})'.format(name, str(uuid.uuid4()).upper())
+                new_refs[policy_ref] = new_ref
+                policy_obj.set('name', new_ref)
             policy_obj = policy.find('EPOPolicyObject')
             policy_obj.set('name', name)
-            policy_obj.find('PolicySettings').text = policy_ref
+            for policy_ref in policy_obj.findall('PolicySettings'):
+                policy_ref.text = new_refs.get(policy_ref.text, policy_ref.text)
         return policy
 
+    def iter_policies(self, type_id=None):
+        """
+        Walk the export once and yield a Policy for every policy object found, in
+        the order of the export. All the Policy objects share the same EPOPolicyVerInfo
+        header; the policy object and its settings are copied so each Policy can be
+        changed and released independently.
+
+        :param: type_id: If set, only the policies of that type are returned.
+        :return: A generator of Policy objects.
+        """
+        if self.root is None:
+            return
+        self._check_index()
+        header = copy.deepcopy(self._policy_header) if self._policy_header is not None else None
+        for policy_obj in self.root.findall('EPOPolicyObject'):
+            if type_id is None or policy_obj.get('typeid') == type_id:
+                yield Policy(self._build_policy(policy_obj, header))
+
+    def get_lazy_policies(self, type_id=None, budget=None, policy_cls=None):
+        """
+        Returns a lazy Policy for every policy object, in the order of the export.
+        A lazy Policy only holds the attributes of its policy object until it is used:
+        its content is copied from the export then (see PolicyLoader), as it is at
+        that time.
+
+        :param: type_id: If set, only the policies of that type are returned.
+        :param: budget: The MemoryBudget releasing the least recently used contents,
+                        None to keep them.
+        :param: policy_cls: The class of the returned objects (default: Policy).
+        :return: A list of Policy objects.
+        """
+        if self.root is None:
+            return []
+        policy_cls = policy_cls or Policy
+        return [policy_cls(PolicyLoader(dict(policy_obj.attrib),
+                                        functools.partial(self.__load_policy, policy_obj),
+                                        budget))
+                for policy_obj in self.root.findall('EPOPolicyObject')
+                if type_id is None or policy_obj.get('typeid') == type_id]
+
+    def __load_policy(self, policy_obj):
+        self._check_index()
+        return self._build_policy(policy_obj)
+
+    @classmethod
+    def lazy_from_file(cls, file_path, type_ids=None, budget=None, policy_cls=None):
+        """
+        Returns a lazy Policy for every policy of an export file, in the order of the
+        export, without parsing the file: the attributes of the policy objects come
+        from the sidecar index of the file (see PolicyFileIndex) and each Policy only
+        parses the byte ranges of its content, the first time it is used.
+
+        :param: file_path: The path of the export file.
+        :param: type_ids: If set, only the policies of those types are returned.
+        :param: budget: The MemoryBudget releasing the least recently used contents,
+                        None to keep them.
+        :param: policy_cls: The class of the returned objects (default: Policy).
+        :return: A list of Policy objects.
+        """
+        if isinstance(type_ids, str):
+            type_ids = [type_ids]
+        policy_cls = policy_cls or Policy
+        index = PolicyFileIndex.open(file_path)
+        # A policy exported twice is loaded from its first occurrence (see PolicyFileIndex)
+        keys = dict.fromkeys((row[0], row[1]) for row in index.data['policies']
+                             if (cls.FEATURE_ID is None or row[5] == cls.FEATURE_ID) and
+                             (type_ids is None or row[0] in type_ids))
+        return [policy_cls(PolicyLoader(index.policies[key][6],
+                                        functools.partial(index.get_policy, *key), budget))
+                for key in keys]
+
+    def get_fingerprints(self, type_id=None):
+        """
+        Returns the fingerprint of every policy (see Policy.get_fingerprint), computed
+        in one walk of the export: a settings block shared by several policies is only
+        hashed once. Identical policies have the same fingerprint whatever their name
+        or server.
+
+        :param: type_id: If set, only the policies of that type are returned.
+        :return: A dict {(typeid, name): fingerprint}.
+        """
+        if self.root is None:
+            return {}
+        self._check_index()
+        settings_fingerprints = {}
+        fingerprints = {}
+        for policy_obj in self.root.findall('EPOPolicyObject'):
+            if type_id is not None and policy_obj.get('typeid') != type_id:
+                continue
+            settings = []
+            for settings_obj in self._get_policy_settings(policy_obj):
+                if id(settings_obj) not in settings_fingerprints:
+                    settings_fingerprints[id(settings_obj)] = get_settings_fingerprints(
+                        settings_obj)[0]
+                settings.append(settings_fingerprints[id(settings_obj)])
+            fingerprints.setdefault((policy_obj.get('typeid'), policy_obj.get('name')),
+                                    combine_fingerprints(settings))
+        return fingerprints
+
+    @staticmethod
+    def get_file_name(type_id, name):
+        """
+        Returns the relative file path used to save a policy (name) for a specific
+        type (type_id): <type_id>/<name>.xml, with the characters which are not
+        allowed in a file name percent-encoded, as well as the dots of a name made of
+        dots only ("." and ".." would refer to the directories).
+        """
+        safe = " !#$&'()+,-.;=@[]^_`{}~"
+
+        def quote(value):
+            value = urllib.parse.quote(value, safe=safe)
+            return value.replace('.', '%2E') if value and not value.strip('.') else value
+
+        return os.path.join(quote(type_id), quote(name) + '.xml')
+
+    def split_all(self, directory, type_id=None, workers=1, max_worker_memory=None):
+        """
+        Save every policy of the export in its own XML file within a directory.
+        Each file can be imported into an ePO server.
+        With several workers, the policies are cut into slices which are serialized
+        and split by a pool of processes: each worker only receives the header, the
+        policy objects and the settings of its slice.
+
+        :param: directory: The directory where to save the files.
+        :param: type_id: If set, only the policies of that type are saved.
+        :param: workers: The number of worker processes, None for one per CPU.
+        :param: max_worker_memory: If set, the maximum address space (bytes) of a worker.
+        :return: The list of the saved file paths, in the order of the export.
+        """
+        if self.root is None:
+            return []
+        # A policy exported twice is saved once, from its first occurrence like get_policy()
+        policy_objs = {}
+        for policy_obj in self.root.findall('EPOPolicyObject'):
+            if type_id is None or policy_obj.get('typeid') == type_id:
+                policy_objs.setdefault((policy_obj.get('typeid'), policy_obj.get('name')),
+                                       policy_obj)
+        policy_objs = list(policy_objs.values())
+        if workers != 1:
+            size = get_slice_size(len(policy_objs), workers)
+            slices = ({'xml_data': self.__get_slice(policy_objs[index:index + size])}
+                      for index in range(0, len(policy_objs), size))
+            return _run_split(directory, slices, workers, max_worker_memory)
+        self._check_index()
+        header = copy.deepcopy(self._policy_header) if self._policy_header is not None else None
+        file_paths = []
+        for policy_obj in policy_objs:
+            policy = Policy(self._build_policy(policy_obj, header))
+            file_path = os.path.join(directory, self.get_file_name(policy.get_type(),
+                                                                   policy.get_name()))
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            policy.save_to_file(file_path)
+            file_paths.append(file_path)
+        return file_paths
+
+    def __get_slice(self, policy_objs):
+        """
+        Returns the XML content of an export holding only some policy objects.
+        """
+        self._check_index()
+        root = et.Element(self.root.tag, self.root.attrib)
+        root.text = self.root.text
+        if self._policy_header is not None:
+            root.append(self._policy_header)
+        added = set()
+        for policy_obj in policy_objs:
+            for settings_obj in self._get_policy_settings(policy_obj):
+                if id(settings_obj) not in added:
+                    added.add(id(settings_obj))
+                    root.append(settings_obj)
+        root.extend(policy_objs)
+        return et.tostring(root, encoding='utf8', method='xml')
+
+    @classmethod
+    def split_file(cls, file_path, directory, type_id=None, workers=1, max_worker_memory=None):
+        """
+        Save every policy of an export file in its own XML file within a directory,
+        like split_all() but without loading the export: the sidecar index of the
+        file (see PolicyFileIndex) gives the byte ranges of each slice of policies
+        and each worker only reads and parses the ranges of its slice.
+
+        :param: file_path: The path of the export file.
+        :param: directory: The directory where to save the files.
+        :param: type_id: If set, only the policies of that type are saved.
+        :param: workers: The number of worker processes, None for one per CPU.
+        :param: max_worker_memory: If set, the maximum address space (bytes) of a worker.
+        :return: The list of the saved file paths, in the order of the export.
+        """
+        index = PolicyFileIndex.open(file_path)
+        keys = [(row[0], row[1]) for row in index.data['policies']
+                if (cls.FEATURE_ID is None or row[5] == cls.FEATURE_ID) and
+                (type_id is None or row[0] == type_id)]
+        # A policy exported twice is saved once, from its first occurrence (see PolicyFileIndex)
+        keys = list(dict.fromkeys(keys))
+        size = get_slice_size(len(keys), workers)
+        slices = [{'file_path': file_path,
+                   'ranges': index.get_slice_ranges(keys[index_key:index_key + size])}
+                  for index_key in range(0, len(keys), size)]
+        if workers == 1:
+            return [path for kwargs in slices for path in _split_slice(directory, **kwargs)]
+        return _run_split(directory, slices, workers, max_worker_memory)
+
 
 class Policy(XmlObject):
     """
     Policy is a class object containing one Policy from Policies.
     """
 
+    # ListCodecs of the lists stored in the Sections of the policy (see get_list_codecs)
+    LIST_CODECS = ()
+
     def __init__(self, policy_from_policies):
+        """
+        :param: policy_from_policies: The content of the Policy (root Element), or a
+                                      PolicyLoader to create a lazy Policy whose
+                                      content is loaded on first use.
+        """
         super(Policy, self).__init__()
-        self.root = policy_from_policies
+        self._loader = None
+        self._changed = False
+        if isinstance(policy_from_policies, PolicyLoader):
+            self._loader = policy_from_policies
+            self._reset_index()
+        else:
+            self.root = policy_from_policies
+
+    @property
+    def root(self):
+        """
+        The root Element of the XML content, loaded on first access by a lazy Policy.
+        """
+        if self._loader is not None:
+            if self._root is None:
+                self.__load()
+            elif self._loader.budget is not None:
+                self._loader.budget.touch(self)
+        return self._root
+
+    @root.setter
+    def root(self, value):
+        # New content: the Policy is no longer lazy
+        if self._loader is not None and self._loader.budget is not None:
+            self._loader.budget.discard(self)
+        self._loader = None
+        self._root = value
+        self._reset_index()
+
+    def __load(self):
+        self._root = self._loader.load()
+        self._reset_index()
+        self._changed = False
+        if self._root is not None and self._loader.budget is not None:
+            self._loader.budget.add(self, get_tree_size(self._root))
+
+    def is_loaded(self):
+        """
+        Returns False if the Policy is lazy and its content isn't loaded, other else True.
+        """
+        return self._loader is None or self._root is not None
+
+    def release(self):
+        """
+        Release the content of a lazy Policy, which is loaded again on next use. The
+        content of a Policy changed by its methods is kept, as well as the content of
+        a Policy which isn't lazy.
+
+        :return: True if the content has been released, other else False.
+        """
+        if self._loader is None or self._root is None or self._changed:
+            return False
+        if self._loader.budget is not None:
+            self._loader.budget.discard(self)
+        self._root = None
+        self._reset_index()
+        return True
+
+    def _settings_changed(self):
+        """
+        Called each time the settings are changed by the methods of Policy.
+        """
+        self._fingerprints = None
+        self._changed = True
+
+    def __get_attrib(self):
+        # The attributes of the policy object, held by a lazy Policy until it is loaded
+        if self._loader is not None and self._root is None:
+            return self._loader.attrib
+        policy_obj = self.root.find('EPOPolicyObject')
+        return policy_obj.attrib if policy_obj is not None else {}
 
     def get_name(self):
         """
         Returns the name of the Policy.
         """
-        policy_obj = self.root.find('EPOPolicyObject')
-        return policy_obj.attrib['name'] if policy_obj is not None else ''
+        return self.__get_attrib().get('name', '')
 
     def get_type(self):
         """
         Returns the type of the Policy.
         """
-        policy_obj = self.root.find('EPOPolicyObject')
-        return policy_obj.attrib['typeid'] if policy_obj is not None else ''
+        return self.__get_attrib().get('typeid', '')
+
+    def get_epo_server(self):
+        """
+        Returns the ePO Server name which this Policy come from.
+        """
+        return self.__get_attrib().get('serverid', '')
+
+    def get_product(self):
+        """
+        Returns the product name of which this Policy should apply.
+        """
+        return self.__get_attrib().get('featureid', '')
+
+    def _reset_index(self):
+        # Built on first use: section name -> [(parent, Section)], section name ->
+        # {setting name -> Setting}. The first match wins, like an XPath find().
+        # Sections changed since the index was built are re-indexed on next lookup.
+        self._section_index = None
+        self._setting_index = None
+        self._changed_sections = set()
+        # Fingerprints computed on first use, dropped by any change of the settings
+        self._fingerprints = None
+
+    def refresh_index(self):
+        """
+        Rebuild the index of Section and Setting elements.
+        The index is maintained by the methods of Policy and its subclasses, this method
+        only needs to be called after the XML tree has been changed directly.
+        """
+        section_index = {}
+        setting_index = {}
+        if self.root is not None:
+            for parent_obj in self.root.findall('EPOPolicySettings'):
+                for section_obj in parent_obj.findall('Section'):
+                    section = section_obj.get('name')
+                    section_index.setdefault(section, []).append((parent_obj, section_obj))
+                    settings = setting_index.setdefault(section, {})
+                    for setting_obj in section_obj.findall('Setting'):
+                        settings.setdefault(setting_obj.get('name'), setting_obj)
+        self._section_index = section_index
+        self._setting_index = setting_index
+        self._changed_sections = set()
+        self._fingerprints = None
+
+    def _invalidate_section(self, section):
+        """
+        Must be called when Setting elements have been added to or removed from a Section.
+        """
+        if self._section_index is not None:
+            self._changed_sections.add(section)
+        self._settings_changed()
+
+    def _index_section(self, section):
+        settings = {}
+        for _, section_obj in self._section_index.get(section, []):
+            for setting_obj in section_obj.findall('Setting'):
+                settings.setdefault(setting_obj.get('name'), setting_obj)
+        self._setting_index[section] = settings
+        self._changed_sections.discard(section)
+
+    def _get_setting(self, section, setting):
+        if self._setting_index is None:
+            self.refresh_index()
+        elif section in self._changed_sections:
+            self._index_section(section)
+        settings = self._setting_index.get(section)
+        return settings.get(setting) if settings is not None else None
+
+    def get_section(self, section):
+        """
+        Returns the Section element of a specific Section or None if it doesn't exist.
+
+        :param: section: The name of the Section.
+        """
+        if self._section_index is None:
+            self.refresh_index()
+        sections = self._section_index.get(section)
+        return sections[0][1] if sections else None
+
+    def get_list(self, section, codec):
+        """
+        Returns a list stored in a specific Section (see ListCodec).
+
+        :param: section: The name of the Section.
+        :param: codec: The ListCodec describing the list.
+        :return: The list of items or None if the Section or the list doesn't exist.
+        """
+        section_obj = self.get_section(section)
+        return codec.read(section_obj) if section_obj is not None else None
+
+    def set_list(self, section, codec, rows, empty_count=True):
+        """
+        Replace a list stored in a specific Section (see ListCodec).
+
+        :param: section: The name of the Section.
+        :param: codec: The ListCodec describing the list.
+        :param: rows: The list of items (one list of column values per item).
+        :param: empty_count: If False, no count Setting is written for an empty list.
+        :return: True or False.
+        """
+        success = False
+        section_obj = self.get_section(section)
+        if section_obj is not None:
+            codec.write(section_obj, rows, empty_count)
+            self._invalidate_section(section)
+            success = True
+        return success
 
     def get_setting_value(self, section, setting):
         """
@@ -206,8 +1168,7 @@ class Policy(XmlObject):
         :param: setting: The Setting where to return the value.
         :return: The value of the setting or None if the setting doesn't exist.
         """
-        setting_obj = self.root.find('./EPOPolicySettings/Section[@name="{}"]'.format(section) +
-                                     '/Setting[@name="{}"]'.format(setting))
+        setting_obj = self._get_setting(section, setting)
         return setting_obj.get('value') if setting_obj is not None else None
 
     def set_setting_value(self, section, setting, value, force=False):
@@ -220,13 +1181,149 @@ class Policy(XmlObject):
         :return: True or False.
         """
         success = False
-        setting_obj = self.root.find('./EPOPolicySettings/Section[@name="{}"]'.format(section) +
-                                     '/Setting[@name="{}"]'.format(setting))
+        setting_obj = self._get_setting(section, setting)
         if setting_obj is not None:
             setting_obj.set('value', value)
+            self._settings_changed()
             success = True
         elif force:
-            section_obj = self.root.find('./EPOPolicySettings/Section[@name="{}"]'.format(section))
-            setting_obj = et.SubElement(section_obj, 'Setting', {"name":setting, "value":value})
-            success = True
+            section_obj = self.get_section(section)
+            if section_obj is not None:
+                setting_obj = et.SubElement(section_obj, 'Setting', {"name":setting, "value":value})
+                if section not in self._changed_sections:
+                    self._setting_index[section].setdefault(setting, setting_obj)
+                self._settings_changed()
+                success = True
         return success
+
+    def get_settings(self, pairs):
+        """
+        Returns the current values of several Settings.
+        The Section and Setting elements are indexed once for the whole batch.
+
+        :param: pairs: An iterable of (section, setting) tuples.
+        :return: A dict {(section, setting): value}, the value is None if the setting doesn't exist.
+        """
+        return {(section, setting): self.get_setting_value(section, setting)
+                for section, setting in pairs}
+
+    def apply_settings(self, settings, force=False):
+        """
+        Set the values of several Settings.
+        The Section and Setting elements are indexed once for the whole batch.
+
+        :param: settings: A dict {(section, setting): value} or an iterable of
+                          (section, setting, value) tuples, applied in order.
+        :param: force: If True the missing settings are created (see set_setting_value).
+        :return: A dict {(section, setting): True or False}.
+        """
+        if isinstance(settings, dict):
+            settings = ((section, setting, value) for (section, setting), value in settings.items())
+        return {(section, setting): self.set_setting_value(section, setting, value, force)
+                for section, setting, value in settings}
+
+    def get_list_codecs(self, section, values):
+        """
+        Returns the ListCodecs of the lists stored in a Section: the ones of LIST_CODECS
+        whose count Setting exists. Subclasses override it for lists whose settings are
+        only known from the content of the Section.
+
+        :param: section: The name of the Section.
+        :param: values: The settings of the Section: {setting: value}.
+        """
+        return [codec for codec in self.LIST_CODECS if codec.count in values]
+
+    def get_settings_values(self):
+        """
+        Returns the settings of each Section of each settings block:
+        {block: {section: {setting: value}}}, the blocks being identified by
+        get_settings_keys. The first Setting wins when a name is used twice in a
+        Section, like get_setting_value().
+        """
+        blocks = {}
+        if self.root is not None:
+            settings_objs = self.root.findall('EPOPolicySettings')
+            for key, settings_obj in zip(get_settings_keys(self.get_name(), settings_objs),
+                                         settings_objs):
+                sections = blocks.setdefault(key, {})
+                for section_obj in settings_obj.findall('Section'):
+                    values = sections.setdefault(section_obj.get('name'), {})
+                    for setting_obj in section_obj.iterfind('Setting'):
+                        values.setdefault(setting_obj.get('name'), setting_obj.get('value'))
+        return blocks
+
+    def diff(self, other):
+        """
+        Compare the settings of the Policy with the ones of another Policy of the same
+        type. The settings blocks are matched by get_settings_keys, then their Sections
+        by name: the blocks of a firewall policy reuse the same Section names. The lists
+        (see get_list_codecs) are compared item by item, so an item inserted at the
+        start of a list doesn't show every following item as changed.
+        A block or a Section which only exists in one Policy is compared with an empty one.
+
+        :param: other: The Policy to compare with (the new version).
+        :return: A dict {block: {section: changes}} of the Sections which differ, changes
+                 being {'added': {setting: value}, 'removed': {setting: value},
+                 'changed': {setting: (value, other value)}, 'lists': {count setting:
+                 {'inserted': [(index, item)], 'deleted': [(index, item)],
+                 'moved': [(index, other index, item)]}}}.
+        """
+        if self.get_type() != other.get_type():
+            raise ValueError('Cannot compare a policy of type "{}" with a policy of type '
+                             '"{}".'.format(self.get_type(), other.get_type()))
+        old_blocks = self.get_settings_values()
+        new_blocks = other.get_settings_values()
+        differences = {}
+        for block in list(old_blocks) + [block for block in new_blocks if block not in old_blocks]:
+            old_sections = old_blocks.get(block, {})
+            new_sections = new_blocks.get(block, {})
+            for section in list(old_sections) + [section for section in new_sections
+                                                 if section not in old_sections]:
+                old_values = old_sections.get(section, {})
+                new_values = new_sections.get(section, {})
+                codecs = {codec.count: codec for codec in
+                          self.get_list_codecs(section, old_values) +
+                          other.get_list_codecs(section, new_values)}
+                changes = diff_values(old_values, new_values, list(codecs.values()))
+                if changes is not None:
+                    differences.setdefault(block, {})[section] = changes
+        return differences
+
+    def __get_fingerprints(self):
+        if self._fingerprints is None:
+            settings = {}
+            sections = {}
+            if self.root is not None:
+                for settings_obj in self.root.findall('EPOPolicySettings'):
+                    fingerprint, section_fingerprints = get_settings_fingerprints(settings_obj)
+                    settings[settings_obj.get('name')] = fingerprint
+                    for section, section_fingerprint in section_fingerprints.items():
+                        sections.setdefault(section, section_fingerprint)
+            self._fingerprints = (combine_fingerprints(settings.values()), settings, sections)
+        return self._fingerprints
+
+    def get_fingerprint(self):
+        """
+        Returns the fingerprint (SHA-256, hex) of the settings of the Policy: a hash of
+        the fingerprints of its EPOPolicySettings (see get_settings_fingerprints), so
+        it only depends on the (section, setting, value) tuples of the Policy, not on
+        its name, the names of its settings blocks or the order of the elements.
+        The fingerprints are computed in one walk of the Policy and kept until the
+        Policy is changed.
+        """
+        return self.__get_fingerprints()[0]
+
+    def get_settings_fingerprints(self):
+        """
+        Returns the fingerprint of each EPOPolicySettings of the Policy: {name: fingerprint}.
+        """
+        return dict(self.__get_fingerprints()[1])
+
+    def get_section_fingerprint(self, section):
+        """
+        Returns the fingerprint of a Section (see get_section_fingerprint) or None if
+        it doesn't exist.
+
+        :param: section: The name of the Section.
+        """
+        return self.__get_fingerprints()[2].get(section)
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+################################################################################
+# Copyright (c) 2019 Benjamin Marandel - All Rights Reserved.
+################################################################################
+
+"""
+This module defines the functions comparing the settings of two policies (see
+Policy.diff). The settings are matched by name and the items of the lists (see
+ListCodec) by value, using dictionaries: the comparison never searches a list.
+"""
+
+import bisect
+import collections
+
+def diff_rows(old_rows, new_rows):
+    """
+    Compare two lists of items. The items are matched by value, so an item which only
+    changed its position is reported as moved, not as deleted then inserted.
+
+    :param: old_rows: The items of the first list (one list of column values per item).
+    :param: new_rows: The items of the second list.
+    :return: A dict {'inserted': [(new index, item)], 'deleted': [(old index, item)],
+             'moved': [(old index, new index, item)]}, the indexes starting at 0.
+    """
+    old_rows = [tuple(row) for row in old_rows]
+    positions = {}
+    for index, row in enumerate(old_rows):
+        positions.setdefault(row, collections.deque()).append(index)
+    matched = []
+    inserted = []
+    for new_index, row in enumerate(new_rows):
+        indexes = positions.get(tuple(row))
+        if indexes:
+            matched.append((indexes.popleft(), new_index))
+        else:
+            inserted.append((new_index, list(row)))
+    kept = [False] * len(old_rows)
+    for old_index, _ in matched:
+        kept[old_index] = True
+    deleted = [(index, list(row)) for index, row in enumerate(old_rows) if not kept[index]]
+    return {'inserted': inserted, 'deleted': deleted,
+            'moved': [(old_index, new_index, list(old_rows[old_index]))
+                      for old_index, new_index in _get_moved(matched)]}
+
+def _get_moved(matched):
+    """
+    Returns the matched (old index, new index) pairs which are not part of the longest
+    run of items kept in the same order, that is the fewest items to move.
+    """
+    old_indexes = [old_index for old_index, _ in matched]
+    if all(previous < index for previous, index in zip(old_indexes, old_indexes[1:])):
+        return []
+    # Longest increasing subsequence of the old indexes (patience sorting)
+    tails = []
+    tail_positions = []
+    predecessors = [None] * len(old_indexes)
+    for position, index in enumerate(old_indexes):
+        rank = bisect.bisect_left(tails, index)
+        if rank:
+            predecessors[position] = tail_positions[rank - 1]
+        if rank == len(tails):
+            tails.append(index)
+            tail_positions.append(position)
+        else:
+            tails[rank] = index
+            tail_positions[rank] = position
+    in_order = set()
+    position = tail_positions[-1]
+    while position is not None:
+        in_order.add(position)
+        position = predecessors[position]
+    return [pair for position, pair in enumerate(matched) if position not in in_order]
+
+def diff_values(old_values, new_values, codecs=()):
+    """
+    Compare the settings of two Sections.
+
+    :param: old_values: The settings of the first Section: {setting: value}.
+    :param: new_values: The settings of the second Section.
+    :param: codecs: The ListCodecs of the lists stored in the Sections, their
+                    settings are compared as lists (see diff_rows).
+    :return: A dict {'added': {setting: value}, 'removed': {setting: value},
+             'changed': {setting: (old value, new value)}, 'lists': {count setting:
+             diff_rows()}}, None if the settings are the same.
+    """
+    if old_values == new_values:
+        return None
+    lists = {}
+    for codec in codecs:
+        old_rows = codec.decode(old_values) or []
+        new_rows = codec.decode(new_values) or []
+        if old_rows != new_rows:
+            lists[codec.count] = diff_rows(old_rows, new_rows)
+
+    def is_scalar(name):
+        return not any(codec.owns(name) for codec in codecs)
+
+    changes = {
+        'added': {name: value for name, value in new_values.items()
+                  if name not in old_values and is_scalar(name)},
+        'removed': {name: value for name, value in old_values.items()
+                    if name not in new_values and is_scalar(name)},
+        'changed': {name: (value, new_values[name]) for name, value in old_values.items()
+                    if name in new_values and new_values[name] != value and is_scalar(name)},
+        'lists': lists,
+    }
+    return changes if any(changes.values()) else None
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+################################################################################
+# Copyright (c) 2019 Benjamin Marandel - All Rights Reserved.
+################################################################################
+
+"""
+This module defines low level functions to locate the elements of an export
+from ePolicy Orchestrator directly in its bytes (a bytes object or a memory map),
+without building an XML tree.
+Those functions rely on the layout of the exports: EPOPolicyVerInfo, EPOPolicySettings
+and EPOPolicyObject elements are direct children of the root element and are
+never nested in each other.
+"""
+
+import re
+import html
+
+START_TAG = re.compile(rb'<([^\s/>!?]+)(?:\s+[^\s=/>]+\s*=\s*(?:"[^"]*"|\'[^\']*\'))*\s*(/?)>')
+ATTRIBUTE = re.compile(r'([^\s=/>]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\')')
+POLICY_TAGS = (b'EPOPolicyVerInfo', b'EPOPolicySettings', b'EPOPolicyObject')
+
+def find_root(buffer):
+    """
+    Returns the (start, end) ranges of the start tag and of the end tag of the root element.
+    """
+    start_match = START_TAG.search(buffer)
+    if start_match is None:
+        raise ValueError('No XML element found.')
+    end_tag = b'</' + start_match.group(1)
+    end_start = buffer.rfind(end_tag)
+    if end_start < start_match.end():
+        raise ValueError('End tag of the root element not found.')
+    end_end = buffer.find(b'>', end_start) + 1
+    return (start_match.start(), start_match.end()), (end_start, end_end)
+
+def iter_elements(buffer, tags=POLICY_TAGS, start=0, end=None):
+    """
+    Yield (tag, start, end, start_tag_end) for each element of one of the tags found in
+    buffer. The content of the elements is skipped, so an element is never scanned
+    for child elements.
+
+    :param: buffer: The bytes of the export.
+    :param: tags: The element tags (bytes) to look for.
+    """
+    if end is None:
+        end = len(buffer)
+    pattern = re.compile(b'<(' + b'|'.join(re.escape(tag) for tag in tags) + rb')[\s/>]')
+    position = start
+    while True:
+        tag_match = pattern.search(buffer, position, end)
+        if tag_match is None:
+            break
+        start_match = START_TAG.match(buffer, tag_match.start())
+        if start_match is None:
+            raise ValueError('Malformed start tag at byte {}.'.format(tag_match.start()))
+        tag = start_match.group(1)
+        if start_match.group(2):
+            elem_end = start_match.end()
+        else:
+            close_start = buffer.find(b'</' + tag, start_match.end(), end)
+            if close_start < 0:
+                raise ValueError('End tag of {} at byte {} not found.'.format(
+                    tag.decode(), tag_match.start()))
+            elem_end = buffer.find(b'>', close_start, end) + 1
+        yield tag.decode(), tag_match.start(), elem_end, start_match.end()
+        position = elem_end
+
+def iter_start_tags(buffer, tag, start=0, end=None):
+    """
+    Yield (start, start_tag_end) for each start tag of one element tag (bytes) found in
+    buffer. Everything else is skipped at the speed of a substring search.
+    """
+    if end is None:
+        end = len(buffer)
+    prefix = b'<' + tag
+    position = buffer.find(prefix, start, end)
+    while position >= 0:
+        start_match = START_TAG.match(buffer, position)
+        if start_match is not None and start_match.group(1) == tag:
+            yield position, start_match.end()
+            position = start_match.end()
+        else:
+            position += len(prefix)
+        position = buffer.find(prefix, position, end)
+
+def parse_start_tag(buffer, start, start_tag_end):
+    """
+    Returns the attributes of the start tag found at buffer[start:start_tag_end].
+    The attribute values are unescaped and normalized like an XML parser does.
+    """
+    start_tag = buffer[start:start_tag_end].decode('utf-8')
+    if '\t' in start_tag or '\n' in start_tag or '\r' in start_tag:
+        start_tag = start_tag.replace('\r\n', ' ').translate({9: ' ', 10: ' ', 13: ' '})
+    attrib = {}
+    for name, quoted, single_quoted in ATTRIBUTE.findall(start_tag):
+        value = quoted or single_quoted
+        attrib[name] = html.unescape(value) if '&' in value else value
+    return attrib
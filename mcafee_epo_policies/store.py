@@ -0,0 +1,462 @@
+# -*- coding: utf-8 -*-
+################################################################################
+# Copyright (c) 2019 Benjamin Marandel - All Rights Reserved.
+################################################################################
+
+"""
+This module defines one Class object: PolicyStore.
+This class keeps the policies of exports from one or several ePolicy Orchestrator
+servers in a SQLite database, one row per server, policy, settings block (EPOPolicySettings),
+Section and Setting. The settings are queried across all the policies with SQL,
+without parsing any XML, and any policy can be exported again: its XML is the same,
+byte for byte, as the one returned by Policies.get_policy().
+
+    store = PolicyStore('catalog.db')
+    store.add_file('export.xml')
+    rows = store.query('GTISensitivityLevel', op='<', value=3, type_id='EAM_General_Policies')
+"""
+
+import json
+import sqlite3
+import xml.etree.ElementTree as et
+from .policies import Policy, iterparse_policies
+
+STORE_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS servers (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    root TEXT NOT NULL,
+    header TEXT);
+CREATE TABLE IF NOT EXISTS policies (
+    id INTEGER PRIMARY KEY,
+    server_id INTEGER NOT NULL REFERENCES servers (id),
+    featureid TEXT,
+    categoryid TEXT,
+    typeid TEXT NOT NULL,
+    name TEXT NOT NULL,
+    object TEXT NOT NULL,
+    UNIQUE (server_id, typeid, name));
+CREATE INDEX IF NOT EXISTS policies_type ON policies (featureid, typeid, name);
+CREATE TABLE IF NOT EXISTS blocks (
+    id INTEGER PRIMARY KEY,
+    server_id INTEGER NOT NULL REFERENCES servers (id),
+    name TEXT NOT NULL,
+    featureid TEXT,
+    typeid TEXT,
+    param_int INTEGER,
+    param_str TEXT,
+    element TEXT NOT NULL,
+    UNIQUE (server_id, name));
+CREATE TABLE IF NOT EXISTS policy_blocks (
+    policy_id INTEGER NOT NULL REFERENCES policies (id),
+    position INTEGER NOT NULL,
+    block_id INTEGER NOT NULL REFERENCES blocks (id),
+    PRIMARY KEY (policy_id, position));
+CREATE INDEX IF NOT EXISTS policy_blocks_block ON policy_blocks (block_id);
+CREATE TABLE IF NOT EXISTS sections (
+    id INTEGER PRIMARY KEY,
+    block_id INTEGER NOT NULL REFERENCES blocks (id),
+    position INTEGER NOT NULL,
+    name TEXT,
+    extra TEXT);
+CREATE INDEX IF NOT EXISTS sections_block ON sections (block_id, position);
+CREATE INDEX IF NOT EXISTS sections_name ON sections (name);
+CREATE TABLE IF NOT EXISTS settings (
+    section_id INTEGER NOT NULL REFERENCES sections (id),
+    position INTEGER NOT NULL,
+    name TEXT,
+    value TEXT,
+    extra TEXT,
+    PRIMARY KEY (section_id, position));
+CREATE INDEX IF NOT EXISTS settings_name ON settings (name, value);
+"""
+
+# Comparison operators of query(), a number as value compares the values as numbers
+OPERATORS = {'=': '=', '==': '=', '!=': '!=', '<': '<', '<=': '<=', '>': '>', '>=': '>=',
+             'like': 'LIKE'}
+
+def _dump_element(elem):
+    """
+    Returns an element and its children as JSON-serializable lists, keeping the order
+    of the attributes and the text and tail of each element.
+    """
+    return [elem.tag, list(elem.attrib.items()), elem.text, elem.tail,
+            [_dump_element(child) for child in elem]]
+
+def _load_element(data):
+    tag, attrib, text, tail, children = data
+    elem = et.Element(tag, dict(attrib))
+    elem.text = text
+    elem.tail = tail
+    elem.extend(_load_element(child) for child in children)
+    return elem
+
+def _to_number(value):
+    """
+    SQL function: returns a value as a number, NULL if it isn't one, so the Settings
+    whose value isn't a number never match a numeric comparison (like ComplianceBaseline).
+    """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def _get_extra(elem, keys, text, tail):
+    """
+    Returns None if an element has the usual layout (attributes, text and tail), other
+    else its layout as JSON, so the element can be rebuilt exactly.
+    """
+    if list(elem.attrib) == keys and elem.text == text and elem.tail == tail:
+        return None
+    return json.dumps([list(elem.attrib.items()), elem.text, elem.tail])
+
+class PolicyStore():
+    """
+    PolicyStore is a class object containing the policies of a SQLite database.
+    """
+
+    def __init__(self, database=':memory:'):
+        """
+        :param: database: The path of the database, created if missing.
+        """
+        self.database = database
+        self.connection = sqlite3.connect(database)
+        self.connection.create_function('to_number', 1, _to_number)
+        self.connection.executescript(SCHEMA)
+        with self.connection:
+            self.connection.execute("INSERT OR IGNORE INTO meta VALUES ('version', ?)",
+                                    (str(STORE_VERSION),))
+        version = self.connection.execute(
+            "SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+        if version != str(STORE_VERSION):
+            self.connection.close()
+            raise ValueError('Unsupported version of policy store: {}.'.format(version))
+
+    def __repr__(self):
+        return '<PolicyStore {} which contains {} policies>'.format(
+            self.database, self.connection.execute('SELECT COUNT(*) FROM policies').fetchone()[0])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Close the database.
+        """
+        self.connection.close()
+
+    # ------------------------------ INGESTION ------------------------------
+
+    def add_policies(self, policies, batch_size=500):
+        """
+        Add the policies of a Policies object. A policy already in the store for the
+        same server is replaced.
+
+        :param: policies: The Policies object.
+        :param: batch_size: The number of policies written per transaction.
+        :return: The number of policies added.
+        """
+        if policies.root is None:
+            return 0
+        root = policies.root
+        header = root.find('EPOPolicyVerInfo')
+        settings = {}
+        for settings_obj in root.iterfind('EPOPolicySettings'):
+            settings.setdefault(settings_obj.get('name'), settings_obj)
+        return self.__add(((root, header,
+                            [settings[policy_ref.text]
+                             for policy_ref in policy_obj.iterfind('PolicySettings')
+                             if policy_ref.text in settings], policy_obj)
+                           for policy_obj in root.iterfind('EPOPolicyObject')), batch_size)
+
+    def add_file(self, file_path, batch_size=500):
+        """
+        Add the policies of an export file, parsed incrementally (see iterparse_policies):
+        the policies of an uncompressed export are parsed one at a time, a compressed
+        export keeps its settings in memory until it has been read.
+
+        :param: file_path: The path of the export file.
+        :param: batch_size: The number of policies written per transaction.
+        :return: The number of policies added.
+        """
+        def iter_policies():
+            for policy in iterparse_policies(file_path):
+                yield (policy, policy.find('EPOPolicyVerInfo'),
+                       policy.findall('EPOPolicySettings'), policy.find('EPOPolicyObject'))
+        return self.__add(iter_policies(), batch_size)
+
+    def __next_id(self, table):
+        return self.connection.execute(
+            'SELECT COALESCE(MAX(id), 0) + 1 FROM {}'.format(table)).fetchone()[0]
+
+    def __get_server(self, name, root, header):
+        self.connection.execute(
+            'INSERT INTO servers (name, root, header) VALUES (?, ?, ?) '
+            'ON CONFLICT (name) DO UPDATE SET root = excluded.root, header = excluded.header',
+            (name, json.dumps([root.tag, list(root.attrib.items()), root.text]),
+             json.dumps(_dump_element(header)) if header is not None else None))
+        return self.connection.execute('SELECT id FROM servers WHERE name = ?',
+                                       (name,)).fetchone()[0]
+
+    def __add(self, items, batch_size):
+        """
+        Write the policies in batches of rows inserted with executemany(), one
+        transaction per batch. The settings blocks are linked to the policies by name,
+        so a block shared by several policies is only written once.
+        """
+        servers = {}
+        blocks = {}
+        count = 0
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) == batch_size:
+                count += self.__add_batch(batch, servers, blocks)
+                batch = []
+        if batch:
+            count += self.__add_batch(batch, servers, blocks)
+        return count
+
+    def __add_batch(self, batch, servers, blocks):
+        cursor = self.connection.cursor()
+        with self.connection:
+            policy_id = self.__next_id('policies')
+            block_id = self.__next_id('blocks')
+            section_id = self.__next_id('sections')
+            policy_rows = []
+            link_rows = []
+            block_rows = []
+            section_rows = []
+            setting_rows = []
+            for root, header, settings, policy_obj in batch:
+                server = policy_obj.get('serverid', '')
+                if server not in servers:
+                    servers[server] = self.__get_server(server, root, header)
+                server_id = servers[server]
+                for settings_obj in settings:
+                    name = settings_obj.get('name')
+                    if (server_id, name) in blocks:
+                        continue
+                    blocks[(server_id, name)] = block_id
+                    block_rows.append((block_id, server_id, name, settings_obj.get('featureid'),
+                                       settings_obj.get('typeid'), settings_obj.get('param_int'),
+                                       settings_obj.get('param_str'), json.dumps(
+                                           [list(settings_obj.attrib.items()),
+                                            settings_obj.text, settings_obj.tail])))
+                    for section_position, section_obj in enumerate(settings_obj):
+                        if section_obj.tag != 'Section':
+                            raise ValueError('Unsupported element in {}: {}.'.format(
+                                name, section_obj.tag))
+                        section_rows.append((section_id, block_id, section_position,
+                                             section_obj.get('name'),
+                                             _get_extra(section_obj, ['name'], '\n', '\n')))
+                        for setting_position, setting_obj in enumerate(section_obj):
+                            if setting_obj.tag != 'Setting' or len(setting_obj):
+                                raise ValueError('Unsupported element in {}: {}.'.format(
+                                    name, setting_obj.tag))
+                            setting_rows.append((section_id, setting_position,
+                                                 setting_obj.get('name'), setting_obj.get('value'),
+                                                 _get_extra(setting_obj, ['name', 'value'],
+                                                            None, '\n')))
+                        section_id += 1
+                    block_id += 1
+                policy_rows.append((policy_id, server_id, policy_obj.get('featureid'),
+                                    policy_obj.get('categoryid'), policy_obj.get('typeid'),
+                                    policy_obj.get('name'), json.dumps(_dump_element(policy_obj))))
+                for position, policy_ref in enumerate(policy_obj.iterfind('PolicySettings')):
+                    ref_id = blocks.get((server_id, policy_ref.text))
+                    if ref_id is None:
+                        # A settings block added by a previous call
+                        row = cursor.execute('SELECT id FROM blocks WHERE server_id = ? AND '
+                                             'name = ?', (server_id, policy_ref.text)).fetchone()
+                        ref_id = row[0] if row is not None else None
+                    if ref_id is not None:
+                        link_rows.append((policy_id, position, ref_id))
+                policy_id += 1
+            # The policies and settings blocks replaced by the batch, the policies which
+            # are not replaced are linked to the new settings blocks
+            old_policies = [(row[1], row[4], row[5]) for row in policy_rows]
+            cursor.executemany('DELETE FROM policy_blocks WHERE policy_id IN (SELECT id FROM '
+                               'policies WHERE server_id = ? AND typeid = ? AND name = ?)',
+                               old_policies)
+            cursor.executemany('DELETE FROM policies WHERE server_id = ? AND typeid = ? '
+                               'AND name = ?', old_policies)
+            old_blocks = [(row[1], row[2]) for row in block_rows]
+            cursor.executemany('UPDATE policy_blocks SET block_id = ? WHERE block_id IN '
+                               '(SELECT id FROM blocks WHERE server_id = ? AND name = ?)',
+                               [(row[0], row[1], row[2]) for row in block_rows])
+            cursor.executemany('DELETE FROM settings WHERE section_id IN (SELECT sections.id '
+                               'FROM sections JOIN blocks ON blocks.id = sections.block_id '
+                               'WHERE blocks.server_id = ? AND blocks.name = ?)', old_blocks)
+            cursor.executemany('DELETE FROM sections WHERE block_id IN (SELECT id FROM blocks '
+                               'WHERE server_id = ? AND name = ?)', old_blocks)
+            cursor.executemany('DELETE FROM blocks WHERE server_id = ? AND name = ?', old_blocks)
+            cursor.executemany('INSERT INTO blocks VALUES (?, ?, ?, ?, ?, ?, ?, ?)', block_rows)
+            cursor.executemany('INSERT INTO sections VALUES (?, ?, ?, ?, ?)', section_rows)
+            cursor.executemany('INSERT INTO settings VALUES (?, ?, ?, ?, ?)', setting_rows)
+            cursor.executemany('INSERT INTO policies VALUES (?, ?, ?, ?, ?, ?, ?)', policy_rows)
+            cursor.executemany('INSERT INTO policy_blocks VALUES (?, ?, ?)', link_rows)
+        return len(policy_rows)
+
+    # ------------------------------ QUERIES ------------------------------
+
+    @staticmethod
+    def __get_filters(type_id, feature_id, server):
+        filters = []
+        params = []
+        for column, value in (('policies.typeid', type_id), ('policies.featureid', feature_id),
+                              ('servers.name', server)):
+            if value is not None:
+                filters.append('{} = ?'.format(column))
+                params.append(value)
+        return filters, params
+
+    def list(self, type_id=None, feature_id=None, server=None):
+        """
+        Returns a table containing the server, the type and the name of the policies,
+        like Policies.list().
+        """
+        filters, params = self.__get_filters(type_id, feature_id, server)
+        rows = self.connection.execute(
+            'SELECT servers.name, policies.typeid, policies.name FROM policies '
+            'JOIN servers ON servers.id = policies.server_id {} '
+            'ORDER BY servers.name, policies.typeid, policies.name'.format(
+                'WHERE ' + ' AND '.join(filters) if filters else ''), params)
+        return [{'server': row[0], 'typeid': row[1], 'name': row[2]} for row in rows]
+
+    def query(self, setting, section=None, op=None, value=None, type_id=None,
+              feature_id=None, server=None):
+        """
+        Returns the Settings of a name, across the policies, whose value matches a
+        condition. Only the database is read: no XML is parsed.
+
+        :param: setting: The name of the Setting.
+        :param: section: If set, only the Settings of that Section are returned.
+        :param: op: If set, the comparison of the value: =, !=, <, <=, >, >= or like.
+                    The values are compared as numbers when value is a number, the
+                    Settings whose value isn't a number don't match then.
+        :param: value: The value compared with.
+        :param: type_id: If set, only the policies of that type are searched.
+        :param: feature_id: If set, only the policies of that product are searched.
+        :param: server: If set, only the policies of that server are searched.
+        :return: A list of dict {'server', 'featureid', 'typeid', 'name', 'section',
+                 'setting', 'value'}.
+        """
+        filters, params = self.__get_filters(type_id, feature_id, server)
+        filters.insert(0, 'settings.name = ?')
+        params.insert(0, setting)
+        if section is not None:
+            filters.append('sections.name = ?')
+            params.append(section)
+        if op is not None:
+            if op not in OPERATORS:
+                raise ValueError('Unknown operator: {}.'.format(op))
+            numeric = isinstance(value, (int, float)) and not isinstance(value, bool)
+            filters.append('{} {} ?'.format(
+                'to_number(settings.value)' if numeric else 'settings.value', OPERATORS[op]))
+            params.append(value)
+        rows = self.connection.execute(
+            'SELECT servers.name, policies.featureid, policies.typeid, policies.name, '
+            'sections.name, settings.name, settings.value FROM settings '
+            'JOIN sections ON sections.id = settings.section_id '
+            'JOIN policy_blocks ON policy_blocks.block_id = sections.block_id '
+            'JOIN policies ON policies.id = policy_blocks.policy_id '
+            'JOIN servers ON servers.id = policies.server_id '
+            'WHERE {} ORDER BY servers.name, policies.typeid, policies.name, '
+            'policy_blocks.position, sections.position, settings.position'.format(
+                ' AND '.join(filters)), params)
+        keys = ('server', 'featureid', 'typeid', 'name', 'section', 'setting', 'value')
+        return [dict(zip(keys, row)) for row in rows]
+
+    def query_policies(self, setting, section=None, op=None, value=None, type_id=None,
+                       feature_id=None, server=None):
+        """
+        Yield a Policy for each policy having a Setting which matches a condition (see
+        query). The policies are matched in the database, only the matching ones are built.
+        """
+        keys = dict.fromkeys((row['server'], row['typeid'], row['name']) for row in self.query(
+            setting, section, op, value, type_id, feature_id, server))
+        for server_name, policy_type, name in keys:
+            yield Policy(self.get_policy(policy_type, name, server_name))
+
+    # ------------------------------ EXPORT ------------------------------
+
+    def get_policy(self, type_id, name, server=None):
+        """
+        Returns a Policy content of a policy (name) for a specific type (type_id), as
+        Policies.get_policy() does, or None if the store doesn't contain it.
+
+        :param: server: The server of the policy, needed when several servers have a
+                        policy with that name and type.
+        """
+        filters, params = self.__get_filters(type_id, None, server)
+        rows = self.connection.execute(
+            'SELECT policies.id, policies.object, servers.root, servers.header FROM policies '
+            'JOIN servers ON servers.id = policies.server_id '
+            'WHERE policies.name = ? AND {}'.format(' AND '.join(filters)),
+            [name] + params).fetchall()
+        if not rows:
+            return None
+        if len(rows) > 1:
+            raise ValueError('Several servers have a policy "{}" of type "{}".'.format(
+                name, type_id))
+        policy_id, policy_obj, root, header = rows[0]
+        tag, attrib, text = json.loads(root)
+        policy = et.Element(tag, dict(attrib))
+        policy.text = text
+        if header is not None:
+            policy.append(_load_element(json.loads(header)))
+        sections = {}
+        for block_id, element in self.connection.execute(
+                'SELECT blocks.id, blocks.element FROM policy_blocks '
+                'JOIN blocks ON blocks.id = policy_blocks.block_id '
+                'WHERE policy_blocks.policy_id = ? ORDER BY policy_blocks.position',
+                (policy_id,)):
+            attrib, text, tail = json.loads(element)
+            settings_obj = et.SubElement(policy, 'EPOPolicySettings', dict(attrib))
+            settings_obj.text = text
+            settings_obj.tail = tail
+            sections[block_id] = settings_obj
+        section_obj = None
+        section_id = None
+        for row in self.connection.execute(
+                'SELECT sections.block_id, sections.id, sections.name, sections.extra, '
+                'settings.name, settings.value, settings.extra FROM sections '
+                'LEFT JOIN settings ON settings.section_id = sections.id '
+                'WHERE sections.block_id IN (SELECT block_id FROM policy_blocks '
+                'WHERE policy_id = ?) ORDER BY sections.block_id, sections.position, '
+                'settings.position', (policy_id,)):
+            if row[1] != section_id:
+                section_id = row[1]
+                section_obj = self.__build(sections[row[0]], 'Section', {'name': row[2]},
+                                           row[3], '\n', '\n')
+            if row[4] is not None or row[6] is not None:
+                self.__build(section_obj, 'Setting', {'name': row[4], 'value': row[5]},
+                             row[6], None, '\n')
+        policy.append(_load_element(json.loads(policy_obj)))
+        return policy
+
+    @staticmethod
+    def __build(parent, tag, attrib, extra, text, tail):
+        if extra is not None:
+            attrib, text, tail = json.loads(extra)
+            attrib = dict(attrib)
+        elem = et.SubElement(parent, tag, attrib)
+        elem.text = text
+        elem.tail = tail
+        return elem
+
+    def get_xml_content(self, type_id, name, server=None):
+        """
+        Returns the XML content (UTF-8 encoded) of a policy, the same as the one of
+        the Policy returned by Policies.get_policy(), or None if the store doesn't
+        contain it.
+        """
+        policy = self.get_policy(type_id, name, server)
+        return Policy(policy).get_xml_content() if policy is not None else None
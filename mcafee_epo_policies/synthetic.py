@@ -0,0 +1,516 @@
+# -*- coding: utf-8 -*-
+################################################################################
+# Copyright (c) 2019 Benjamin Marandel - All Rights Reserved.
+################################################################################
+
+"""
+This module defines one Class object: SyntheticPolicies.
+This class generates exports of any size with the same layout as the exports of an
+ePO server, to be used for benchmarks and load tests. The content only depends on
+the seed, so a run can be reproduced.
+"""
+
+import random
+import uuid
+import xml.etree.ElementTree as et
+from .policies import Policies
+
+ROOT_TAG = '{mcafee-epo-policy}EPOPolicySchema'
+
+# Settings of the policies, without the lists (generated from the options)
+OAS_SECTIONS = {
+    'Alerting': {'bShowAlerts': '1',
+        'szDialogMessage': 'Virus detected ! Please contact your local support'},
+    'Application': {},
+    'Default-Detection': {'bApplyNVP': '1', 'bNetworkScanEnabled': '0', 'bScanArchives': '0',
+        'bScanBackupReads': '0', 'bScanMime': '0', 'bScanReading': '1', 'bScanWriting': '1',
+        'bUnknownMacroHeuristics': '0', 'bUnknownProgramHeuristics': '0', 'extensionMode': '1',
+        'szProgExts': '', 'uAction': '1', 'uAction_Program': '1', 'uScanErrorAction': '4',
+        'uSecAction': '2', 'uSecAction_Program': '4', 'uTimeOutAction': '4'},
+    'Default-Detection_Exclusions': {'bOverwriteExclusions': '1'},
+    'GTI': {'GTISensitivityLevel': '0'},
+    'General': {'bAllowDisableViaMcTray': '0', 'bEnforceMaxScanTime': '1', 'bOASEnabled': '1',
+        'bOnlyUseDefaultConfig': '0', 'bScanBootSectors': '1', 'bStartEnabled': '1',
+        'dwScannerThreadTimeout': '45', 'enableAMSIObserveMode': '1', 'scanCopyLocalFolders': '0',
+        'scanCopyNetworkRemovable': '1', 'scanEmailAttachments': '0', 'scanProcessesOnEnable': '0',
+        'scanShadowCopyDisableStatus': '0', 'scanTrustedInstallers': '0',
+        'scanUsingAMSIHooks': '1'},
+    'HighRisk-Detection': {'bApplyNVP': '1', 'bNetworkScanEnabled': '0', 'bScanArchives': '0',
+        'bScanBackupReads': '0', 'bScanMime': '0', 'bScanReading': '1', 'bScanWriting': '1',
+        'bUnknownMacroHeuristics': '1', 'bUnknownProgramHeuristics': '1', 'extensionMode': '1',
+        'szProgExts': '', 'uAction': '1', 'uAction_Program': '1', 'uScanErrorAction': '4',
+        'uSecAction': '2', 'uSecAction_Program': '2', 'uTimeOutAction': '4'},
+    'HighRisk-Detection_Exclusions': {'bOverwriteExclusions': '1'},
+    'LowRisk-Detection': {'bApplyNVP': '1', 'bNetworkScanEnabled': '0', 'bScanArchives': '0',
+        'bScanBackupReads': '0', 'bScanMime': '0', 'bScanReading': '0', 'bScanWriting': '0',
+        'bUnknownMacroHeuristics': '0', 'bUnknownProgramHeuristics': '0', 'extensionMode': '2',
+        'szProgExts': ':::', 'uAction': '1', 'uAction_Program': '1', 'uScanErrorAction': '4',
+        'uSecAction': '2', 'uSecAction_Program': '2', 'uTimeOutAction': '4'},
+    'LowRisk-Detection_Exclusions': {'bOverwriteExclusions': '1'},
+    'ScriptScan': {'scriptScanEnabled': '1'},
+    'ScriptScanURLExclItems': {},
+}
+
+ODS_SECTIONS = {
+    'FS_Account': {'szDomainName': '', 'szPassword': '', 'szUserName': ''},
+    'FS_Exclusions': {'bOverwriteExclusions': '1'},
+    'FS_GTI': {'GTISensitivityLevel': '3'},
+    'FS_Performance': {'CPUPercentage': '80', 'SystemUtilization': '2',
+        'bDeferScanInFullScreen': '1', 'bDeferScanOnBattery': '1', 'bFSEnforceMaxODSThreads': '1',
+        'bFSEnforceMaxScanTime': '1', 'bInteractiveUserIsIdle': '0', 'bPauseAndCancelScans': '0',
+        'bPermitUserDefer': '1', 'bResumePausedScans': '0', 'bSystemUtilization': '0',
+        'bUseCache': '1',
+        'szDeferMessage': 'McAfee Endpoint Security is about to scan your system.',
+        'uDeferTime': '23', 'uFSScannerMaxODSThreads': '5', 'uFSScannerThreadTimeOut': '45',
+        'uMessageDuration': '45'},
+    'FS_Remediation': {'uAction': '1', 'uAction_Program': '1', 'uSecAction': '2',
+        'uSecAction_Program': '2'},
+    'FS_ScanOptions': {'ExtensionMode': '1', 'bDetectUnwantedPrograms': '1', 'bScanArchives': '1',
+        'bScanBootSectors': '1', 'bScanFilesMigratedToStorage': '0', 'bScanMime': '0',
+        'bScanSubDirs': '1', 'bUnknownMacroHeuristics': '1', 'bUnknownProgramHeuristics': '1',
+        'szProgExts': ''},
+    'QS_Account': {'szDomainName': '', 'szPassword': '', 'szUserName': ''},
+    'QS_Exclusions': {'bOverwriteExclusions': '1'},
+    'QS_GTI': {'GTISensitivityLevel': '3'},
+    'QS_Performance': {'CPUPercentage': '80', 'SystemUtilization': '2',
+        'bDeferScanInFullScreen': '1', 'bDeferScanOnBattery': '1', 'bInteractiveUserIsIdle': '1',
+        'bPauseAndCancelScans': '0', 'bPermitUserDefer': '0', 'bQSEnforceMaxODSThreads': '1',
+        'bQSEnforceMaxScanTime': '1', 'bResumePausedScans': '1', 'bSystemUtilization': '1',
+        'bUseCache': '1',
+        'szDeferMessage': 'McAfee Endpoint Security is about to scan your system.',
+        'uDeferTime': '23', 'uMessageDuration': '45', 'uQSScannerMaxODSThreads': '5',
+        'uQSScannerThreadTimeOut': '45'},
+    'QS_Remediation': {'uAction': '1', 'uAction_Program': '1', 'uSecAction': '2',
+        'uSecAction_Program': '2'},
+    'QS_ScanOptions': {'ExtensionMode': '1', 'bDetectUnwantedPrograms': '1', 'bScanArchives': '0',
+        'bScanBootSectors': '1', 'bScanFilesMigratedToStorage': '0', 'bScanMime': '0',
+        'bScanSubDirs': '1', 'bUnknownMacroHeuristics': '1', 'bUnknownProgramHeuristics': '1',
+        'szProgExts': ''},
+    'RS_Exclusions': {'bOverwriteExclusions': '1'},
+    'RS_GTI': {'GTISensitivityLevel': '3'},
+    'RS_Performance': {'SystemUtilization': '2', 'bUseCache': '0'},
+    'RS_Remediation': {'uAction': '1', 'uAction_Program': '1', 'uSecAction': '6',
+        'uSecAction_Program': '6'},
+    'RS_ScanOptions': {'ExtensionMode': '1', 'bDetectUnwantedPrograms': '1', 'bScanArchives': '1',
+        'bScanBootSectors': '0', 'bScanFilesMigratedToStorage': '0', 'bScanMime': '1',
+        'bScanSubDirs': '1', 'bUnknownMacroHeuristics': '1', 'bUnknownProgramHeuristics': '1',
+        'szProgExts': ''},
+}
+
+GENERAL_SECTIONS = {
+    'AgentEvents': {'AgPlcyEnableEventTrigger': '0', 'AgPlcyEventTriggerDelayMins': '5',
+        'AgPlcyEventTriggerThreshold': '3', 'AgPlcyMaxEventsPerTrigger': '10'},
+    'AgentListenServer': {'AgtServiceMgrPort': '8081', 'ContentLongevity': '30',
+        'IsRelayClientEnabled': '1', 'LCDiskQuota': '2048', 'NewRepositoryContentInterval': '30',
+        'VirtualDirectory': 'C:\\ProgramData\\McAfee\\Agent\\data\\SuperAgentRepository',
+        'VirtualDirectoryUnix': '/var/McAfee/agent/superagentrepository',
+        'bEnableAgentPing': '1', 'bEnableBroadcastPing': '1', 'bEnableRelayService': '0',
+        'bEnableSuperAgent': '0', 'bEnableSuperAgentRepository': '0',
+        'bListenToEPOServerOnly': '0'},
+    'AgentLogging': {'IsApplicationLogEnabled': '1', 'LogMaxRollover': '1', 'LogSizeLimit': '2',
+        'bEnableLog': '1', 'bEnableRemoteLog': '0', 'bVerbose': '0', 'nLogSizeLimit': '2'},
+    'BranchSelection': {},
+    'Deployment': {'EnableCompatibilityCheck': '1'},
+    'EventService': {'EventIsEnabledPriorityForward': '0', 'EventPriorityLevel': '3',
+        'EventUploadThreshold': '5', 'EventUploadTimeout': '5'},
+    'General': {'IsSelfProtectionEnabled': '1', 'IsTestCertAuthenticationEnabled': '0',
+        'PolicyEnforcementInterval': '3600', 'RebootTimeOut': '5', 'ReduceProcessPriority': '0',
+        'ShowAgentUI': '1', 'ShowRebootUI': '1', 'TestCertRootCA': '', 'TestCertSignerCA': '',
+        'bAllowMcTrayRDP': '0', 'bAllowUpdateSecurity': '1', 'bCollectFullProps': '0'},
+    'HttpServerService': {'ContentLongevity': '30', 'DiskQuota': '2048',
+        'IsAgentPingEnabled': '1', 'IsLazyCachingEnabled': '0', 'IsListenToEPOServerOnly': '0',
+        'IsSuperAgentEnabled': '0', 'IsSuperAgentRepositoryEnabled': '0',
+        'RepositorySyncInterval': '30',
+        'VirtualDirectory': 'C:\\ProgramData\\McAfee\\Agent\\data\\SuperAgentRepository',
+        'VirtualDirectoryUnix': '/var/McAfee/agent/superagentrepository'},
+    'LoggerService': {'IsApplicationLogEnabled': '1', 'IsLogRecordingEnabled': '1',
+        'IsRemoteLogEnabled': '0', 'LogMaxRollover': '1', 'LogRecordsSize': '200',
+        'LogSizeLimit': '2', 'bVerbose': '0'},
+    'Network': {'AsciDoWhen': '1', 'CheckNetworkMessageInterval': '60', 'bAgentASCI': '1'},
+    'P2pService': {'ContentLongevity': '1', 'DiskQuota': '512', 'EnableClient': '1',
+        'EnableServing': '1', 'P2pRepoPath': 'C:\\ProgramData\\McAfee\\Agent\\data\\p2p',
+        'P2pRepoPathUnix': '/var/McAfee/agent/p2p'},
+    'PolicyService': {'PolicyEnforcementTimeout': '60'},
+    'PropertyService': {'PropertyCollectFullProps': '0', 'PropertyCollectionIfDelayByDays': '0',
+        'PropertyCollectionTimeout': '60'},
+    'RelayService': {'EnableClient': '1', 'IsEnabled': '0', 'IsRelayDiscoveryDisabled': '0',
+        'RelayServerPort': '8083'},
+    'UdpService': {'IsBroadcastPingEnabled': '1', 'IsEnabled': '1'},
+    'UpdateOptions': {'bAllowDATDowngrade': '0', 'bRunIfUpdateSuccess': '0',
+        'bUpdateAfterDeployment': '1', 'szLogFileName': '', 'szRunAfterUpdateEXE': ''},
+    'UpdaterService': {'EnableAgentUI': '1', 'EnableDatDowngrade': '0',
+        'EnableExeAfterUpdate': '0', 'EnableRebootUI': '1', 'EnableUpdateAfterDeployment': '1',
+        'ExeNameToRunAfterUpdate': '', 'UpdateLogFileName': ''},
+}
+
+REPOSITORY_SECTIONS = {
+    'InetManager': {'bUseProxy': '0', 'dwProxyType': '0', 'szProxyServer': ''},
+    'RepositorySelection': {'dwSelectionMethod': '0', 'dwMaxHops': '2', 'dwPingTimeout': '30'},
+}
+
+FW_RULE_SETTINGS = {
+    'ClickTimeout': '0', 'Enabled': '1', 'EndTime': '0:00', 'Intrusion': '0', 'Invert': '0',
+    'LastModified': '2020-01-01T00:00:00.000+00:00', 'LastModifyingUsername': 'admin',
+    'Logged': '0', 'Note': '', 'OffHours': 'NONE', 'ScheduleDisableDuringTime': '0',
+    'ScheduleEnabled': '0', 'ScheduleEndHours': '0', 'ScheduleEndMinutes': '0',
+    'ScheduleStartHours': '0', 'ScheduleStartMinutes': '0', 'StartTime': '0:00',
+    'ViewOnly': '0', 'WeekMask': '0',
+}
+
+FW_AGGREGATE_SETTINGS = {
+    'LastModified': '2020-01-01T00:00:00.000+00:00', 'LastModifyingUsername': 'admin',
+    'Note': '',
+}
+
+# Values used to build the lists
+PROCESS_NAMES = ['notes', 'vmware', 'sqlservr', 'w3wp', 'java', 'python', 'backup', 'agent',
+                 'splunkd', 'tableau', 'outlook', 'ccmexec']
+FOLDERS = ['C:\\Program Files', 'C:\\Program Files (x86)', 'C:\\ProgramData', 'D:\\Apps',
+           'C:\\Windows\\CCM', '%AppData%\\Local', 'C:\\Temp']
+EXTENSIONS = ['LOG', 'TMP', 'PST', 'OST', 'MDF', 'LDF', 'BAK', 'VHD']
+SCAN_ITEMS = ['SpecialMemory', 'SpecialCritical', 'SpecialRegistry', 'SpecialScanForRootkits',
+              'WinDir', 'TempDir', 'ProgramFilesDir', 'LocalDrives', 'All fixed disks',
+              'All removable media', 'All Network drives', 'HomeDir', 'ProfileDir']
+
+class SyntheticPolicies(Policies):
+    """
+    SyntheticPolicies is a class object generating policies with random content.
+    Each add_*_policy method adds one policy to the export and returns its name.
+    """
+
+    def __init__(self, seed=0, server='SYNTHETIC', epo_version='5.10.0.0', extra_settings=0,
+                 variation=0.1):
+        """
+        :param: seed: The seed of the random generator.
+        :param: server: The ePO server name (serverid) of the policies.
+        :param: epo_version: The ePO server version of the export header.
+        :param: extra_settings: The number of additional Settings in each Section.
+        :param: variation: The probability of each boolean Setting to differ from its default.
+        """
+        super(SyntheticPolicies, self).__init__()
+        self.random = random.Random(seed)
+        self.server = server
+        self.extra_settings = extra_settings
+        self.variation = variation
+        root = et.Element(ROOT_TAG)
+        root.text = '\n'
+        header = et.SubElement(root, 'EPOPolicyVerInfo', dict(zip(
+            ['vermjr', 'vermin', 'verrel', 'verbld'], epo_version.split('.'))))
+        header.tail = '\n'
+        self.root = root
+        self.counters = {}
+
+    def __repr__(self):
+        return '<SyntheticPolicies which contains {} policies>'.format(len(self.list()))
+
+    @classmethod
+    def generate(cls, seed=0, oas=0, ods=0, fw=0, general=0, repository=0, **options):
+        """
+        Returns a SyntheticPolicies containing a number of policies of each type.
+
+        :param: seed: The seed of the random generator.
+        :param: oas: The number of On-Access Scan policies (ENDP_AM_1000).
+        :param: ods: The number of On-Demand Scan policies (ENDP_AM_1000).
+        :param: fw: The number of Firewall Rules policies (ENDP_FW_META_FW).
+        :param: general: The number of McAfee Agent General policies (EPOAGENTMETA).
+        :param: repository: The number of McAfee Agent Repository policies (EPOAGENTMETA).
+        :param: options: The options of __init__ and of the add_*_policy methods
+                         (processes, exclusions, urls, locations, rules, groups, depth,
+                         aggregates, relays, branches, sites...).
+        """
+        init_options = {key: options.pop(key) for key in
+                        ['server', 'epo_version', 'extra_settings', 'variation']
+                        if key in options}
+        policies = cls(seed, **init_options)
+        for count, method, keys in [
+                (oas, policies.add_oas_policy, ['processes', 'exclusions', 'urls']),
+                (ods, policies.add_ods_policy, ['locations', 'exclusions']),
+                (fw, policies.add_fw_policy, ['rules', 'groups', 'depth', 'aggregates']),
+                (general, policies.add_general_policy, ['relays', 'branches']),
+                (repository, policies.add_repository_policy, ['sites', 'disabled_sites'])]:
+            method_options = {key: options[key] for key in keys if key in options}
+            for _ in range(count):
+                method(**method_options)
+        return policies
+
+    def new_guid(self):
+        """
+        Returns a random (seeded) GUID, lower case.
+        """
+        return str(uuid.UUID(int=self.random.getrandbits(128), version=4))
+
+    def __new_name(self, prefix):
+        index = self.counters.get(prefix, 0) + 1
+        self.counters[prefix] = index
+        return '{} {:05}'.format(prefix, index)
+
+    def __new_section(self, settings_obj, section, values):
+        """
+        Add a Section with its Settings sorted by name like in the exports of ePO.
+        """
+        section_obj = et.SubElement(settings_obj, 'Section', name=section)
+        section_obj.text = '\n'
+        section_obj.tail = '\n'
+        values = dict(values)
+        for index in range(self.extra_settings):
+            values['szExtraSetting{}'.format(index)] = str(self.random.randrange(1000))
+        for setting in sorted(values):
+            et.SubElement(section_obj, 'Setting', name=setting, value=values[setting]).tail = '\n'
+        return section_obj
+
+    def __vary(self, values):
+        """
+        Returns a copy of the default values with some boolean Settings inverted.
+        """
+        values = dict(values)
+        for setting, value in values.items():
+            if value in ('0', '1') and self.random.random() < self.variation:
+                values[setting] = '1' if value == '0' else '0'
+        return values
+
+    @staticmethod
+    def __get_list(count, columns, rows, first=0):
+        """
+        Returns the Settings of a list: the count and one Setting per item and column.
+        """
+        values = {count: str(len(rows))}
+        for index, row in enumerate(rows, first):
+            for column, value in zip(columns, row):
+                values[column.format(index)] = value
+        return values
+
+    def __new_settings(self, feature_id, type_id, name, param_int='0', param_str=''):
+        settings_obj = et.Element('EPOPolicySettings', {
+            'name': name, 'featureid': feature_id, 'categoryid': type_id, 'typeid': type_id,
+            'param_int': param_int, 'param_str': param_str})
+        settings_obj.text = '\n'
+        settings_obj.tail = '\n'
+        return settings_obj
+
+    def __add(self, feature_id, type_id, name, settings_objs):
+        """
+        Add a policy object referencing a list of EPOPolicySettings to the export.
+        """
+        policy = et.Element(ROOT_TAG)
+        policy.extend(settings_objs)
+        policy_obj = et.SubElement(policy, 'EPOPolicyObject', {
+            'name': name, 'featureid': feature_id, 'categoryid': type_id,
+            'serverid': self.server, 'editflag': '0', 'typeid': type_id})
+        policy_obj.tail = '\n'
+        et.SubElement(policy_obj, 'description').text = 'Synthetic policy'
+        for settings_obj in settings_objs:
+            policy_ref = et.SubElement(policy_obj, 'PolicySettings')
+            policy_ref.text = settings_obj.get('name')
+            policy_ref.tail = '\n'
+        self.add_policy(policy)
+        return name
+
+    def __add_sections(self, feature_id, type_id, name, sections):
+        settings_obj = self.__new_settings(
+            feature_id, type_id, '{}::Settings ({})'.format(name, self.new_guid().upper()))
+        for section, values in sections.items():
+            self.__new_section(settings_obj, section, values)
+        return self.__add(feature_id, type_id, name, [settings_obj])
+
+    def __new_exclusions(self, count):
+        rows = []
+        for _ in range(count):
+            kind = self.random.choice('3333334')
+            if kind == '3':
+                path = '{}\\{}{}\\'.format(self.random.choice(FOLDERS),
+                                           self.random.choice(PROCESS_NAMES),
+                                           self.random.randrange(100000))
+                rows.append(['3|{}|{}|'.format(self.random.choice('12357'), path)])
+            else:
+                rows.append(['4|3|{}|'.format(self.random.choice(EXTENSIONS))])
+        return rows
+
+    def add_oas_policy(self, name=None, processes=10, exclusions=20, urls=0):
+        """
+        Add an On-Access Scan policy (EAM_General_Policies).
+
+        :param: name: The name of the policy (default: "OAS <counter>").
+        :param: processes: The number of processes of the process list.
+        :param: exclusions: The number of exclusions of the standard settings.
+        :param: urls: The number of URLs excluded from ScriptScan.
+        """
+        name = name or self.__new_name('OAS')
+        sections = {section: self.__vary(values) for section, values in OAS_SECTIONS.items()}
+        sections['Application'].update(self.__get_list(
+            'dwApplicationCount', ['szApplicationItem_{}', 'TypeItem_{}'],
+            [['{}{}.exe'.format(self.random.choice(PROCESS_NAMES), index),
+              self.random.choice('01')] for index in range(processes)]))
+        sections['Default-Detection_Exclusions'].update(self.__get_list(
+            'dwExclusionCount', ['ExcludedItem_{}'], self.__new_exclusions(exclusions)))
+        for section in ['HighRisk-Detection_Exclusions', 'LowRisk-Detection_Exclusions']:
+            sections[section].update(self.__get_list('dwExclusionCount', [], []))
+        sections['ScriptScanURLExclItems'].update(self.__get_list(
+            'dwScriptScanURLExclItemCount', ['ScriptScanExclusionURL_{}'],
+            [['https://intranet{}.example.com'.format(index)] for index in range(urls)]))
+        return self.__add_sections('ENDP_AM_1000', 'EAM_General_Policies', name, sections)
+
+    def add_ods_policy(self, name=None, locations=8, exclusions=5):
+        """
+        Add an On-Demand Scan policy (EAM_OnDemandScan_Policies).
+
+        :param: name: The name of the policy (default: "ODS <counter>").
+        :param: locations: The number of locations to scan of the full scan.
+        :param: exclusions: The number of exclusions of the full scan.
+        """
+        name = name or self.__new_name('ODS')
+        sections = {section: self.__vary(values) for section, values in ODS_SECTIONS.items()}
+        items = [[self.random.choice(SCAN_ITEMS) if index < len(SCAN_ITEMS) // 2 else
+                  '{}\\Data{}'.format(self.random.choice(FOLDERS), index)]
+                 for index in range(locations)]
+        sections['FS_ScanOptions'].update(self.__get_list('dwScanItemCount', ['szScanItem{}'], items))
+        sections['QS_ScanOptions'].update(self.__get_list(
+            'dwScanItemCount', ['szScanItem{}'], [['SpecialMemory'], ['SpecialRegistry']]))
+        sections['FS_Exclusions'].update(self.__get_list(
+            'dwExclusionCount', ['ExcludedItem_{}'], self.__new_exclusions(exclusions)))
+        for section in ['QS_Exclusions', 'RS_Exclusions']:
+            sections[section].update(self.__get_list('dwExclusionCount', [], []))
+        return self.__add_sections('ENDP_AM_1000', 'EAM_OnDemandScan_Policies', name, sections)
+
+    def add_general_policy(self, name=None, relays=0, branches=3):
+        """
+        Add a McAfee Agent General policy.
+
+        :param: name: The name of the policy (default: "General <counter>").
+        :param: relays: The number of relay servers.
+        :param: branches: The number of rows of the update branch selection.
+        """
+        name = name or self.__new_name('General')
+        sections = {section: self.__vary(values) for section, values in GENERAL_SECTIONS.items()}
+        sections['RelayService'].update(self.__get_list(
+            'RelayServerCount', ['relayselect_{}', 'relayip_{}', 'relayport_{}'],
+            [['1', '10.{}.{}.{}'.format(index // 65536 % 256, index // 256 % 256, index % 256),
+              '8083'] for index in range(relays)], first=1))
+        sections['BranchSelection'].update(self.__get_list(
+            'NumberOfItems', ['BranchType_{}', 'OneClickEnabled_{}', 'SoftwareID_{}'],
+            [[self.random.choice(['Current', 'Previous', 'Evaluation']), '0',
+              'SOFTWARE{:04}'.format(index)] for index in range(branches)]))
+        return self.__add_sections('EPOAGENTMETA', 'General', name, sections)
+
+    def add_repository_policy(self, name=None, sites=3, disabled_sites=1):
+        """
+        Add a McAfee Agent Repository policy.
+
+        :param: name: The name of the policy (default: "Repository <counter>").
+        :param: sites: The number of sites of the repository list.
+        :param: disabled_sites: The number of those sites which are disabled.
+        """
+        name = name or self.__new_name('Repository')
+        sections = {section: self.__vary(values)
+                    for section, values in REPOSITORY_SECTIONS.items()}
+        site_names = ['ePOSite{:04}'.format(index) for index in range(sites)]
+        if site_names:
+            sections['InetManager'].update(self.__get_list(
+                'SitelistOrderNum', ['SitelistOrder_{}'], [[site] for site in site_names]))
+        disabled = sorted(self.random.sample(site_names, min(disabled_sites, sites)))
+        if disabled:
+            sections['InetManager'].update(self.__get_list(
+                'DisabledSiteNum', ['DisabledSites_{}'], [[site] for site in disabled]))
+        return self.__add_sections('EPOAGENTMETA', 'Repository', name, sections)
+
+    def __new_fw_block(self, name, kind, guid, param_int, section, values):
+        settings_obj = self.__new_settings('ENDP_FW_META_FW', 'FireCore_FW_Rules',
+                                           '{}:{}:{}'.format(name, kind, guid), param_int, section)
+        self.__new_section(settings_obj, section, values)
+        return settings_obj
+
+    @staticmethod
+    def __get_fw_lists(lists):
+        """
+        Returns the Settings of the lists of a rule or an aggregate (_Name/+Name#N).
+        """
+        values = {}
+        for list_name, items in lists.items():
+            values.update(SyntheticPolicies.__get_list(
+                '_' + list_name, ['+' + list_name + '#{}'], [[item] for item in items]))
+        return values
+
+    def __new_fw_aggregate(self, name, guid, network):
+        values = dict(FW_AGGREGATE_SETTINGS, GUID=guid)
+        if network:
+            values.update(Name='Network {}'.format(guid[:8]), Type='65546', RemoteNetID=guid)
+            values.update(self.__get_fw_lists({'RemoteAddress': [
+                '10.{}.0.0/16'.format(self.random.randrange(256))]}))
+        else:
+            process = self.random.choice(PROCESS_NAMES) + '.exe'
+            values.update(Type='65547')
+            values.update(self.__get_fw_lists({
+                'AppDescription': [''], 'AppHash': ['0' * 32], 'AppName': [process],
+                'AppPath': ['*\\' + process], 'AppSigner': ['']}))
+        return self.__new_fw_block(name, 'Aggregate', guid, '104', 'AggregateCriterion', values)
+
+    def __new_fw_rule(self, name, guid, rule_name, group, aggregates):
+        values = dict(FW_RULE_SETTINGS, GUID=guid, Name=rule_name)
+        lists = {'PhysicalMedium': ['WIRED', 'WIRELESS', 'VPN'], 'TcpFlags': ['0']}
+        if group:
+            values.update(Action='JUMP', Direction='EITHER')
+        else:
+            values.update(Action=self.random.choice(['ALLOW', 'ALLOW', 'BLOCK']),
+                          Direction=self.random.choice(['IN', 'OUT', 'EITHER']))
+            lists.update(NetworkProtocol=['2048', '34525'],
+                         TransportProtocol=[self.random.choice(['6', '17'])],
+                         LocalPort=[''],
+                         RemotePort=[str(self.random.randrange(1, 65536))])
+        if aggregates:
+            lists['AggRef'] = aggregates
+        values.update(self.__get_fw_lists(lists))
+        return self.__new_fw_block(name, 'Rule', guid, '101', '101', values)
+
+    def __new_fw_sequence(self, name, guid, rule_ids):
+        values = self.__get_list('_RuleIDSequence', ['+RuleIDSequence#{}'],
+                                 [[rule_id] for rule_id in rule_ids])
+        if guid is None:
+            settings_name = '{}:Sequence:null'.format(name)
+        else:
+            values['RuleListID'] = guid
+            settings_name = '{}::Settings ({})'.format(name, self.new_guid().upper())
+        settings_obj = self.__new_settings('ENDP_FW_META_FW', 'FireCore_FW_Rules',
+                                           settings_name, '100', '100')
+        self.__new_section(settings_obj, '100', values)
+        return settings_obj
+
+    def add_fw_policy(self, name=None, rules=20, groups=2, depth=2, aggregates=5):
+        """
+        Add a Firewall Rules policy (FireCore_FW_Rules): a tree of groups of rules.
+
+        :param: name: The name of the policy (default: "FW <counter>").
+        :param: rules: The number of rules in each group (and at the root).
+        :param: groups: The number of sub-groups in each group (and at the root).
+        :param: depth: The number of nested levels of groups.
+        :param: aggregates: The number of application aggregates (network aggregates are
+                            added for the groups).
+        """
+        name = name or self.__new_name('FW')
+        settings_objs = []
+        applications = []
+        for _ in range(aggregates):
+            guid = self.new_guid()
+            settings_objs.append(self.__new_fw_aggregate(name, guid, False))
+            applications.append(guid)
+
+        def add_sequence(group_guid, level):
+            rule_ids = []
+            for index in range(rules):
+                guid = self.new_guid()
+                refs = [self.random.choice(applications)] if applications and \
+                    self.random.random() < 0.3 else []
+                settings_objs.append(self.__new_fw_rule(
+                    name, guid, 'Rule {}.{}'.format(level, index), False, refs))
+                rule_ids.append(guid)
+            if level < depth:
+                for index in range(groups):
+                    guid = self.new_guid()
+                    network = self.new_guid()
+                    settings_objs.append(self.__new_fw_aggregate(name, network, True))
+                    settings_objs.append(self.__new_fw_rule(
+                        name, guid, 'Group {}.{}'.format(level, index), True, [network]))
+                    rule_ids.insert(self.random.randrange(len(rule_ids) + 1), guid)
+                    add_sequence(guid, level + 1)
+            settings_objs.append(self.__new_fw_sequence(name, group_guid, rule_ids))
+
+        add_sequence(None, 0)
+        return self.__add('ENDP_FW_META_FW', 'FireCore_FW_Rules', name, settings_objs)
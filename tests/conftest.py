@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+################################################################################
+# Copyright (c) 2019 Benjamin Marandel - All Rights Reserved.
+################################################################################
+
+"""
+Fixtures shared by the tests: the sample exports of the repository and small
+hand-written exports where two policies share one settings block, or where a
+policy is exported twice.
+"""
+
+import os
+import pytest
+
+SAMPLES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'samples')
+
+FW_POLICY = os.path.join(SAMPLES, 'es', 'fw', 'fw_policy.xml')
+OAS_POLICY = os.path.join(SAMPLES, 'es', 'tp', 'oas_policy.xml')
+ODS_POLICY = os.path.join(SAMPLES, 'es', 'tp', 'ods_policy.xml')
+
+# P1 and P2 both reference the settings block S1
+SHARED_SETTINGS = b'''<?xml version="1.0" encoding="UTF-8"?>
+<epo:EPOPolicySchema xmlns:epo="mcafee-epo-policy">
+<EPOPolicyVerInfo vermjr="5" vermin="10" verrel="0" verbld="0"/>
+<EPOPolicySettings name="S1" featureid="ENDP_AM_1000" categoryid="T" typeid="T" param_int="0" param_str="">
+<Section name="General">
+<Setting name="Enabled" value="1"/>
+</Section>
+</EPOPolicySettings>
+<EPOPolicyObject name="P1" featureid="ENDP_AM_1000" categoryid="T" serverid="SRV" editflag="0" typeid="T">
+<PolicySettings>S1</PolicySettings>
+</EPOPolicyObject>
+<EPOPolicyObject name="P2" featureid="ENDP_AM_1000" categoryid="T" serverid="SRV" editflag="0" typeid="T">
+<PolicySettings>S1</PolicySettings>
+</EPOPolicyObject>
+</epo:EPOPolicySchema>
+'''
+
+# P1 is exported twice, the first occurrence references S1 (Enabled=1)
+DUPLICATED_POLICY = SHARED_SETTINGS.replace(b'</epo:EPOPolicySchema>', b'''\
+<EPOPolicySettings name="S2" featureid="ENDP_AM_1000" categoryid="T" typeid="T" param_int="0" param_str="">
+<Section name="General">
+<Setting name="Enabled" value="0"/>
+</Section>
+</EPOPolicySettings>
+<EPOPolicyObject name="P1" featureid="ENDP_AM_1000" categoryid="T" serverid="SRV" editflag="0" typeid="T">
+<PolicySettings>S2</PolicySettings>
+</EPOPolicyObject>
+</epo:EPOPolicySchema>''')
+
+@pytest.fixture
+def fw_policy_path():
+    return FW_POLICY
+
+@pytest.fixture
+def shared_settings_path(tmp_path):
+    file_path = tmp_path / 'shared.xml'
+    file_path.write_bytes(SHARED_SETTINGS)
+    return str(file_path)
+
+@pytest.fixture
+def duplicated_policy_path(tmp_path):
+    file_path = tmp_path / 'duplicated.xml'
+    file_path.write_bytes(DUPLICATED_POLICY)
+    return str(file_path)
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+################################################################################
+# Copyright (c) 2019 Benjamin Marandel - All Rights Reserved.
+################################################################################
+
+import pytest
+from mcafee_epo_policies.baseline import ComplianceBaseline
+from mcafee_epo_policies.policies import Policies
+
+RULES = [
+    {'name': 'Enabled', 'typeid': 'T', 'section': 'General', 'setting': 'Enabled',
+     'op': '=', 'value': '1'},
+    {'name': 'Level >= 3', 'typeid': 'T', 'section': 'General', 'setting': 'Level',
+     'op': '>=', 'value': 3, 'missing': 'pass'},
+]
+
+def test_evaluate_file_shared_settings(shared_settings_path):
+    results = list(ComplianceBaseline(RULES).evaluate_file(shared_settings_path))
+    assert [(result['name'], result['passed']) for result in results] == [
+        ('P1', True), ('P2', True)]
+    assert all(result['failures'] == [] for result in results)
+
+def test_evaluate_file_matches_evaluate(shared_settings_path):
+    baseline = ComplianceBaseline(RULES)
+    assert list(baseline.evaluate_file(shared_settings_path)) == list(
+        baseline.evaluate(Policies(file_path=shared_settings_path)))
+
+def test_failures_and_summary(shared_settings_path):
+    rules = RULES + [{'typeid': 'T', 'section': 'General', 'setting': 'Missing',
+                      'op': '=', 'value': 'x'}]
+    baseline = ComplianceBaseline(rules)
+    results = list(baseline.evaluate_file(shared_settings_path))
+    assert [failure['rule'] for failure in results[0]['failures']] == ['General/Missing']
+    assert baseline.summarize(results) == {'policies': 2, 'passed': 0, 'failed': 2,
+                                           'rules': {'General/Missing': 2}}
+
+def test_compile_rejects_unknown_operator():
+    with pytest.raises(ValueError):
+        ComplianceBaseline([dict(RULES[0], op='~')])
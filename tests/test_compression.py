@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+################################################################################
+# Copyright (c) 2019 Benjamin Marandel - All Rights Reserved.
+################################################################################
+
+import io
+import bz2
+import gzip
+import zipfile
+import pytest
+from mcafee_epo_policies.compression import detect_compression, open_export, iter_zip_members
+from mcafee_epo_policies.policies import Policies
+
+from conftest import OAS_POLICY, ODS_POLICY
+
+def read(file_path):
+    with open(file_path, 'rb') as export_file:
+        return export_file.read()
+
+@pytest.fixture
+def compressed_paths(tmp_path, fw_policy_path):
+    xml_data = read(fw_policy_path)
+    gzip_path = str(tmp_path / 'export')
+    with gzip.open(gzip_path, 'wb') as gzip_file:
+        gzip_file.write(xml_data)
+    bz2_path = str(tmp_path / 'export.xml')
+    with bz2.open(bz2_path, 'wb') as bz2_file:
+        bz2_file.write(xml_data)
+    zip_path = str(tmp_path / 'export.zip')
+    with zipfile.ZipFile(zip_path, 'w') as archive:
+        archive.writestr('export.xml', xml_data)
+    return {'gzip': gzip_path, 'bz2': bz2_path, 'zip': zip_path}
+
+def test_detect_and_open(fw_policy_path, compressed_paths):
+    xml_data = read(fw_policy_path)
+    # The compression is detected from the content, not from the name
+    assert detect_compression(fw_policy_path) is None
+    for compression, file_path in compressed_paths.items():
+        assert detect_compression(file_path) == compression
+        with open(file_path, 'rb') as export_file:
+            assert detect_compression(export_file) == compression
+            assert export_file.tell() == 0
+            with open_export(export_file) as stream:
+                assert stream.read() == xml_data
+        with open_export(file_path) as stream:
+            assert stream.read() == xml_data
+    with open_export(io.BytesIO(xml_data)) as stream:
+        assert stream.read() == xml_data
+
+def test_load_compressed_exports(fw_policy_path, compressed_paths):
+    expected = Policies(file_path=fw_policy_path).get_xml_content()
+    for file_path in compressed_paths.values():
+        assert Policies(file_path=file_path).get_xml_content() == expected
+        assert Policies(file_path=file_path, type_ids='FireCore_FW_Rules').list_name() == [
+            'Ben - CAG Test']
+        assert Policies.inventory(file_path).list_name() == ['Ben - CAG Test']
+
+def test_zip_archives(tmp_path):
+    zip_path = str(tmp_path / 'exports.zip')
+    with zipfile.ZipFile(zip_path, 'w') as archive:
+        archive.writestr('oas.xml', read(OAS_POLICY))
+        archive.writestr('ods.xml.gz', gzip.compress(read(ODS_POLICY)))
+    with pytest.raises(ValueError):
+        Policies(file_path=zip_path)
+    assert [(name, stream.read()) for name, stream in iter_zip_members(zip_path)] == [
+        ('oas.xml', read(OAS_POLICY)), ('ods.xml.gz', read(ODS_POLICY))]
+    exports = [(name, policies.list_name()) for name, policies in Policies.iter_zip(zip_path)]
+    assert exports == [('oas.xml', ['OAS Test Policy']), ('ods.xml.gz', ['Ben-ODS'])]
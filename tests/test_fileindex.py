@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+################################################################################
+# Copyright (c) 2019 Benjamin Marandel - All Rights Reserved.
+################################################################################
+
+import os
+import shutil
+import xml.etree.ElementTree as et
+import pytest
+from mcafee_epo_policies.fileindex import PolicyFileIndex
+from mcafee_epo_policies.policies import Policies
+
+@pytest.fixture
+def export_path(tmp_path, fw_policy_path):
+    # The sidecar index is written next to the export
+    file_path = str(tmp_path / 'export.xml')
+    shutil.copy(fw_policy_path, file_path)
+    return file_path
+
+def test_open_builds_and_reloads_the_sidecar(export_path, monkeypatch):
+    index = PolicyFileIndex.open(export_path)
+    assert os.path.exists(export_path + '.idx')
+    assert index.list() == Policies(file_path=export_path).list()
+    # An unchanged export is never hashed again
+    monkeypatch.setattr(PolicyFileIndex, 'get_file_hash', staticmethod(
+        lambda file_path: pytest.fail('The export has been hashed.')))
+    assert PolicyFileIndex.open(export_path).list() == index.list()
+
+def test_open_checks_the_hash_of_a_touched_export(export_path, monkeypatch):
+    PolicyFileIndex.open(export_path)
+    stat = os.stat(export_path)
+    os.utime(export_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    hashed = []
+    get_file_hash = PolicyFileIndex.get_file_hash
+    monkeypatch.setattr(PolicyFileIndex, 'get_file_hash', staticmethod(
+        lambda file_path: hashed.append(file_path) or get_file_hash(file_path)))
+    index = PolicyFileIndex.open(export_path)
+    assert hashed == [export_path]
+    assert index.data['mtime_ns'] == stat.st_mtime_ns + 10 ** 9
+    # The new modification time has been saved with the index
+    PolicyFileIndex.open(export_path)
+    assert hashed == [export_path]
+
+def test_open_rebuilds_a_changed_export(export_path):
+    PolicyFileIndex.open(export_path)
+    with open(export_path, 'ab') as export_file:
+        export_file.write(b'\n')
+    index = PolicyFileIndex(export_path)
+    assert not index.load()
+    assert PolicyFileIndex.open(export_path).is_valid()
+
+def test_get_policy_from_file(export_path):
+    policies = Policies(file_path=export_path)
+    for row in policies.list():
+        policy = Policies.get_policy_from_file(export_path, row['typeid'], row['name'])
+        assert et.tostring(policy) == et.tostring(policies.get_policy(row['typeid'], row['name']))
+    assert Policies.get_policy_from_file(export_path, 'FireCore_FW_Rules', 'Unknown') is None
+
+def test_get_policy_from_file_shared_settings(shared_settings_path):
+    for name in ('P1', 'P2'):
+        policy = Policies.get_policy_from_file(shared_settings_path, 'T', name)
+        assert policy.find('EPOPolicySettings').get('name') == 'S1'
+
+def test_duplicated_policy_first_wins(duplicated_policy_path):
+    file_path = duplicated_policy_path
+    index = PolicyFileIndex.open(file_path)
+    assert index.list() == [{'typeid': 'T', 'name': 'P1'}, {'typeid': 'T', 'name': 'P2'}]
+    policy = index.get_policy('T', 'P1')
+    assert policy.find('EPOPolicySettings').get('name') == 'S1'
+    assert (et.tostring(policy.find('EPOPolicySettings')) ==
+            et.tostring(Policies(file_path=file_path).get_policy('T', 'P1').find(
+                'EPOPolicySettings')))
+    # Every occurrence is returned when the export is walked
+    assert [root.find('EPOPolicySettings').get('name')
+            for root in index.iter_policies(type_ids=['T'])] == ['S1', 'S1', 'S2']
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+################################################################################
+# Copyright (c) 2019 Benjamin Marandel - All Rights Reserved.
+################################################################################
+
+import xml.etree.ElementTree as et
+from mcafee_epo_policies.ma.general import McAfeeAgentPolicyGeneral, BRANCH_SELECTION_KEYS
+
+GENERAL_POLICY = b'''<?xml version="1.0" encoding="UTF-8"?>
+<epo:EPOPolicySchema xmlns:epo="mcafee-epo-policy">
+<EPOPolicyVerInfo vermjr="5" vermin="10" verrel="0" verbld="0"/>
+<EPOPolicySettings name="G1" featureid="EPOAGENTMETA" categoryid="General" typeid="General" param_int="0" param_str="">
+<Section name="BranchSelection">
+<Setting name="NumberOfItems" value="2"/>
+<Setting name="BranchType_0" value="Current"/>
+<Setting name="OneClickEnabled_0" value="0"/>
+<Setting name="SoftwareID_0" value="ENDP_AM_1000"/>
+<Setting name="BranchType_1" value="Current"/>
+<Setting name="OneClickEnabled_1" value="0"/>
+<Setting name="SoftwareID_1" value="EPOAGENTMETA"/>
+<Setting name="Version_2" value="kept"/>
+</Section>
+</EPOPolicySettings>
+<EPOPolicyObject name="G1" featureid="EPOAGENTMETA" categoryid="General" serverid="SRV" editflag="0" typeid="General">
+<PolicySettings>G1</PolicySettings>
+</EPOPolicyObject>
+</epo:EPOPolicySchema>
+'''
+
+def test_branch_selection_round_trip():
+    policy = McAfeeAgentPolicyGeneral(et.fromstring(GENERAL_POLICY))
+    table = policy.get_upd_branch_selection()
+    assert [row['SoftwareID'] for row in table] == ['ENDP_AM_1000', 'EPOAGENTMETA']
+    new_table = [{'BranchType': 'Previous', 'OneClickEnabled': '1', 'SoftwareID': 'X'}]
+    assert policy.set_upd_branch_selection(new_table)
+    assert policy.get_upd_branch_selection() == new_table
+    # The items of the previous table are removed, the other settings are kept
+    assert policy.get_setting_value('BranchSelection', 'SoftwareID_1') is None
+    assert policy.get_setting_value('BranchSelection', 'Version_2') == 'kept'
+
+def test_set_table_value_with_other_keys():
+    policy = McAfeeAgentPolicyGeneral(et.fromstring(GENERAL_POLICY))
+    assert policy.set_table_value('BranchSelection', [{'BranchType': 'Current'}])
+    # The known keys of the previous table are removed
+    assert policy.get_table_value('BranchSelection', BRANCH_SELECTION_KEYS) == [
+        {'BranchType': 'Current', 'OneClickEnabled': None, 'SoftwareID': None}]
+    assert policy.get_setting_value('BranchSelection', 'SoftwareID_0') is None
+    assert not policy.set_table_value('Unknown', [])
+
+def test_table_codec_only_owns_the_known_keys():
+    policy = McAfeeAgentPolicyGeneral(et.fromstring(GENERAL_POLICY))
+    values = {'NumberOfItems': '1', 'BranchType_0': 'Current', 'Version_2': 'kept'}
+    codecs = policy.get_list_codecs('BranchSelection', values)
+    assert [codec.columns for codec in codecs] == [[key + '_{}' for key in BRANCH_SELECTION_KEYS]]
+    assert not codecs[0].owns('Version_2')
+    assert policy.get_list_codecs('Other', values) == []
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+################################################################################
+# Copyright (c) 2019 Benjamin Marandel - All Rights Reserved.
+################################################################################
+
+from mcafee_epo_policies.hashtree import PolicyHashTree
+from mcafee_epo_policies.policies import Policies
+from mcafee_epo_policies.synthetic import SyntheticPolicies
+
+FW_NAME = 'Ben - CAG Test'
+
+def get_settings(policies, name):
+    return policies.root.find('EPOPolicySettings[@name="{}"]'.format(name))
+
+def test_same_export_has_no_changes(fw_policy_path):
+    tree = PolicyHashTree.build(Policies(file_path=fw_policy_path))
+    assert tree == PolicyHashTree.build(Policies(file_path=fw_policy_path))
+    assert tree.compare(PolicyHashTree.build(Policies(file_path=fw_policy_path))) == []
+
+def test_changed_setting(fw_policy_path):
+    old = Policies(file_path=fw_policy_path)
+    new = Policies(file_path=fw_policy_path)
+    rule = FW_NAME + ':Rule:b80d5f4c-3c02-4d0b-b2c4-1cd8a7c45ac0'
+    setting_obj = get_settings(new, rule).find('Section/Setting[@name="Enabled"]')
+    old_value = setting_obj.get('value')
+    setting_obj.set('value', 'changed')
+    changes = PolicyHashTree.build(old).compare(PolicyHashTree.build(new))
+    assert changes == [{'change': 'changed', 'typeid': 'FireCore_FW_Rules', 'name': FW_NAME,
+                        'settings': 'Rule:b80d5f4c-3c02-4d0b-b2c4-1cd8a7c45ac0',
+                        'section': '101', 'setting': 'Enabled', 'old': old_value,
+                        'new': 'changed'}]
+
+def test_regenerated_settings_name_is_a_change(fw_policy_path):
+    old = Policies(file_path=fw_policy_path)
+    new = Policies(file_path=fw_policy_path)
+    settings_obj = [settings_obj for settings_obj in new.root.findall('EPOPolicySettings')
+                    if '::Settings (' in settings_obj.get('name')][0]
+    new_name = FW_NAME + '::Settings (NEW)'
+    for policy_ref in new.root.iterfind('EPOPolicyObject/PolicySettings'):
+        if policy_ref.text == settings_obj.get('name'):
+            policy_ref.text = new_name
+    settings_obj.set('name', new_name)
+    assert PolicyHashTree.build(old).compare(PolicyHashTree.build(new)) == []
+    settings_obj.find('Section/Setting[@name="RuleListID"]').set('value', 'changed')
+    changes = PolicyHashTree.build(old).compare(PolicyHashTree.build(new))
+    assert [(change['change'], change['settings'], change['setting']) for change in changes] == [
+        ('changed', '::Settings#0', 'RuleListID')]
+
+def test_added_and_removed_policies_in_buckets(tmp_path):
+    policies = SyntheticPolicies.generate(seed=1, oas=20, general=20)
+    old = PolicyHashTree.build(policies)
+    removed = policies.list()[0]
+    policies.remove_policy(removed['typeid'], removed['name'])
+    new = PolicyHashTree.build(policies)
+    assert max(len(buckets) for _, buckets in new.types.values()) > 1
+    assert [(change['change'], change['name']) for change in old.compare(new)] == [
+        ('removed', removed['name'])]
+    assert [(change['change'], change['name']) for change in new.compare(old)] == [
+        ('added', removed['name'])]
+
+def test_save_and_load(tmp_path, fw_policy_path):
+    tree = PolicyHashTree.build(Policies(file_path=fw_policy_path))
+    file_path = str(tmp_path / 'tree.json')
+    tree.save(file_path)
+    loaded = PolicyHashTree.load(file_path)
+    assert loaded == tree
+    assert loaded.compare(tree) == []
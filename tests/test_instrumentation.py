@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+################################################################################
+# Copyright (c) 2019 Benjamin Marandel - All Rights Reserved.
+################################################################################
+
+import os
+from mcafee_epo_policies import instrumentation
+from mcafee_epo_policies.policies import Policies, Policy
+
+def get_lookups(stats):
+    return {method for methods in stats['lookups'].values() for method in methods}
+
+def test_lookups_of_policy_overrides(fw_policy_path):
+    policies = Policies(file_path=fw_policy_path)
+    policy = Policy(policies.get_policy('FireCore_FW_Rules', 'Ben - CAG Test'))
+    with instrumentation.measure() as stats:
+        policy.get_product()
+        policy.get_epo_server()
+        policies.get_product()
+        policy.get_setting_value('101', 'Enabled')
+    lookups = get_lookups(stats.snapshot())
+    assert {'Policy.get_product', 'Policy.get_epo_server', 'XmlObject.get_product',
+            'Policy._get_setting', 'Policy.refresh_index'} <= lookups
+    # The original methods are restored
+    assert Policy.get_product.__qualname__ == 'Policy.get_product'
+
+def test_parse_size_is_in_bytes():
+    xml_data = '<epo:EPOPolicySchema xmlns:epo="mcafee-epo-policy" note="éé"/>'
+    with instrumentation.measure() as stats:
+        Policies(xml_policies=xml_data)
+    parse = stats.snapshot()['parse']
+    assert parse['count'] == 1
+    assert parse['bytes'] == len(xml_data.encode('utf8')) == len(xml_data) + 2
+
+def test_serialize_size(fw_policy_path):
+    policies = Policies(file_path=fw_policy_path)
+    with instrumentation.measure() as stats:
+        content = policies.get_xml_content()
+    snapshot = stats.snapshot()
+    assert snapshot['serialize']['bytes'] == len(content)
+    assert not instrumentation.is_enabled()
+
+def test_io_methods_called_with_keywords(tmp_path, fw_policy_path):
+    file_path = str(tmp_path / 'export.xml')
+    with instrumentation.measure() as stats:
+        policies = Policies()
+        policies.load_from_file(file_path=fw_policy_path)
+        Policy(None).load_from_file(file_path=fw_policy_path)
+        policies.set_xml_content(xml_data=policies.get_xml_content())
+        assert policies.save_to_file(file_path=file_path)
+        buffer = bytearray()
+        assert policies.write_xml_content(stream=buffer)
+    snapshot = stats.snapshot()
+    assert snapshot['parse']['count'] == 3
+    assert snapshot['serialize']['count'] == 3
+    size = os.path.getsize(fw_policy_path)
+    content_size = len(policies.get_xml_content())
+    assert snapshot['parse']['bytes'] == 2 * size + content_size
+    assert (snapshot['serialize']['bytes'] ==
+            content_size + os.path.getsize(file_path) + len(buffer))
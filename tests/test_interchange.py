@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+################################################################################
+# Copyright (c) 2019 Benjamin Marandel - All Rights Reserved.
+################################################################################
+
+import gc
+import pytest
+from mcafee_epo_policies.interchange import read_json_lines
+from mcafee_epo_policies.policies import Policies, Policy
+
+def test_json_lines_round_trip(fw_policy_path):
+    policies = Policies(file_path=fw_policy_path)
+    loaded = Policies()
+    loaded.set_json_lines(policies.get_json_lines())
+    assert loaded.get_xml_content() == policies.get_xml_content()
+    assert loaded.list() == policies.list()
+
+def test_json_lines_file(tmp_path, shared_settings_path):
+    policies = Policies(file_path=shared_settings_path)
+    policy = Policy(policies.get_policy('T', 'P2'))
+    file_path = str(tmp_path / 'policy.jsonl')
+    assert policy.save_to_json_lines(file_path)
+    loaded = Policy(None)
+    loaded.load_from_json_lines(file_path)
+    assert loaded.get_xml_content() == policy.get_xml_content()
+    assert loaded.get_setting_value('General', 'Enabled') == '1'
+
+def test_read_json_lines_leaves_gc_alone(fw_policy_path):
+    lines = Policies(file_path=fw_policy_path).get_json_lines().splitlines()
+    read_json_lines(lines)
+    assert gc.isenabled()
+
+def test_read_json_lines_rejects_other_content():
+    with pytest.raises(ValueError):
+        read_json_lines([])
+    with pytest.raises(ValueError):
+        read_json_lines(['{"format": "other"}'])
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+################################################################################
+# Copyright (c) 2019 Benjamin Marandel - All Rights Reserved.
+################################################################################
+
+import io
+import bz2
+import gzip
+import zipfile
+import pytest
+from mcafee_epo_policies.inventory import PolicyInventory
+from mcafee_epo_policies.policies import Policies
+from mcafee_epo_policies.synthetic import SyntheticPolicies
+
+@pytest.fixture
+def export_path(tmp_path):
+    policies = SyntheticPolicies.generate(seed=3, oas=5, ods=5, fw=2, general=3)
+    file_path = str(tmp_path / 'export.xml')
+    policies.save_to_file(file_path)
+    return file_path
+
+def test_inventory_matches_policies(export_path):
+    inventory = PolicyInventory(export_path)
+    policies = Policies(file_path=export_path)
+    assert inventory.list() == policies.list()
+    assert inventory.list_type() == policies.list_type()
+    assert inventory.list_name() == policies.list_name()
+    assert inventory.list_servers() == ['SYNTHETIC']
+    assert PolicyInventory(export_path, feature_id='EPOAGENTMETA').list_type() == ['General']
+
+@pytest.mark.parametrize('compression', ['gzip', 'bz2', 'zip'])
+def test_compressed_inventory(tmp_path, export_path, compression):
+    with open(export_path, 'rb') as export_file:
+        xml_data = export_file.read()
+    file_path = str(tmp_path / 'export.xml.{}'.format(compression))
+    if compression == 'gzip':
+        with gzip.open(file_path, 'wb') as compressed_file:
+            compressed_file.write(xml_data)
+    elif compression == 'bz2':
+        with bz2.open(file_path, 'wb') as compressed_file:
+            compressed_file.write(xml_data)
+    else:
+        with zipfile.ZipFile(file_path, 'w') as archive:
+            archive.writestr('export.xml', xml_data)
+    assert PolicyInventory(file_path).entries == PolicyInventory(export_path).entries
+
+@pytest.mark.parametrize('chunk_size', [7, 64, 4096])
+def test_scan_stream_chunk_boundaries(export_path, chunk_size):
+    with open(export_path, 'rb') as export_file:
+        xml_data = export_file.read()
+    inventory = PolicyInventory()
+    inventory.scan_stream(io.BytesIO(xml_data), chunk_size=chunk_size)
+    assert inventory.entries == PolicyInventory(xml_policies=xml_data).entries
+    assert len(inventory.entries) == 15
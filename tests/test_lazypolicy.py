@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+################################################################################
+# Copyright (c) 2019 Benjamin Marandel - All Rights Reserved.
+################################################################################
+
+from mcafee_epo_policies.lazypolicy import MemoryBudget
+from mcafee_epo_policies.policies import Policies
+from mcafee_epo_policies.synthetic import SyntheticPolicies
+
+def test_lazy_policies_load_on_first_use(shared_settings_path):
+    policies = Policies(file_path=shared_settings_path)
+    lazy = policies.get_lazy_policies()
+    assert [policy.get_name() for policy in lazy] == ['P1', 'P2']
+    assert not any(policy.is_loaded() for policy in lazy)
+    assert lazy[1].get_setting_value('General', 'Enabled') == '1'
+    assert lazy[1].is_loaded() and not lazy[0].is_loaded()
+
+def test_budget_never_releases_changed_policies(shared_settings_path):
+    budget = MemoryBudget(1)
+    first, second = Policies(file_path=shared_settings_path).get_lazy_policies(budget=budget)
+    assert first.set_setting_value('General', 'Enabled', '0')
+    second.get_setting_value('General', 'Enabled')
+    assert first.is_loaded()
+    assert not first.release()
+    assert second.release()
+    assert not second.is_loaded()
+    assert second.get_setting_value('General', 'Enabled') == '1'
+    assert first.get_setting_value('General', 'Enabled') == '0'
+
+def test_lazy_from_file_releases_above_the_budget(tmp_path):
+    file_path = str(tmp_path / 'export.xml')
+    SyntheticPolicies.generate(seed=5, oas=4, fw=2, repository=2).save_to_file(file_path)
+    budget = MemoryBudget(1)
+    lazy = Policies.lazy_from_file(file_path, 'EAM_General_Policies', budget=budget)
+    assert len(lazy) == 4
+    assert not any(policy.is_loaded() for policy in lazy)
+    lazy[0].get_setting_value('General', 'bOASEnabled')
+    lazy[1].get_setting_value('General', 'bOASEnabled')
+    assert budget.releases == 1
+    assert not lazy[0].is_loaded() and lazy[1].is_loaded()
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+################################################################################
+# Copyright (c) 2019 Benjamin Marandel - All Rights Reserved.
+################################################################################
+
+import pytest
+import xml.etree.ElementTree as et
+from mcafee_epo_policies.listcodec import ListCodec
+from mcafee_epo_policies.synthetic import SyntheticPolicies
+from mcafee_epo_policies.ma.general import McAfeeAgentPolicyGeneral
+from mcafee_epo_policies.ma.repository import McAfeeAgentPolicyRepository
+
+CODEC = ListCodec('dwApplicationCount', ['szApplicationItem_{}', 'TypeItem_{}'])
+
+def new_section(*settings):
+    section_obj = et.Element('Section', name='Application')
+    for name, value in settings:
+        et.SubElement(section_obj, 'Setting', name=name, value=value)
+    return section_obj
+
+def get_names(section_obj):
+    return [setting_obj.get('name') for setting_obj in section_obj]
+
+def test_read_and_write_round_trip():
+    section_obj = new_section(('Other', 'x'))
+    CODEC.write(section_obj, [['a.exe', '1'], ['b.exe', '2']])
+    assert CODEC.read(section_obj) == [['a.exe', '1'], ['b.exe', '2']]
+    assert get_names(section_obj)[0] == 'Other'
+
+def test_write_shrinks_the_list():
+    section_obj = new_section()
+    CODEC.write(section_obj, [['a.exe', '1'], ['b.exe', '2'], ['c.exe', '1']])
+    CODEC.write(section_obj, [['a.exe', '1']])
+    assert get_names(section_obj) == ['dwApplicationCount', 'szApplicationItem_0', 'TypeItem_0']
+    CODEC.write(section_obj, [], empty_count=False)
+    assert get_names(section_obj) == []
+
+def test_write_rejects_incomplete_rows():
+    with pytest.raises(ValueError):
+        CODEC.write(new_section(), [['a.exe']])
+
+def test_first_index():
+    codec = ListCodec('RelayServerCount', ['relayip_{}'], first=1)
+    section_obj = new_section()
+    codec.write(section_obj, [['10.0.0.1']])
+    assert get_names(section_obj) == ['RelayServerCount', 'relayip_1']
+    assert codec.owns('relayip_12') and not codec.owns('relayport_1')
+
+def get_policy(policies, type_id):
+    return [row for row in policies.list() if row['typeid'] == type_id][0]['name']
+
+def test_set_table_value_removes_the_previous_items():
+    policies = SyntheticPolicies.generate(seed=1, general=1)
+    policy = McAfeeAgentPolicyGeneral(policies.get_policy('General',
+                                                          get_policy(policies, 'General')))
+    assert len(policy.get_upd_branch_selection()) > 1
+    assert policy.set_table_value('BranchSelection', [{'BranchType': 'Current'}])
+    names = get_names(policy.get_section('BranchSelection'))
+    assert 'BranchType_0' in names
+    assert not [name for name in names if name.startswith(('OneClickEnabled_', 'SoftwareID_'))]
+    assert not [name for name in names if name.startswith('BranchType_') and name != 'BranchType_0']
+    assert policy.set_upd_branch_selection([])
+    assert policy.get_upd_branch_selection() == []
+    assert get_names(policy.get_section('BranchSelection')).count('NumberOfItems') == 1
+
+def test_set_site_list_updates_the_settings():
+    policies = SyntheticPolicies.generate(seed=1, repository=1)
+    policy = McAfeeAgentPolicyRepository(policies.get_policy('Repository',
+                                                             get_policy(policies, 'Repository')))
+    site = policy.get_setting_value('InetManager', 'SitelistOrder_0')
+    assert policy.set_site_list([['NewSite', 'Disabled']])
+    assert policy.get_site_list() == [['NewSite', 'Disabled']]
+    assert policy.get_setting_value('InetManager', 'SitelistOrder_0') == 'NewSite' != site
+    assert policy.get_setting_value('InetManager', 'SitelistOrder_1') is None
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+################################################################################
+# Copyright (c) 2019 Benjamin Marandel - All Rights Reserved.
+################################################################################
+
+import pytest
+from mcafee_epo_policies.policies import Policies
+from mcafee_epo_policies.synthetic import SyntheticPolicies
+
+numpy = pytest.importorskip('numpy')
+from mcafee_epo_policies.matrix import SettingsMatrix
+
+def test_shared_settings(shared_settings_path):
+    matrix = SettingsMatrix.build(Policies(file_path=shared_settings_path))
+    assert matrix.shape == (2, 1)
+    assert matrix.get_values('General', 'Enabled') == ['1', '1']
+    assert matrix.get_names(matrix.match('General', 'Enabled', '1')) == ['P1', 'P2']
+
+def test_matches_policy_values():
+    policies = SyntheticPolicies.generate(seed=2, oas=12, variation=0.5)
+    matrix = SettingsMatrix.build(policies, type_id='EAM_General_Policies')
+    expected = [policy.get_setting_value('GTI', 'GTISensitivityLevel')
+                for policy in policies.iter_policies()]
+    assert matrix.get_values('GTI', 'GTISensitivityLevel') == expected
+    counts = matrix.count('GTI', 'GTISensitivityLevel')
+    assert sum(counts.values()) == 12
+    groups = matrix.group_by('GTI', 'GTISensitivityLevel')
+    assert {value: len(rows) for value, rows in groups.items()} == counts
+    low = matrix.match('GTI', 'GTISensitivityLevel', lambda value: int(value) < 3)
+    assert matrix.get_names(low) == [policy.get_name() for policy in policies.iter_policies()
+                                     if int(policy.get_setting_value('GTI', 'GTISensitivityLevel')) < 3]
+    with pytest.raises(ValueError):
+        matrix.get_column('GTI', 'Unknown')
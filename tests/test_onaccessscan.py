@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+################################################################################
+# Copyright (c) 2019 Benjamin Marandel - All Rights Reserved.
+################################################################################
+
+import pytest
+from mcafee_epo_policies.es.tp.estppolicies import ESTPPolicies
+from mcafee_epo_policies.es.tp.onaccessscan import ESTPPolicyOnAccessScan, PROCESSES
+
+from conftest import OAS_POLICY
+
+@pytest.fixture
+def oas_policy():
+    policies = ESTPPolicies(file_path=OAS_POLICY)
+    return ESTPPolicyOnAccessScan(policies.get_policy('EAM_General_Policies', 'OAS Test Policy'))
+
+def test_process_list_round_trip(oas_policy):
+    table = [['a.exe', 'Low Risk'], ['b.exe', 'High Risk']]
+    assert oas_policy.set_process_list(table)
+    assert oas_policy.get_process_list() == table
+    # The items of the longer previous list are removed
+    assert oas_policy.set_process_list(table[:1])
+    assert oas_policy.get_process_list() == table[:1]
+    assert oas_policy.get_setting_value('Application', PROCESSES.count) == '1'
+    assert oas_policy.get_setting_value('Application', 'szApplicationItem_1') is None
+    # An empty list is written with a count of 0
+    assert oas_policy.set_process_list([])
+    assert oas_policy.get_process_list() == []
+    assert oas_policy.get_setting_value('Application', PROCESSES.count) == '0'
+    with pytest.raises(ValueError):
+        oas_policy.set_process_list([['c.exe', 'Medium Risk']])
+
+def test_exclusion_list_round_trip(oas_policy):
+    table = [['3', '7', 'C:\\Temp\\', ''], ['4', '1', 'log', 'notes | with a pipe']]
+    assert oas_policy.set_exclusion_list(table)
+    assert oas_policy.get_exclusion_list() == table
+    assert oas_policy.get_setting_value('Default-Detection_Exclusions',
+                                        'ExcludedItem_1') == '4|1|log|notes | with a pipe'
+    assert oas_policy.set_exclusion_list([])
+    assert oas_policy.get_exclusion_list() is None
+
+def test_exclusion_list_needs_four_values(oas_policy):
+    previous = oas_policy.get_exclusion_list()
+    for row in (['3', '7', 'C:\\Temp\\'], ['3', '7', 'C:\\Temp\\', '', 'extra']):
+        with pytest.raises(ValueError):
+            oas_policy.set_exclusion_list([row])
+    assert oas_policy.get_exclusion_list() == previous
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+################################################################################
+# Copyright (c) 2019 Benjamin Marandel - All Rights Reserved.
+################################################################################
+
+import os
+import sys
+import json
+import subprocess
+import pytest
+import mcafee_epo_policies
+from mcafee_epo_policies import policies
+from mcafee_epo_policies.es.tp import onaccessscan
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def get_imported_modules(statement):
+    """
+    Returns the modules imported by a statement run in a new interpreter.
+    """
+    code = '{}\nimport sys, json\nprint(json.dumps(sorted(sys.modules)))'.format(statement)
+    output = subprocess.check_output([sys.executable, '-c', code], cwd=ROOT,
+                                     env=dict(os.environ, PYTHONPATH=ROOT))
+    return set(json.loads(output))
+
+def test_import_is_lazy():
+    modules = get_imported_modules('import mcafee_epo_policies')
+    assert 'setuptools' not in modules
+    assert 'mcafee_epo_policies.policies' not in modules
+    assert 'mcafee_epo_policies.es.tp.onaccessscan' not in modules
+
+def test_star_import_skips_the_optional_dependencies():
+    modules = get_imported_modules('from mcafee_epo_policies import *')
+    assert 'mcafee_epo_policies.policies' in modules
+    assert not modules & {'numpy', 'sqlite3', 'mcafee_epo_policies.store',
+                          'mcafee_epo_policies.matrix'}
+    assert mcafee_epo_policies.__all__ == ['constants', 'policies', 'ma', 'es']
+
+def test_exports_are_loaded_on_first_access():
+    assert mcafee_epo_policies.Policies is policies.Policies
+    assert mcafee_epo_policies.ESTPPolicyOnAccessScan is onaccessscan.ESTPPolicyOnAccessScan
+    assert mcafee_epo_policies.es.tp.OASProcessList is onaccessscan.OASProcessList
+    assert isinstance(mcafee_epo_policies.__version__, str)
+    assert 'McAfeeAgentPolicyGeneral' in dir(mcafee_epo_policies)
+    with pytest.raises(AttributeError):
+        mcafee_epo_policies.Unknown
+    with pytest.raises(ImportError):
+        exec('from mcafee_epo_policies.es.fw import Unknown')
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+################################################################################
+# Copyright (c) 2019 Benjamin Marandel - All Rights Reserved.
+################################################################################
+
+import gc
+import xml.etree.ElementTree as et
+from mcafee_epo_policies.parsecache import ParseCache, encode_tree, decode_tree
+from mcafee_epo_policies.policies import Policies
+
+def test_encode_and_decode_tree(fw_policy_path):
+    root = et.parse(fw_policy_path).getroot()
+    assert et.tostring(decode_tree(encode_tree(root))) == et.tostring(root)
+
+def test_decode_tree_leaves_gc_alone(fw_policy_path):
+    data = encode_tree(et.parse(fw_policy_path).getroot())
+    assert gc.isenabled()
+    decode_tree(data)
+    assert gc.isenabled()
+    gc.disable()
+    try:
+        decode_tree(data)
+        assert not gc.isenabled()
+    finally:
+        gc.enable()
+
+def test_load_from_cache(tmp_path, fw_policy_path):
+    cache = ParseCache(str(tmp_path / 'cache'))
+    calls = []
+
+    def parse(file_path):
+        calls.append(file_path)
+        return et.parse(file_path).getroot()
+
+    first = cache.load(fw_policy_path, parse)
+    second = cache.load(fw_policy_path, parse)
+    assert calls == [fw_policy_path]
+    assert et.tostring(first) == et.tostring(second)
+    assert cache.get_size() > 0
+    cache.clear()
+    assert cache.get_size() == 0
+
+def test_policies_parse_cache(tmp_path, fw_policy_path):
+    Policies.parse_cache = ParseCache(str(tmp_path / 'cache'))
+    try:
+        first = Policies(file_path=fw_policy_path)
+        second = Policies(file_path=fw_policy_path)
+    finally:
+        del Policies.parse_cache
+    assert first.get_xml_content() == second.get_xml_content()
+    assert second.list() == [{'typeid': 'FireCore_FW_Rules', 'name': 'Ben - CAG Test'}]
@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+################################################################################
+# Copyright (c) 2019 Benjamin Marandel - All Rights Reserved.
+################################################################################
+
+import io
+import os
+import copy
+import gzip
+import xml.etree.ElementTree as et
+import pytest
+from mcafee_epo_policies.policies import (Policies, Policy, iterparse_policies,
+                                          get_section_fingerprint, get_settings_fingerprints,
+                                          get_slice_size)
+from mcafee_epo_policies.es.tp.estppolicies import ESTPPolicies
+from mcafee_epo_policies.es.fw.esfwpolicies import ESFWPolicies
+
+from conftest import OAS_POLICY
+
+def test_iterparse_policies_copies_shared_settings(shared_settings_path):
+    roots = list(iterparse_policies(shared_settings_path))
+    assert [root.find('EPOPolicyObject').get('name') for root in roots] == ['P1', 'P2']
+    settings = [root.find('EPOPolicySettings') for root in roots]
+    assert all(settings_obj is not None for settings_obj in settings)
+    assert settings[0] is not settings[1]
+
+def test_iter_from_file_shared_settings(shared_settings_path):
+    policies = list(ESTPPolicies.iter_from_file(shared_settings_path))
+    assert [policy.get_name() for policy in policies] == ['P1', 'P2']
+    assert [policy.get_setting_value('General', 'Enabled') for policy in policies] == ['1', '1']
+
+def test_load_from_file_with_type_ids_keeps_shared_settings_once(shared_settings_path):
+    policies = Policies(file_path=shared_settings_path, type_ids='T')
+    assert len(policies.root.findall('EPOPolicySettings')) == 1
+    assert len(policies.root.findall('EPOPolicyVerInfo')) == 1
+    for name in ('P1', 'P2'):
+        policy = policies.get_policy('T', name)
+        assert policy.find('EPOPolicySettings/Section/Setting').get('value') == '1'
+
+def multi_product_export(tmp_path, fw_policy_path):
+    # The firewall policy followed by the On-Access Scan policy, with a single header
+    root = et.parse(fw_policy_path).getroot()
+    root.extend(child for child in et.parse(OAS_POLICY).getroot()
+                if child.tag != 'EPOPolicyVerInfo')
+    file_path = str(tmp_path / 'export.xml')
+    et.ElementTree(root).write(file_path, encoding='utf8', xml_declaration=True)
+    return file_path
+
+def test_product_is_checked_or_filtered(tmp_path, fw_policy_path):
+    with open(fw_policy_path, 'rb') as xml_file:
+        xml_data = xml_file.read()
+    with pytest.raises(ValueError):
+        ESTPPolicies(xml_policies=xml_data)
+    # A file is filtered by the product of the class
+    assert ESTPPolicies(file_path=fw_policy_path).is_empty()
+    assert ESFWPolicies(file_path=fw_policy_path).list() == [
+        {'typeid': 'FireCore_FW_Rules', 'name': 'Ben - CAG Test'}]
+    file_path = multi_product_export(tmp_path, fw_policy_path)
+    assert len(Policies(file_path=file_path).list()) == 2
+    tp_policies = ESTPPolicies(file_path=file_path)
+    assert tp_policies.list_name() == ['OAS Test Policy']
+    assert tp_policies.get_product() == 'ENDP_AM_1000'
+    assert (tp_policies.get_policy('EAM_General_Policies', 'OAS Test Policy') is not None)
+    assert ESFWPolicies(file_path=file_path).list_name() == ['Ben - CAG Test']
+
+def test_iterparse_policies_sources(tmp_path, fw_policy_path):
+    file_path = multi_product_export(tmp_path, fw_policy_path)
+    gzip_path = str(tmp_path / 'export.xml.gz')
+    with open(file_path, 'rb') as xml_file, gzip.open(gzip_path, 'wb') as gzip_file:
+        gzip_file.write(xml_file.read())
+    for feature_id, type_ids in ((None, None), ('ENDP_AM_1000', None),
+                                 (None, 'FireCore_FW_Rules')):
+        # An export file is read by byte ranges, a compressed one in a single pass
+        from_file = [Policy(root) for root in iterparse_policies(file_path, feature_id, type_ids)]
+        from_gzip = [Policy(root) for root in iterparse_policies(gzip_path, feature_id, type_ids)]
+        assert ([policy.get_settings_values() for policy in from_file] ==
+                [policy.get_settings_values() for policy in from_gzip])
+    assert [policy.get_product() for policy in from_file] == ['ENDP_FW_META_FW']
+    # No sidecar index is written
+    assert sorted(os.listdir(str(tmp_path))) == ['export.xml', 'export.xml.gz']
+
+def test_get_policy_only_copies_its_elements(shared_settings_path):
+    policies = Policies(file_path=shared_settings_path)
+    policy = policies.get_policy('T', 'P2')
+    assert policy.tag == policies.root.tag
+    assert [(child.tag, child.get('name')) for child in policy] == [
+        ('EPOPolicyVerInfo', None), ('EPOPolicySettings', 'S1'), ('EPOPolicyObject', 'P2')]
+    # The extracted policy is a copy
+    policy.find('EPOPolicySettings/Section/Setting').set('value', '0')
+    assert policies.root.find('EPOPolicySettings/Section/Setting').get('value') == '1'
+    assert policies.get_policy('T', 'P3') is None
+
+def test_iter_policies(shared_settings_path):
+    policies = Policies(file_path=shared_settings_path)
+    iterated = list(policies.iter_policies())
+    assert [policy.get_name() for policy in iterated] == ['P1', 'P2']
+    assert [policy.get_name() for policy in policies.iter_policies('T')] == ['P1', 'P2']
+    assert list(policies.iter_policies('Unknown')) == []
+    assert list(Policies().iter_policies()) == []
+    # The policies are copies of the export
+    assert (et.tostring(iterated[1].root) ==
+            et.tostring(policies.get_policy('T', 'P2')))
+    assert iterated[0].set_setting_value('General', 'Enabled', '0')
+    assert policies.root.find('EPOPolicySettings/Section/Setting').get('value') == '1'
+
+def test_get_file_name():
+    assert Policies.get_file_name('T', 'a/b:c') == os.path.join('T', 'a%2Fb%3Ac.xml')
+    assert Policies.get_file_name('T', 'v1.0 (test)') == os.path.join('T', 'v1.0 (test).xml')
+    assert Policies.get_file_name('..', '..') == os.path.join('%2E%2E', '%2E%2E.xml')
+    assert Policies.get_file_name('.', 'a') == os.path.join('%2E', 'a.xml')
+
+def test_split_all(tmp_path, shared_settings_path):
+    policies = Policies(file_path=shared_settings_path)
+    file_paths = policies.split_all(str(tmp_path))
+    assert file_paths == [str(tmp_path / 'T' / 'P1.xml'), str(tmp_path / 'T' / 'P2.xml')]
+    for file_path, name in zip(file_paths, ('P1', 'P2')):
+        assert (Policies(file_path=file_path).get_xml_content() ==
+                et.tostring(policies.get_policy('T', name), encoding='utf8', method='xml'))
+    assert policies.split_all(str(tmp_path / 'none'), type_id='Unknown') == []
+
+def new_policy_object(policies, name):
+    policy_obj = copy.deepcopy(policies.root.find('EPOPolicyObject'))
+    policy_obj.set('name', name)
+    return policy_obj
+
+def test_index_detects_remove_and_append(shared_settings_path):
+    policies = Policies(file_path=shared_settings_path)
+    assert policies.contain('T', 'P1')
+    # Same number of children after the change
+    policies.root.remove(policies.root.find('EPOPolicyObject[@name="P1"]'))
+    policies.root.append(new_policy_object(policies, 'P3'))
+    assert not policies.contain('T', 'P1')
+    assert policies.contain('T', 'P3')
+    assert policies.get_policy('T', 'P1') is None
+    assert policies.list_name() == ['P2', 'P3']
+
+def test_index_detects_insert_first(shared_settings_path):
+    policies = Policies(file_path=shared_settings_path)
+    assert not policies.contain('T', 'P0')
+    policies.root.remove(policies.root.find('EPOPolicyObject[@name="P2"]'))
+    policies.root.insert(0, new_policy_object(policies, 'P0'))
+    assert policies.contain('T', 'P0')
+    assert not policies.contain('T', 'P2')
+
+def test_index_detects_rename_in_place(fw_policy_path):
+    # Renamed before and after the index has been used
+    for lookup in (False, True):
+        policies = ESFWPolicies(file_path=fw_policy_path)
+        if lookup:
+            assert policies.contain('FireCore_FW_Rules', 'Ben - CAG Test')
+        policies.root.find('EPOPolicyObject').set('name', 'RENAMED')
+        assert policies.contain('FireCore_FW_Rules', 'RENAMED')
+        assert not policies.contain('FireCore_FW_Rules', 'Ben - CAG Test')
+        assert policies.list_name() == ['RENAMED']
+
+def test_add_and_remove_policy(shared_settings_path):
+    policies = Policies(file_path=shared_settings_path)
+    new_policy = policies.new_policy('T', 'P3', template='P1')
+    assert policies.add_policy(new_policy)
+    assert policies.list_name() == ['P1', 'P2', 'P3']
+    assert policies.remove_policy('T', 'P1')
+    assert not policies.contain('T', 'P1')
+    # S1 is still referenced by P2
+    assert policies.get_policy('T', 'P2').find('EPOPolicySettings').get('name') == 'S1'
+    assert policies.remove_policy('T', 'P2')
+    assert policies.root.find('EPOPolicySettings[@name="S1"]') is None
+    assert not policies.remove_policy('T', 'P2')
+
+def oas_policy():
+    policies = Policies(file_path=OAS_POLICY)
+    return Policy(policies.get_policy('EAM_General_Policies', 'OAS Test Policy'))
+
+def test_setting_lookups_follow_the_changes():
+    policy = oas_policy()
+    assert policy.get_setting_value('Alerting', 'bShowAlerts') == '1'
+    assert policy.get_setting_value('Alerting', 'Unknown') is None
+    assert policy.get_setting_value('Unknown', 'bShowAlerts') is None
+    assert policy.get_section('Alerting') is policy.root.find(
+        'EPOPolicySettings/Section[@name="Alerting"]')
+    assert policy.get_section('Unknown') is None
+    assert policy.set_setting_value('Alerting', 'bShowAlerts', '0')
+    assert policy.root.find('EPOPolicySettings/Section[@name="Alerting"]/Setting'
+                            '[@name="bShowAlerts"]').get('value') == '0'
+    assert not policy.set_setting_value('Alerting', 'Added', 'x')
+    assert policy.set_setting_value('Alerting', 'Added', 'x', force=True)
+    assert policy.get_setting_value('Alerting', 'Added') == 'x'
+    assert not policy.set_setting_value('Unknown', 'Added', 'x', force=True)
+
+def test_setting_lookups_after_direct_changes():
+    policy = oas_policy()
+    assert policy.get_setting_value('Alerting', 'bShowAlerts') == '1'
+    section_obj = policy.root.find('EPOPolicySettings/Section[@name="Alerting"]')
+    section_obj.remove(section_obj.find('Setting[@name="bShowAlerts"]'))
+    et.SubElement(section_obj, 'Setting', {'name': 'bShowAlerts', 'value': '2'})
+    # The tree has been changed directly: the index must be rebuilt
+    policy.refresh_index()
+    assert policy.get_setting_value('Alerting', 'bShowAlerts') == '2'
+    # A new content drops the index
+    policy.root = Policies(file_path=OAS_POLICY).get_policy('EAM_General_Policies',
+                                                          'OAS Test Policy')
+    assert policy.get_setting_value('Alerting', 'bShowAlerts') == '1'
+
+def test_get_and_apply_settings(shared_settings_path):
+    policy = next(Policies(file_path=shared_settings_path).iter_policies())
+    assert policy.get_settings([('General', 'Enabled'), ('General', 'Unknown')]) == \
+        {('General', 'Enabled'): '1', ('General', 'Unknown'): None}
+    assert policy.apply_settings({('General', 'Enabled'): '0', ('General', 'Added'): 'x'}) == \
+        {('General', 'Enabled'): True, ('General', 'Added'): False}
+    # The tuples are applied in order, the missing settings are created with force
+    assert policy.apply_settings([('General', 'Added', 'x'), ('General', 'Added', 'y')],
+                                 force=True) == {('General', 'Added'): True}
+    assert policy.get_settings([('General', 'Enabled'), ('General', 'Added')]) == \
+        {('General', 'Enabled'): '0', ('General', 'Added'): 'y'}
+    assert len(policy.root.findall('EPOPolicySettings/Section/Setting[@name="Added"]')) == 1
+
+def test_write_xml_content(tmp_path, fw_policy_path):
+    policies = Policies(file_path=fw_policy_path)
+    buffer = bytearray()
+    stream = io.BytesIO()
+    assert policies.write_xml_content(buffer)
+    assert policies.write_xml_content(stream)
+    with open(str(tmp_path / 'export.xml'), 'wb') as xml_file:
+        assert policies.write_xml_content(xml_file)
+    assert bytes(buffer) == stream.getvalue() == (tmp_path / 'export.xml').read_bytes()
+    assert bytes(buffer).startswith(b"<?xml version='1.0' encoding='utf8'?>")
+    assert Policies(xml_policies=bytes(buffer)).get_xml_content() == policies.get_xml_content()
+    assert not Policies().write_xml_content(bytearray())
+
+def test_save_to_file(tmp_path, fw_policy_path):
+    policies = Policies(file_path=fw_policy_path)
+    file_path = str(tmp_path / 'export.xml')
+    assert policies.save_to_file(file_path)
+    assert Policies(file_path=file_path).get_xml_content() == policies.get_xml_content()
+    assert not Policies().save_to_file(str(tmp_path / 'empty.xml'))
+    assert os.listdir(str(tmp_path)) == ['export.xml']
+    with pytest.raises(ValueError):
+        policies.save_to_file(file_path, compression='lzma')
+
+def test_save_to_file_gzip_and_atomic(tmp_path, fw_policy_path):
+    policies = Policies(file_path=fw_policy_path)
+    file_path = str(tmp_path / 'export.xml.gz')
+    assert policies.save_to_file(file_path, compression='gzip', atomic=True)
+    assert os.listdir(str(tmp_path)) == ['export.xml.gz']
+    with gzip.open(file_path, 'rb') as gzip_file:
+        assert Policies(xml_policies=gzip_file.read()).get_xml_content() == \
+            policies.get_xml_content()
+    # The same content always gives the same file
+    content = (tmp_path / 'export.xml.gz').read_bytes()
+    assert policies.save_to_file(file_path, compression='gzip')
+    assert (tmp_path / 'export.xml.gz').read_bytes() == content
+
+def test_atomic_save_failure_keeps_the_previous_file(tmp_path, fw_policy_path, monkeypatch):
+    policies = Policies(file_path=fw_policy_path)
+    file_path = tmp_path / 'export.xml'
+    file_path.write_bytes(b'previous')
+
+    def write_xml_content(stream):
+        stream.write(b'partial')
+        raise OSError('Disk full')
+
+    monkeypatch.setattr(policies, 'write_xml_content', write_xml_content)
+    with pytest.raises(OSError):
+        policies.save_to_file(str(file_path), atomic=True)
+    assert file_path.read_bytes() == b'previous'
+    assert os.listdir(str(tmp_path)) == ['export.xml']
+
+def test_fingerprints(shared_settings_path):
+    policies = Policies(file_path=shared_settings_path)
+    p1, p2 = policies.iter_policies()
+    # Same settings, different names
+    assert p1.get_fingerprint() == p2.get_fingerprint()
+    assert policies.get_fingerprints() == {('T', 'P1'): p1.get_fingerprint(),
+                                           ('T', 'P2'): p2.get_fingerprint()}
+    assert policies.get_fingerprints('Unknown') == {}
+    assert list(p1.get_settings_fingerprints()) == ['S1']
+    assert p1.get_section_fingerprint('General') == get_section_fingerprint(
+        p1.root.find('EPOPolicySettings/Section'))
+    assert p1.get_section_fingerprint('Unknown') is None
+    # A change of the settings changes the fingerprint
+    assert p1.set_setting_value('General', 'Enabled', '0')
+    assert p1.get_fingerprint() != p2.get_fingerprint()
+    assert p1.set_setting_value('General', 'Enabled', '1')
+    assert p1.get_fingerprint() == p2.get_fingerprint()
+
+def test_fingerprint_ignores_order_and_block_names():
+    section_obj = et.fromstring('<Section name="S"><Setting name="a" value="1"/>'
+                                '<Setting value="2" name="b"/></Section>')
+    reordered = et.fromstring('<Section name="S"><Setting name="b" value="2"/>'
+                              '<Setting name="a" value="1"/></Section>')
+    assert get_section_fingerprint(section_obj) == get_section_fingerprint(reordered)
+    renamed = et.fromstring('<Section name="R"><Setting name="a" value="1"/>'
+                            '<Setting name="b" value="2"/></Section>')
+    assert get_section_fingerprint(section_obj) != get_section_fingerprint(renamed)
+    first = et.Element('EPOPolicySettings', name='P1::Settings (A)')
+    first.extend([section_obj, renamed])
+    second = et.Element('EPOPolicySettings', name='P2::Settings (B)')
+    second.extend([copy.deepcopy(renamed), copy.deepcopy(reordered)])
+    assert get_settings_fingerprints(first)[0] == get_settings_fingerprints(second)[0]
+
+def test_get_slice_size():
+    assert get_slice_size(0, 2) == 1
+    assert get_slice_size(100, 2) == 13
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+################################################################################
+# Copyright (c) 2019 Benjamin Marandel - All Rights Reserved.
+################################################################################
+
+from mcafee_epo_policies.policies import Policies, Policy
+from mcafee_epo_policies.policydiff import diff_rows
+
+def load_fw_policy(file_path):
+    policies = Policies(file_path=file_path)
+    return Policy(policies.get_policy('FireCore_FW_Rules', 'Ben - CAG Test'))
+
+def test_diff_same_policy_is_empty(fw_policy_path):
+    policy = load_fw_policy(fw_policy_path)
+    assert policy.diff(load_fw_policy(fw_policy_path)) == {}
+
+def test_diff_compares_every_settings_block(fw_policy_path):
+    old = load_fw_policy(fw_policy_path)
+    new = load_fw_policy(fw_policy_path)
+    # Every rule block has a Section "101": change the last one only
+    last_rule = [settings_obj for settings_obj in new.root.findall('EPOPolicySettings')
+                 if settings_obj.get('param_str') == '101'][-1]
+    setting_obj = last_rule.find('Section/Setting[@name="Enabled"]')
+    setting_obj.set('value', '0' if setting_obj.get('value') == '1' else '1')
+    assert old.get_fingerprint() != new.get_fingerprint()
+    key = last_rule.get('name').split(':', 1)[1]
+    differences = old.diff(new)
+    assert list(differences) == [key]
+    assert list(differences[key]) == ['101']
+    assert list(differences[key]['101']['changed']) == ['Enabled']
+
+def test_diff_ignores_generated_block_names(fw_policy_path):
+    old = load_fw_policy(fw_policy_path)
+    new = load_fw_policy(fw_policy_path)
+    for settings_obj in new.root.findall('EPOPolicySettings'):
+        if '::Settings (' in settings_obj.get('name'):
+            settings_obj.set('name', 'Ben - CAG Test::Settings (NEW)')
+    assert old.diff(new) == {}
+
+def test_diff_rows_reports_moves():
+    changes = diff_rows([['a'], ['b'], ['c']], [['c'], ['a'], ['b'], ['d']])
+    assert changes['inserted'] == [(3, ['d'])]
+    assert changes['deleted'] == []
+    assert changes['moved'] == [(2, 0, ['c'])]
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+################################################################################
+# Copyright (c) 2019 Benjamin Marandel - All Rights Reserved.
+################################################################################
+
+import os
+import copy
+import concurrent.futures
+import xml.etree.ElementTree as et
+import pytest
+from mcafee_epo_policies import policies as policies_module
+from mcafee_epo_policies.policies import Policies, _init_split_worker, _run_split
+
+from conftest import SHARED_SETTINGS
+
+@pytest.fixture
+def export_path(tmp_path):
+    # 12 policies of 2 types, each one with its own settings
+    root = et.fromstring(SHARED_SETTINGS)
+    settings_obj = root.find('EPOPolicySettings')
+    policy_obj = root.find('EPOPolicyObject')
+    root[1:] = []
+    for index in range(12):
+        new_settings = copy.deepcopy(settings_obj)
+        new_settings.set('name', 'S{}'.format(index))
+        new_settings.find('Section/Setting').set('value', str(index))
+        new_policy = copy.deepcopy(policy_obj)
+        new_policy.set('name', 'P{}'.format(index))
+        new_policy.set('typeid', 'T{}'.format(index % 2))
+        new_policy.find('PolicySettings').text = 'S{}'.format(index)
+        root.insert(1 + index, new_settings)
+        root.append(new_policy)
+    file_path = str(tmp_path / 'export.xml')
+    et.ElementTree(root).write(file_path, encoding='utf8', xml_declaration=True)
+    return file_path
+
+def read_files(directory, file_paths):
+    contents = {}
+    for file_path in file_paths:
+        with open(file_path, 'rb') as xml_file:
+            contents[os.path.relpath(file_path, directory)] = xml_file.read()
+    return contents
+
+def test_workers_save_the_same_files(tmp_path, export_path):
+    policies = Policies(file_path=export_path)
+    serial = policies.split_all(str(tmp_path / 'serial'))
+    parallel = policies.split_all(str(tmp_path / 'parallel'), workers=2)
+    assert len(serial) == 12
+    assert (read_files(str(tmp_path / 'serial'), serial) ==
+            read_files(str(tmp_path / 'parallel'), parallel))
+    assert ([os.path.relpath(path, str(tmp_path / 'serial')) for path in serial] ==
+            [os.path.relpath(path, str(tmp_path / 'parallel')) for path in parallel])
+    assert len(policies.split_all(str(tmp_path / 'type'), type_id='T1', workers=2)) == 6
+
+def test_split_file_matches_split_all(tmp_path, export_path):
+    split_all = Policies(file_path=export_path).split_all(str(tmp_path / 'all'))
+    for workers in (1, 2):
+        directory = str(tmp_path / 'file{}'.format(workers))
+        split_file = Policies.split_file(export_path, directory, workers=workers)
+        assert read_files(directory, split_file) == read_files(str(tmp_path / 'all'), split_all)
+
+def test_duplicated_policy_saved_once_from_its_first_occurrence(tmp_path, duplicated_policy_path):
+    policies = Policies(file_path=duplicated_policy_path)
+    expected = et.tostring(policies.get_policy('T', 'P1'), encoding='utf8', method='xml')
+    for workers in (1, 2):
+        directory = str(tmp_path / 'all{}'.format(workers))
+        file_paths = policies.split_all(directory, workers=workers)
+        assert file_paths == [os.path.join(directory, 'T', 'P1.xml'),
+                              os.path.join(directory, 'T', 'P2.xml')]
+        assert Policies(file_path=file_paths[0]).get_xml_content() == expected
+        directory = str(tmp_path / 'file{}'.format(workers))
+        file_paths = Policies.split_file(duplicated_policy_path, directory, workers=workers)
+        assert len(file_paths) == 2
+        assert Policies(file_path=file_paths[0]).get_xml_content() == expected
+
+def test_worker_memory_cap_without_resource(monkeypatch):
+    # Windows has no resource module: the workers aren't capped
+    monkeypatch.setattr(policies_module, 'resource', None)
+    _init_split_worker(1024 * 1024 * 1024)
+
+class FakeExecutor():
+    """
+    Runs the submitted calls when their result is read, and records the largest
+    number of calls submitted and not read.
+    """
+
+    max_pending = 0
+
+    def __init__(self, max_workers, initializer, initargs):
+        self.pending = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def submit(self, function, **kwargs):
+        self.pending += 1
+        FakeExecutor.max_pending = max(FakeExecutor.max_pending, self.pending)
+        future = concurrent.futures.Future()
+        future.set_result(None)
+        future.result = lambda: self.run(function, kwargs)
+        return future
+
+    def run(self, function, kwargs):
+        self.pending -= 1
+        return [kwargs['xml_data']]
+
+def test_run_split_submits_a_bounded_window(monkeypatch):
+    monkeypatch.setattr(concurrent.futures, 'ProcessPoolExecutor', FakeExecutor)
+    slices = ({'xml_data': index} for index in range(20))
+    assert _run_split('directory', slices, 2, None) == list(range(20))
+    assert FakeExecutor.max_pending == 2 * policies_module.SPLIT_PENDING_PER_WORKER
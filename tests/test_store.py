@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+################################################################################
+# Copyright (c) 2019 Benjamin Marandel - All Rights Reserved.
+################################################################################
+
+import xml.etree.ElementTree as et
+import pytest
+from mcafee_epo_policies.store import PolicyStore
+from mcafee_epo_policies.policies import Policies
+
+def test_add_file_shared_settings(shared_settings_path):
+    with PolicyStore() as store:
+        assert store.add_file(shared_settings_path) == 2
+        assert store.list() == [{'server': 'SRV', 'typeid': 'T', 'name': 'P1'},
+                                {'server': 'SRV', 'typeid': 'T', 'name': 'P2'}]
+        assert [row['name'] for row in store.query('Enabled', op='=', value='1')] == ['P1', 'P2']
+        assert [policy.get_name() for policy in store.query_policies('Enabled')] == ['P1', 'P2']
+
+def test_get_policy_round_trip(fw_policy_path):
+    policies = Policies(file_path=fw_policy_path)
+    with PolicyStore() as store:
+        assert store.add_policies(policies) == 1
+        policy = store.get_policy('FireCore_FW_Rules', 'Ben - CAG Test')
+        assert et.tostring(policy) == et.tostring(
+            policies.get_policy('FireCore_FW_Rules', 'Ben - CAG Test'))
+        assert store.get_policy('FireCore_FW_Rules', 'Unknown') is None
+
+def levels_export(values):
+    # One policy per value of the Setting General/Level
+    policies = ['<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<epo:EPOPolicySchema xmlns:epo="mcafee-epo-policy">'
+                '<EPOPolicyVerInfo vermjr="5" vermin="10" verrel="0" verbld="0"/>']
+    for index, value in enumerate(values):
+        policies.append('<EPOPolicySettings name="S{0}" featureid="F" typeid="T">'
+                        '<Section name="General"><Setting name="Level" value="{1}"/></Section>'
+                        '</EPOPolicySettings>'
+                        '<EPOPolicyObject name="P{0}" featureid="F" serverid="SRV" typeid="T">'
+                        '<PolicySettings>S{0}</PolicySettings></EPOPolicyObject>'.format(
+                            index, value))
+    policies.append('</epo:EPOPolicySchema>')
+    return Policies(xml_policies=''.join(policies))
+
+def test_query_numeric_values():
+    with PolicyStore() as store:
+        store.add_policies(levels_export(['3', 'abc', '', '10', '2.5', ' 7']))
+        assert [row['value'] for row in store.query('Level', op='<=', value=5)] == ['3', '2.5']
+        assert [row['value'] for row in store.query('Level', op='>', value=5)] == ['10', ' 7']
+        assert [row['value'] for row in store.query('Level', op='!=', value=3)] == [
+            '10', '2.5', ' 7']
+        # A string is compared as a string
+        assert [row['name'] for row in store.query('Level', op='=', value='abc')] == ['P1']
+        assert len(store.query('Level', section='General')) == 6
+        with pytest.raises(ValueError):
+            store.query('Level', op='~', value='1')
+
+def test_reopen_database(tmp_path, shared_settings_path):
+    database = str(tmp_path / 'policies.db')
+    with PolicyStore(database) as store:
+        store.add_file(shared_settings_path)
+    with PolicyStore(database) as store:
+        assert len(store.list(type_id='T')) == 2
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+################################################################################
+# Copyright (c) 2019 Benjamin Marandel - All Rights Reserved.
+################################################################################
+
+from mcafee_epo_policies.synthetic import SyntheticPolicies
+from mcafee_epo_policies.policies import Policies
+from mcafee_epo_policies.es.tp.onaccessscan import ESTPPolicyOnAccessScan
+from mcafee_epo_policies.es.fw.rules import ESFWPolicyRules
+from mcafee_epo_policies.ma.general import McAfeeAgentPolicyGeneral
+
+def test_same_seed_same_export():
+    first = SyntheticPolicies.generate(seed=7, oas=2, ods=2, fw=1, general=1, repository=1)
+    second = SyntheticPolicies.generate(seed=7, oas=2, ods=2, fw=1, general=1, repository=1)
+    other = SyntheticPolicies.generate(seed=8, oas=2, ods=2, fw=1, general=1, repository=1)
+    assert first.get_xml_content() == second.get_xml_content()
+    assert first.get_xml_content() != other.get_xml_content()
+
+def test_policies_load_with_product_classes():
+    policies = Policies(xml_policies=SyntheticPolicies.generate(
+        seed=1, oas=1, fw=1, general=1, processes=4, rules=6, branches=3).get_xml_content())
+    assert policies.list_type() == ['EAM_General_Policies', 'FireCore_FW_Rules', 'General']
+    oas = [policy for policy in policies.iter_policies('EAM_General_Policies')][0]
+    assert len(ESTPPolicyOnAccessScan(oas.root).get_process_list()) == 4
+    fw = [policy for policy in policies.iter_policies('FireCore_FW_Rules')][0]
+    rules = ESFWPolicyRules(fw.root)
+    assert rules.load_policy()
+    assert len(rules.rul) >= 6
+    general = [policy for policy in policies.iter_policies('General')][0]
+    assert len(McAfeeAgentPolicyGeneral(general.root).get_upd_branch_selection()) == 3